@@ -9,17 +9,28 @@ Usage:
 """
 
 import os
-from concurrent.futures import ThreadPoolExecutor
 
 from shiny import ui, App, Inputs, Outputs, Session
+from starlette.applications import Starlette
+from starlette.routing import Mount, Route
 
+from features.file_operations.journal import Journal
 from features.interface.card_values import CardValues
+from features.interface.conversion_progress import ConversionProgress
+from features.interface.health_panel import HealthPanel
+from features.interface.live_preview import LivePreview, preview_endpoint
 from features.interface.modal_remover import ModalRemover
 from features.interface.session_manager import SessionManager
 from features.interface.sidebar_buttons import SidebarButtons
 from features.modules.camera import Camera
 from features.modules.camera_led import CameraLed
+from features.modules.camera_supervisor import CameraSupervisor
+from features.modules.catalog_watcher import CatalogWatcher
+from features.modules.conversion_service import ConversionService
+from features.modules.device_presence import DevicePresenceMonitor
+from features.modules.pipeline_health import PipelineHealth
 from features.modules.recording_led import RecordLed
+from features.modules.storage_governor import StorageGovernor
 from features.reactivity.buttons_controller import ButtonsController
 from features.reactivity.metadata_controller import MetadataController
 from features.reactivity.storage_controller import StorageController
@@ -31,6 +42,10 @@ from utils.parser import ENVParser
 camera = Camera()
 env = ENVParser()
 
+# Unfinished saves and deletes are recovered once at startup, before any session or background service runs
+initialize_logger()
+Journal().recover()
+
 app_ui = ui.page_sidebar(
     ui.sidebar(side_view()),
     header(),
@@ -40,22 +55,12 @@ app_ui = ui.page_sidebar(
 )
 
 
-def camera_handler():
-    """
-    Handles the camera thread.
-
-    Continuously checks if the camera is ready and not running, and if so, starts the camera with the provided timestamps.
-    """
-    while True:
-        if camera.ready and not camera.running:
-            camera.run()
-
-
 def server(input: Inputs, output: Outputs, session: Session):
     """
     Handles the server side of the application.
 
-    Initializes the logger, sets up various UI components and editors, and starts the camera handler thread.
+    Initializes the logger, sets up various UI components and editors, and starts the camera supervisor and the
+    background conversion service.
 
     Args:
         input (Inputs): The input object for the server.
@@ -63,6 +68,10 @@ def server(input: Inputs, output: Outputs, session: Session):
         session (Session): The session object for the server.
     """
     initialize_logger()
+    DevicePresenceMonitor().start()
+    CatalogWatcher().start()
+    StorageGovernor().start()
+    PipelineHealth().start()
     CameraLed.state()
     RecordLed.state()
     SidebarButtons()
@@ -72,12 +81,21 @@ def server(input: Inputs, output: Outputs, session: Session):
     ButtonsController(input, camera)
     StorageController(input)
     SessionManager(input)
+    LivePreview(input)
+    ConversionProgress()
+    HealthPanel()
+    ConversionService().start()
 
     # Setup Threading
-    executor = ThreadPoolExecutor(max_workers=1)
-    executor.submit(camera_handler)
+    CameraSupervisor().start()
+
 
+shiny_app = App(app_ui, server, static_assets={f"/{env.temp_path}": os.path.join(env.main_path, env.temp_path)})
 
-app = App(app_ui, server, static_assets={f"/{env.temp_path}": os.path.join(env.main_path, env.temp_path)})
+# The live preview is streamed next to the Shiny app
+app = Starlette(routes=[
+    Route("/preview/{stream}", preview_endpoint),
+    Mount("/", app=shiny_app),
+])
 
 # Save files from any day. Not just today
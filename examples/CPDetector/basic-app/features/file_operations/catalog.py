@@ -0,0 +1,306 @@
+"""
+This module provides a persistent catalog of the recordings in the main storage.
+
+The catalog is a SQLite database in the main storage which lists all days, participants and trigger windows together
+with their frame counts. It is updated whenever a session is saved, edited, deleted or converted, so that the UI can
+count and list recordings without walking the storage tree.
+
+Classes:
+    Catalog: Keeps the SQLite catalog of the main storage up to date and answers queries about it.
+"""
+
+import sqlite3
+import threading
+from typing import List, Optional
+
+from features.file_operations.recording_container import CONTAINER_INDEX_FILE, INDEX_DTYPE, STREAM_OUTPUT_NAMES
+from . import os, logging, storage_path, env
+
+# Values of the converted column: the video has been found by a scan or written by the conversion service
+CONVERTED_VIDEO_FOUND = 1
+CONVERTED_BY_SERVICE = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS participants (
+    day TEXT NOT NULL,
+    person TEXT NOT NULL,
+    has_metadata INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, person)
+);
+CREATE TABLE IF NOT EXISTS windows (
+    day TEXT NOT NULL,
+    person TEXT NOT NULL,
+    stream TEXT NOT NULL,
+    window TEXT NOT NULL,
+    frame_count INTEGER NOT NULL,
+    converted INTEGER NOT NULL DEFAULT 0,  -- 0, CONVERTED_VIDEO_FOUND or CONVERTED_BY_SERVICE
+    PRIMARY KEY (day, person, stream, window),
+    FOREIGN KEY (day, person) REFERENCES participants (day, person) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS participants_by_person ON participants (person);
+CREATE TABLE IF NOT EXISTS properties (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class Catalog:
+    """
+    Keeps the SQLite catalog of the main storage up to date and answers queries about it.
+
+    Every update runs in a single transaction. The catalog is built with a full scan only once, when the database is
+    created; afterwards only the participants that changed are scanned again. Windows marked as converted stay marked
+    when they are scanned again.
+
+    Attributes:
+        _instance (Catalog): Singleton instance of the Catalog class.
+        path (str): The path of the database file.
+        _connection (sqlite3.Connection): The connection to the database, shared by all threads.
+        _lock (threading.RLock): Serializes the access to the connection.
+        _version (int): Incremented after every update of the catalog.
+    """
+    _instance = None
+    path = None
+    _connection = None
+    _lock = None
+    _version = 0
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate catalog instance.")
+            cls._instance = super(Catalog, cls).__new__(cls)
+            cls._lock = threading.RLock()
+            cls.path = os.path.join(storage_path, env.catalog_file_name)
+            cls._instance.__open()
+        return cls._instance
+
+    @property
+    def version(self) -> int:
+        """
+        Returns a counter which changes after every update of the catalog.
+        """
+        return self._version
+
+    def rebuild(self) -> None:
+        """
+        Scans the whole main storage and replaces the content of the catalog.
+        """
+        logging.info(f"Rebuilding the recording catalog from: {storage_path}")
+        with self._lock, self._connection:
+            converted = self.__converted("SELECT day, person, stream, window, converted FROM windows "
+                                         "WHERE converted > 0")
+            self._connection.execute("DELETE FROM windows")
+            self._connection.execute("DELETE FROM participants")
+            for day in _list_entries(storage_path):
+                for person in _list_entries(os.path.join(storage_path, day)):
+                    self.__store_participant(day, person, converted)
+            self._connection.execute("INSERT OR REPLACE INTO properties VALUES ('built', '1')")
+            self._version += 1
+
+    def refresh_participant(self, day: str, person: str) -> None:
+        """
+        Scans the folder of a single participant and updates the catalog accordingly.
+
+        Args:
+            day (str): The day of the participant.
+            person (str): The participant to scan.
+        """
+        with self._lock, self._connection:
+            converted = self.__converted("SELECT day, person, stream, window, converted FROM windows "
+                                         "WHERE converted > 0 AND day = ? AND person = ?", (day, person))
+            self._connection.execute("DELETE FROM participants WHERE day = ? AND person = ?", (day, person))
+            if os.path.isdir(os.path.join(storage_path, day, person)):
+                self.__store_participant(day, person, converted)
+            self._version += 1
+        logging.debug(f"Catalog refreshed for {person} on {day}.")
+
+    def mark_converted(self, day: str, person: str, stream: str, window: str) -> None:
+        """
+        Marks a trigger window as converted to a video by the conversion service. Only these windows can have their raw
+        frames evicted.
+
+        Args:
+            day (str): The day of the participant.
+            person (str): The participant.
+            stream (str): The stream folder of the window.
+            window (str): The name of the window.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE windows SET converted = ? WHERE day = ? AND person = ? AND stream = ? "
+                                     "AND window = ?", (CONVERTED_BY_SERVICE, day, person, stream, window))
+            self._version += 1
+
+    def remove_participant(self, day: str, person: str) -> None:
+        """
+        Removes a participant and all of its trigger windows from the catalog.
+
+        Args:
+            day (str): The day of the participant.
+            person (str): The participant to remove.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM participants WHERE day = ? AND person = ?", (day, person))
+            self._version += 1
+        logging.debug(f"Catalog entry removed for {person} on {day}.")
+
+    def days(self) -> List[str]:
+        """
+        Returns all days with at least one participant, sorted ascending.
+        """
+        return [row[0] for row in self.__query("SELECT DISTINCT day FROM participants ORDER BY day")]
+
+    def people(self, day: Optional[str] = None) -> List[str]:
+        """
+        Returns the participants of a day, or of all days if no day is given.
+
+        Args:
+            day (Optional[str]): The day to list the participants for.
+
+        Returns:
+            List[str]: The participants sorted by day and name.
+        """
+        if day is None:
+            return [row[0] for row in self.__query("SELECT person FROM participants ORDER BY day, person")]
+        return [row[0] for row in
+                self.__query("SELECT person FROM participants WHERE day = ? ORDER BY person", (day,))]
+
+    def entries(self) -> List[tuple]:
+        """
+        Returns the day and name of every participant in the catalog.
+        """
+        return [tuple(row) for row in self.__query("SELECT day, person FROM participants")]
+
+    def count_days(self) -> int:
+        """
+        Returns the number of days with at least one participant.
+        """
+        return self.__query("SELECT COUNT(DISTINCT day) FROM participants")[0][0]
+
+    def count_people(self, day: Optional[str] = None) -> int:
+        """
+        Returns the number of participants of a day, or of all days if no day is given.
+
+        Args:
+            day (Optional[str]): The day to count the participants for.
+
+        Returns:
+            int: The number of participants.
+        """
+        if day is None:
+            return self.__query("SELECT COUNT(*) FROM participants")[0][0]
+        return self.__query("SELECT COUNT(*) FROM participants WHERE day = ?", (day,))[0][0]
+
+    def sessions_with_metadata(self) -> List[tuple]:
+        """
+        Returns the day and participant of every saved session with a metadata file.
+        """
+        return self.__query("SELECT day, person FROM participants WHERE has_metadata = 1 ORDER BY day, person")
+
+    def count_sessions_with_metadata(self) -> int:
+        """
+        Returns the number of saved sessions with a metadata file.
+        """
+        return self.__query("SELECT COUNT(*) FROM participants WHERE has_metadata = 1")[0][0]
+
+    def count_windows(self, day: str, person: str) -> int:
+        """
+        Returns the number of recorded containers of a participant, counting every stream.
+
+        Args:
+            day (str): The day of the participant.
+            person (str): The participant.
+
+        Returns:
+            int: The number of containers.
+        """
+        return self.__query("SELECT COUNT(*) FROM windows WHERE day = ? AND person = ?", (day, person))[0][0]
+
+    def frame_count(self, day: str, person: str) -> int:
+        """
+        Returns the number of recorded frames of a participant, summed over every stream.
+
+        Args:
+            day (str): The day of the participant.
+            person (str): The participant.
+
+        Returns:
+            int: The number of frames.
+        """
+        return self.__query("SELECT COALESCE(SUM(frame_count), 0) FROM windows WHERE day = ? AND person = ?",
+                            (day, person))[0][0]
+
+    def count_converted(self, day: str, person: str) -> int:
+        """
+        Returns the number of containers of a participant which have been converted to a video.
+
+        Args:
+            day (str): The day of the participant.
+            person (str): The participant.
+
+        Returns:
+            int: The number of converted containers.
+        """
+        return self.__query("SELECT COUNT(*) FROM windows WHERE day = ? AND person = ? AND converted > 0",
+                            (day, person))[0][0]
+
+    def converted_windows(self) -> List[tuple]:
+        """
+        Returns the day, participant, stream and name of every trigger window converted by the conversion service,
+        oldest days first.
+        """
+        rows = self.__query("SELECT day, person, stream, window FROM windows WHERE converted = ? "
+                            "ORDER BY day, person, stream, window", (CONVERTED_BY_SERVICE,))
+        return [tuple(row) for row in rows]
+
+    def __open(self) -> None:
+        os.makedirs(storage_path, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(SCHEMA)
+        if not self.__query("SELECT value FROM properties WHERE key = 'built'"):
+            self.rebuild()
+
+    def __query(self, sql: str, parameters: tuple = ()) -> list:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def __converted(self, sql: str, parameters: tuple = ()) -> dict:
+        # The windows marked as converted, which a scan of the storage keeps marked
+        return {tuple(row[:4]): row[4] for row in self.__query(sql, parameters)}
+
+    def __store_participant(self, day: str, person: str, converted_windows: dict) -> None:
+        folder = os.path.join(storage_path, day, person)
+        has_metadata = os.path.isfile(os.path.join(folder, env.metadata_file_name))
+        self._connection.execute("INSERT INTO participants VALUES (?, ?, ?)", (day, person, int(has_metadata)))
+        for stream, output_name in STREAM_OUTPUT_NAMES.items():
+            stream_folder = os.path.join(folder, stream)
+            for window in _list_entries(stream_folder):
+                index_file = os.path.join(stream_folder, window, CONTAINER_INDEX_FILE)
+                if not os.path.isfile(index_file):
+                    continue
+                frame_count = os.path.getsize(index_file) // INDEX_DTYPE.itemsize
+                # Videos are renamed to their final name only once they are complete
+                converted = converted_windows.get((day, person, stream, window), 0)
+                if not converted and os.path.isfile(os.path.join(folder, f"{output_name}_{window}.mp4")):
+                    converted = CONVERTED_VIDEO_FOUND
+                self._connection.execute("INSERT INTO windows VALUES (?, ?, ?, ?, ?, ?)",
+                                         (day, person, stream, window, frame_count, converted))
+
+
+def _list_entries(path: str) -> List[str]:
+    """
+    Helper function which lists the sub folders of a path, without hidden folders and the log folder.
+
+    Args:
+        path (str): The path to list.
+
+    Returns:
+        List[str]: The names of the sub folders.
+    """
+    if not os.path.isdir(path):
+        return []
+    with os.scandir(path) as entries:
+        return sorted(entry.name for entry in entries if entry.is_dir() and not entry.name.startswith(".")
+                      and entry.name != env.log_filename)
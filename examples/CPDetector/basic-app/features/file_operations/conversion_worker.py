@@ -0,0 +1,116 @@
+"""
+This module provides the functions executed in the worker processes of the conversion service.
+
+Every conversion task runs in its own process group, so that the worker and the ffmpeg processes it starts can be
+lowered in priority together while the camera is recording. Each worker lowers its own priority as soon as recording
+starts, so the service doesn't need to know the process IDs of its workers.
+
+Functions:
+    initialize_worker: Prepares a worker process before it runs a task.
+    convert_window: Converts a single trigger window of a recorded session.
+    list_conversion_tasks: Lists the trigger windows of a session that need to be converted.
+    lower_priority: Lowers the CPU and IO priority of a process group.
+    _lower_priority_when_recording: Helper function which lowers the priority of a worker once the camera records.
+"""
+
+import shutil
+import subprocess
+import threading
+from typing import List, Tuple
+
+from features.file_operations.recording_container import STREAM_OUTPUT_NAMES
+from features.file_operations.video_processing import convert_recording_to_video
+from . import os, logging, storage_path
+
+STREAMS = {stream: (name, stream == "depth_frames") for stream, name in STREAM_OUTPUT_NAMES.items()}
+BACKGROUND_NICENESS = 10
+RECORDING_NICENESS = 19
+
+_recording = None
+
+
+def initialize_worker(recording) -> None:
+    """
+    Prepares a worker process before it runs a task.
+
+    Args:
+        recording (multiprocessing.Event): Set while the camera is recording.
+    """
+    global _recording
+    _recording = recording
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    lower_priority(os.getpid(), BACKGROUND_NICENESS, idle_io=False)
+    threading.Thread(target=_lower_priority_when_recording, name="conversion-priority", daemon=True).start()
+
+
+def convert_window(day: str, person: str, stream: str, window: str) -> Tuple[int, str, str, bool]:
+    """
+    Converts a single trigger window of a recorded session.
+
+    Args:
+        day (str): The day of the session.
+        person (str): The person of the session.
+        stream (str): The stream folder of the window, e.g. depth_frames.
+        window (str): The name of the trigger window.
+
+    Returns:
+        Tuple[int, str, str, bool]: The process ID of the worker, the stream, the window and whether it succeeded.
+    """
+    output_name, depth = STREAMS[stream]
+    path_of_frames = os.path.join(storage_path, day, person, stream)
+    try:
+        success = convert_recording_to_video(path_of_frames, window, output_name, depth)
+    except Exception as e:
+        logging.error(f"Converting {stream}/{window} of {person} failed: {e}")
+        success = False
+    return os.getpid(), stream, window, success
+
+
+def list_conversion_tasks(day: str, person: str) -> List[Tuple[str, str]]:
+    """
+    Lists the trigger windows of a session that need to be converted.
+
+    Args:
+        day (str): The day of the session.
+        person (str): The person of the session.
+
+    Returns:
+        List[Tuple[str, str]]: The stream folder and window name of every trigger window.
+    """
+    tasks = []
+    for stream in STREAMS:
+        path = os.path.join(storage_path, day, person, stream)
+        if os.path.isdir(path):
+            tasks.extend((stream, window) for window in sorted(os.listdir(path)))
+    return tasks
+
+
+def lower_priority(pid: int, niceness: int, idle_io: bool) -> None:
+    """
+    Lowers the CPU and IO priority of a process group.
+
+    Priorities can only be lowered without additional permissions, so failures are logged and ignored.
+
+    Args:
+        pid (int): The ID of the process group.
+        niceness (int): The niceness to apply.
+        idle_io (bool): Whether IO should only be scheduled while the disk is otherwise idle.
+    """
+    try:
+        os.setpriority(os.PRIO_PGRP, pid, max(niceness, os.getpriority(os.PRIO_PGRP, pid)))
+    except (AttributeError, OSError) as e:
+        logging.debug(f"CPU priority of {pid} could not be lowered: {e}")
+        return
+    if shutil.which("ionice"):
+        io_class = ["-c", "3"] if idle_io else ["-c", "2", "-n", "7"]
+        subprocess.run(["ionice", *io_class, "-P", str(pid)], check=False)
+
+
+def _lower_priority_when_recording() -> None:
+    """
+    Helper function which waits in a worker process until the camera records and then lowers the priority of the
+    worker and its ffmpeg processes. Priorities can't be raised again, so it only runs once per worker.
+    """
+    _recording.wait()
+    lower_priority(os.getpid(), RECORDING_NICENESS, idle_io=True)
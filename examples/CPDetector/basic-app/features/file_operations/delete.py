@@ -5,12 +5,16 @@ It defines functions to delete temporary recordings, delete a person's folder on
 
 Functions:
     delete_person_on_day_folder: Deletes a person's folder on a specific day.
+    __remove_tombstone: Removes the tombstone of a deleted folder.
     delete_temporary_recordings: Deletes all files and folders in the temporary path.
     __delete_files_and_folders_in_path: Deletes all files and folders in a given path.
 """
 
 import shutil
+import threading
 
+from features.file_operations.catalog import Catalog
+from features.file_operations.journal import Journal, DELETE_OPERATION, tombstone_path
 from . import os, logging, storage_path, temporary_path
 
 
@@ -28,6 +32,9 @@ def delete_person_on_day_folder(day: str, person: str) -> bool:
     """
     Deletes a person's folder on a specific day.
 
+    The folder is renamed to a tombstone in a single journaled step, which removes it from the storage at once. The
+    tombstone is removed in a background thread.
+
     Args:
         day (str): The day of the folder to be deleted.
         person (str): The person whose folder is to be deleted.
@@ -36,14 +43,38 @@ def delete_person_on_day_folder(day: str, person: str) -> bool:
         bool: True if the deletion was successful, False otherwise.
     """
     folder = os.path.join(storage_path, day, person)
-    __delete_files_and_folders_in_path(folder)
+    journal = Journal()
+    operation_id = journal.begin(DELETE_OPERATION, day, person)
+    tombstone = tombstone_path(day, person, operation_id)
     try:
-        root_folder = os.path.dirname(folder)
-        if len(os.listdir(root_folder)) == 0:
-            shutil.rmtree(root_folder)
-        return True
-    except:
+        os.rename(folder, tombstone)
+    except OSError as e:
+        logging.error(f"Folder {folder} couldn't be deleted: {e}")
+        journal.done(operation_id)
         return False
+    journal.commit(operation_id)
+    Catalog().remove_participant(day, person)
+    threading.Thread(target=__remove_tombstone, args=(tombstone, operation_id), name="delete", daemon=True).start()
+    return True
+
+
+def __remove_tombstone(tombstone: str, operation_id: str) -> None:
+    """
+    Helper function which removes the tombstone of a deleted folder and its day folder, if it is empty.
+
+    Args:
+        tombstone (str): The path of the tombstone.
+        operation_id (str): The ID of the delete operation.
+    """
+    shutil.rmtree(tombstone, ignore_errors=True)
+    try:
+        root_folder = os.path.dirname(tombstone)
+        if len(os.listdir(root_folder)) == 0:
+            os.rmdir(root_folder)
+    except OSError:
+        pass
+    Journal().done(operation_id)
+    logging.debug(f"Removed tombstone: {tombstone}")
 
 
 def __delete_files_and_folders_in_path(path: str) -> bool:
@@ -0,0 +1,214 @@
+"""
+This module provides a write-ahead journal for operations which change the main storage.
+
+Every save and delete of a session is recorded in the journal before the storage is changed, again once the change is
+committed and a last time once it has been cleaned up. Each record is flushed to disk before the operation continues.
+After a crash, the recovery pass only looks at the operations in the journal which have not been finished: operations
+that have not been committed are rolled back, committed operations are cleaned up.
+
+Classes:
+    Journal: Records save and delete operations and recovers unfinished operations at startup.
+
+Functions:
+    tombstone_path: Returns the folder a deleted participant is moved to until it has been removed.
+"""
+
+import json
+import shutil
+import threading
+import uuid
+from typing import Dict
+
+from features.file_operations.catalog import Catalog
+from features.file_operations.recording_container import STREAM_OUTPUT_NAMES
+from . import os, logging, storage_path, temporary_path
+
+JOURNAL_FILE_NAME = ".journal"
+
+SAVE_OPERATION = "save"
+DELETE_OPERATION = "delete"
+
+BEGIN_STATE = "begin"
+COMMITTED_STATE = "committed"
+DONE_STATE = "done"
+
+
+class Journal:
+    """
+    Records save and delete operations and recovers unfinished operations at startup.
+
+    The journal is an append-only file with one JSON record per line. It is truncated as soon as no operation is open.
+
+    Attributes:
+        _instance (Journal): Singleton instance of the Journal class.
+        path (str): The path of the journal file.
+        _open (Dict[str, dict]): The operations which have not been finished yet, by their ID.
+        _lock (threading.Lock): Serializes the writes to the journal file.
+        _recovered (bool): Indicates if the recovery pass has already been run.
+    """
+    _instance = None
+    path = None
+    _open = None
+    _lock = None
+    _recovered = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate journal instance.")
+            cls._instance = super(Journal, cls).__new__(cls)
+            cls.path = os.path.join(storage_path, JOURNAL_FILE_NAME)
+            cls._open = {}
+            cls._lock = threading.Lock()
+        return cls._instance
+
+    def begin(self, operation: str, day: str, person: str) -> str:
+        """
+        Records the start of an operation, before the storage is changed.
+
+        Args:
+            operation (str): The operation, save or delete.
+            day (str): The day of the participant.
+            person (str): The participant the operation is applied to.
+
+        Returns:
+            str: The ID of the operation.
+        """
+        record = {"id": uuid.uuid4().hex, "operation": operation, "day": day, "person": person}
+        self.__append(record, BEGIN_STATE)
+        return record["id"]
+
+    def commit(self, operation_id: str) -> None:
+        """
+        Records that an operation has been committed. From now on it is finished instead of rolled back.
+
+        Args:
+            operation_id (str): The ID of the operation.
+        """
+        self.__append(self._open[operation_id], COMMITTED_STATE)
+
+    def done(self, operation_id: str) -> None:
+        """
+        Records that an operation has been cleaned up.
+
+        Args:
+            operation_id (str): The ID of the operation.
+        """
+        self.__append(self._open[operation_id], DONE_STATE)
+
+    def rollback(self, operation_id: str) -> None:
+        """
+        Rolls back an operation which has not been committed and records it as finished.
+
+        Args:
+            operation_id (str): The ID of the operation.
+        """
+        record = self._open[operation_id]
+        logging.warning(f"Rolling back {record['operation']} of {record['person']} on {record['day']}.")
+        _RECOVERY[record["operation"]](record)
+        self.__append(record, DONE_STATE)
+
+    def recover(self) -> None:
+        """
+        Rolls back every operation which has not been committed and cleans up every committed operation.
+
+        Only runs once, later calls have no effect.
+        """
+        with self._lock:
+            if self._recovered:
+                return
+            self._recovered = True
+            operations = self.__read()
+        for record in operations.values():
+            logging.warning(f"Recovering unfinished {record['operation']} of {record['person']} on {record['day']} "
+                            f"in state: {record['state']}")
+            try:
+                _RECOVERY[record["operation"]](record)
+            except OSError as e:
+                logging.error(f"Recovery of {record['operation']} of {record['person']} failed: {e}")
+                continue
+            self.__append(record, DONE_STATE)
+        for record in operations.values():
+            Catalog().refresh_participant(record["day"], record["person"])
+
+    def __read(self) -> Dict[str, dict]:
+        operations = {}
+        if not os.path.isfile(self.path):
+            return operations
+        with open(self.path, "r") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:  # The last record may be incomplete after a crash
+                    continue
+                if record["state"] == DONE_STATE:
+                    operations.pop(record["id"], None)
+                else:
+                    operations[record["id"]] = record
+        self._open.update(operations)
+        return operations
+
+    def __append(self, record: dict, state: str) -> None:
+        record = dict(record, state=state)
+        with self._lock:
+            os.makedirs(storage_path, exist_ok=True)
+            with open(self.path, "a") as file:
+                file.write(json.dumps(record) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            if state == DONE_STATE:
+                self._open.pop(record["id"], None)
+                if not self._open:
+                    os.truncate(self.path, 0)
+            else:
+                self._open[record["id"]] = record
+
+
+def tombstone_path(day: str, person: str, operation_id: str) -> str:
+    """
+    Returns the folder a deleted participant is moved to until it has been removed.
+
+    The name starts with a dot, so the folder is ignored by the catalog.
+
+    Args:
+        day (str): The day of the participant.
+        person (str): The deleted participant.
+        operation_id (str): The ID of the delete operation.
+
+    Returns:
+        str: The path of the tombstone folder.
+    """
+    return os.path.join(storage_path, day, f".{person}.deleted-{operation_id}")
+
+
+def _recover_save(record: dict) -> None:
+    """
+    Helper function which finishes a committed save or moves the recordings of an uncommitted save back.
+    """
+    if record["state"] == COMMITTED_STATE:
+        shutil.rmtree(os.path.join(temporary_path, record["day"]), ignore_errors=True)
+        return
+    destination_path = os.path.join(storage_path, record["day"], record["person"])
+    for stream in STREAM_OUTPUT_NAMES:
+        stream_path = os.path.join(destination_path, stream)
+        if not os.path.isdir(stream_path):
+            continue
+        for window in os.listdir(stream_path):
+            source = os.path.join(temporary_path, record["day"], stream, window)
+            if not os.path.exists(source):  # The window has been renamed, not copied
+                os.makedirs(os.path.dirname(source), exist_ok=True)
+                shutil.move(os.path.join(stream_path, window), source)
+    shutil.rmtree(destination_path, ignore_errors=True)
+
+
+def _recover_delete(record: dict) -> None:
+    """
+    Helper function which removes the tombstone of a committed delete or restores the participant otherwise.
+    """
+    tombstone = tombstone_path(record["day"], record["person"], record["id"])
+    if record["state"] == COMMITTED_STATE:
+        shutil.rmtree(tombstone, ignore_errors=True)
+    elif os.path.isdir(tombstone):
+        os.rename(tombstone, os.path.join(storage_path, record["day"], record["person"]))
+
+
+_RECOVERY = {SAVE_OPERATION: _recover_save, DELETE_OPERATION: _recover_delete}
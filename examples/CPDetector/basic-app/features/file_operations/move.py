@@ -1,21 +1,62 @@
 """
 This module provides functions to move data from temporary storage to main storage.
 
-It defines functions to list files to move and move data from temporary storage to main storage.
+It defines functions to list files to move and to commit the recordings of a session from the temporary storage to the
+main storage. If both storages share a device, every trigger window is moved with a single atomic rename and no data is
+copied. Otherwise the files are copied by a bounded number of threads and verified with a checksum.
+
+Classes:
+    CommitProgress: The progress of a session commit.
 
 Functions:
     list_files_to_move: Lists all files in the temporary path that need to be moved.
     move_data_from_temp_to_main_storage: Moves data from the temporary storage to the main storage and deletes the temporary recordings.
 """
 
+import hashlib
 import shutil
-from multiprocessing import Pool, cpu_count
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Tuple
+
+from pydantic import BaseModel
 
+from features.file_operations.catalog import Catalog
 from features.file_operations.delete import delete_temporary_recordings
+from features.file_operations.journal import Journal, SAVE_OPERATION
+from features.file_operations.recording_container import CONTAINER_FILES, STREAM_OUTPUT_NAMES, is_container
+from features.file_operations.thumbnails import ThumbnailCache
 from features.modules.participant import Participant
 from . import os, today, temporary_path, logging, storage_path
 
+RENAME_METHOD = "rename"
+COPY_METHOD = "copy"
+COPY_WORKERS = 4
+COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class CommitProgress(BaseModel):
+    """
+    The progress of a session commit.
+
+    Attributes:
+        method (str): How the files are committed, rename or copy.
+        files (int): The number of files committed so far.
+        bytes (int): The number of bytes committed so far.
+        seconds (float): The time since the commit has been started.
+    """
+    method: str
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """
+        Returns the throughput of the commit.
+        """
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
 
 def list_files_to_move() -> List[str]:
     """
@@ -32,43 +73,134 @@ def list_files_to_move() -> List[str]:
     return all_files
 
 
-def move_data_from_temp_to_main_storage(folder_id: str, participant: Participant, day: str = today):
+def move_data_from_temp_to_main_storage(folder_id: str, participant: Participant,
+                                        day: str = today) -> Iterator[CommitProgress]:
     """
     Moves data from the temporary storage to the main storage and deletes the temporary recordings.
 
+    The participant metadata is written after all recordings have been committed, so a session without metadata has
+    not been saved completely. The save is recorded in the journal, so it is rolled back if it is interrupted before
+    the metadata has been written.
+
     Args:
         folder_id (str): The ID of the folder to move the data to.
         participant (Participant): The participant object containing metadata.
         day (str, optional): The day of the folder to move the data to. Defaults to today.
+
+    Yields:
+        CommitProgress: The progress after every committed file.
+
+    Raises:
+        OSError: If a file couldn't be committed. The temporary recordings are kept in this case.
     """
     destination_path = os.path.join(storage_path, day, folder_id)
-    os.makedirs(destination_path, exist_ok=True)
-
-    files_to_move = []
-    for root, directory, files in os.walk(os.path.join(temporary_path, day)):
-        for dir in directory:
-            files = os.listdir(os.path.join(root, dir))
-            if any([os.path.isfile(os.path.join(root, dir, f)) for f in files]):
-                folder = os.sep.join(root.split(os.sep)[-1:])
-                os.makedirs(os.path.join(destination_path, folder, dir), exist_ok=True)
-        for file in files:
-            if os.path.isfile(os.path.join(root, file)):
-                folder = os.sep.join(root.split(os.sep)[-2:])
-                src_file = os.path.join(root, file)
+    journal = Journal()
+    operation_id = journal.begin(SAVE_OPERATION, day, folder_id)
+    try:
+        windows = __list_windows(day, destination_path)
+        for _, destination in windows:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+        progress = None
+        if windows and os.stat(windows[0][0]).st_dev == os.stat(destination_path).st_dev:
+            for progress in __rename_windows(windows):
+                yield progress
+        else:
+            for progress in __copy_windows(windows):
+                yield progress
+
+        if progress is not None:
+            logging.info(f"Committed {progress.files} files ({progress.bytes / 1e6:.1f} MB) by {progress.method} in "
+                         f"{progress.seconds:.2f}s: {progress.bytes_per_second / 1e6:.1f} MB/s")
+        participant.store_participant_metadata(destination_path)
+    except OSError:
+        journal.rollback(operation_id)
+        raise
+    journal.commit(operation_id)
+    Catalog().refresh_participant(day, folder_id)
+    ThumbnailCache().request_participant(day, folder_id)
+    delete_temporary_recordings()
+    journal.done(operation_id)
 
-                dest_file = os.path.join(destination_path, folder, file)
-                if dest_file.endswith(".npy"):
-                    files_to_move.append((src_file, dest_file))
 
-    with Pool(processes=cpu_count()) as pool:
-        for _ in pool.imap(__move_file, files_to_move):
-            yield True
+def __list_windows(day: str, destination_path: str) -> List[Tuple[str, str]]:
+    """
+    Helper function which lists the source and destination folder of every recorded trigger window.
+    """
+    windows = []
+    for stream in STREAM_OUTPUT_NAMES:
+        stream_path = os.path.join(temporary_path, day, stream)
+        if not os.path.isdir(stream_path):
+            continue
+        for window in sorted(os.listdir(stream_path)):
+            if is_container(os.path.join(stream_path, window)):
+                windows.append((os.path.join(stream_path, window), os.path.join(destination_path, stream, window)))
+    os.makedirs(destination_path, exist_ok=True)
+    return windows
 
-    participant.store_participant_metadata(os.path.join(storage_path, day, folder_id))
-    delete_temporary_recordings()
 
+def __rename_windows(windows: List[Tuple[str, str]]) -> Iterator[CommitProgress]:
+    """
+    Helper function which moves every trigger window with a single rename.
+    """
+    progress = CommitProgress(method=RENAME_METHOD)
+    start = time.perf_counter()
+    for source, destination in windows:
+        files = [f for f in os.listdir(source) if f in CONTAINER_FILES]
+        size = sum(os.path.getsize(os.path.join(source, f)) for f in files)
+        os.rename(source, destination)
+        logging.debug(f"Renamed folder: {source} to {destination}")
+        progress.bytes += size
+        for _ in files:
+            progress.files += 1
+            progress.seconds = time.perf_counter() - start
+            yield progress
+
+
+def __copy_windows(windows: List[Tuple[str, str]]) -> Iterator[CommitProgress]:
+    """
+    Helper function which copies every file of the trigger windows with a bounded number of threads.
+    """
+    progress = CommitProgress(method=COPY_METHOD)
+    start = time.perf_counter()
+    files = []
+    for source, destination in windows:
+        os.makedirs(destination, exist_ok=True)
+        files.extend((os.path.join(source, f), os.path.join(destination, f))
+                     for f in os.listdir(source) if f in CONTAINER_FILES)
+
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS, thread_name_prefix="commit") as executor:
+        futures = [executor.submit(__copy_file, source, destination) for source, destination in files]
+        for future in as_completed(futures):
+            progress.files += 1
+            progress.bytes += future.result()
+            progress.seconds = time.perf_counter() - start
+            yield progress
+
+
+def __copy_file(source: str, destination: str) -> int:
+    """
+    Helper function which copies a file in chunks and verifies the copy with a checksum.
 
-def __move_file(args: tuple) -> None:
-    src_file, dest_file = args
-    shutil.copy2(src_file, dest_file)
-    logging.debug(f"Moved file: {src_file} to {dest_file}")
+    Returns:
+        int: The number of copied bytes.
+    """
+    source_hash = hashlib.blake2b()
+    size = 0
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        while chunk := src.read(COPY_CHUNK_SIZE):
+            source_hash.update(chunk)
+            dst.write(chunk)
+            size += len(chunk)
+        dst.flush()
+        os.fsync(dst.fileno())
+    shutil.copystat(source, destination)
+
+    destination_hash = hashlib.blake2b()
+    with open(destination, "rb") as dst:
+        while chunk := dst.read(COPY_CHUNK_SIZE):
+            destination_hash.update(chunk)
+    if source_hash.digest() != destination_hash.digest():
+        raise OSError(f"Checksum of {destination} doesn't match {source}")
+    logging.debug(f"Copied file: {source} to {destination}")
+    return size
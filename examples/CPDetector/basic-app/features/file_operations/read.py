@@ -2,12 +2,18 @@
 This module provides functions to read and list directories and files related to the application's storage.
 
 It defines functions to check if a folder already exists, extract a list of directories, and list days, people, and sessions.
+Days, people and sessions of the main storage are answered by the recording catalog instead of walking the storage.
 
 Functions:
     check_if_folder_already_exists: Checks if a folder already exists for a given day and folder ID.
+    count_days: Counts the days recorded.
+    count_people_for_a_specific_day: Counts the people recorded for a specific day.
+    count_people_in_total: Counts the total amount of recorded people.
+    count_sessions_in_total: Counts the total amount of recorded sessions.
     create_date_selection_for_saved_sessions: Creates a date selection dictionary for saved sessions.
     create_date_selection_for_unsaved_sessions: Creates a date selection dictionary for unsaved sessions.
     extract_list_of_directories: Extracts a list of directories from a given path.
+    get_amount_of_sessions_for_a_specific_person: Counts the recorded containers of a specific person on a specific day.
     list_days: Lists the amount of days recorded.
     list_people_for_a_specific_day: Lists the people recorded for a specific day.
     list_people_in_total: Lists the total amount of recorded people.
@@ -16,10 +22,10 @@ Functions:
     __create_date_dictionary: Helper function to create a date dictionary from a list of dates.
 """
 
-import glob
 from datetime import datetime
 from typing import List
 
+from features.file_operations.catalog import Catalog
 from . import os, logging, storage_path, today, date_format, temporary_path, env
 
 
@@ -67,8 +73,8 @@ def list_days() -> List[str]:
     Returns:
         List[str]: A list of recorded days.
     """
-    logging.debug(f"Collected the amount of days recorded, from: {storage_path}")
-    return extract_list_of_directories(path=storage_path)
+    logging.debug("Collected the amount of days recorded from the catalog.")
+    return Catalog().days()
 
 
 def list_people_for_a_specific_day(day: str = today) -> List[str]:
@@ -81,9 +87,8 @@ def list_people_for_a_specific_day(day: str = today) -> List[str]:
     Returns:
         List[str]: A list of recorded people for the specified day.
     """
-    path = os.path.join(storage_path, day)
-    logging.debug(f"Collect amount of recorded people on {day} from: {path}")
-    return extract_list_of_directories(path=path)
+    logging.debug(f"Collect amount of recorded people on {day} from the catalog.")
+    return Catalog().people(day=day)
 
 
 def list_sessions_for_a_specific_person(day: str = today, person_name: str = "") -> List[str]:
@@ -114,14 +119,17 @@ def list_sessions_for_a_specific_person(day: str = today, person_name: str = "")
 
 
 def get_amount_of_sessions_for_a_specific_person(day: str = today, person_name: str = "") -> int:
-    counter = 0
-    hard_drive_folder = os.path.join(storage_path, day, person_name)
-    logging.debug(f"Collect recordings for {person_name}.")
-    if os.path.exists(hard_drive_folder) and os.path.isdir(hard_drive_folder):
-        for _, _, files in os.walk(hard_drive_folder):
-            if any([x.endswith(".npy") for x in files]):
-                counter += 1
-    return counter
+    """
+    Counts the recorded containers of a specific person on a specific day.
+
+    Args:
+        day (str, optional): The day to count the containers for. Defaults to today.
+        person_name (str, optional): The name of the person to count the containers for. Defaults to an empty string.
+
+    Returns:
+        int: The amount of recorded containers, counting every stream.
+    """
+    return Catalog().count_windows(day=day, person=person_name)
 
 
 def list_people_in_total() -> List[str]:
@@ -131,17 +139,8 @@ def list_people_in_total() -> List[str]:
     Returns:
         List[str]: A list of all recorded people.
     """
-    all_people = []
-    logging.debug(f"Collect amount of total recorded people from: {storage_path}")
-    if os.path.exists(storage_path):
-        for directory in os.listdir(storage_path):
-            if os.path.isdir(os.path.join(storage_path, directory)):
-                all_people.extend(os.listdir(os.path.join(storage_path, directory)))
-                if env.log_filename in all_people:  # Remove folder that is used for logging
-                    all_people.remove(env.log_filename)
-                elif '.DS_Store' in all_people:  # Remove folder that is used for logging
-                    all_people.remove('.DS_Store')
-    return all_people
+    logging.debug("Collect amount of total recorded people from the catalog.")
+    return Catalog().people()
 
 
 def list_sessions_in_total() -> List[str]:
@@ -149,10 +148,54 @@ def list_sessions_in_total() -> List[str]:
     Lists the total amount of recorded sessions.
 
     Returns:
-        List[str]: A list of all recorded sessions.
+        List[str]: A list with the metadata file of all recorded sessions.
     """
-    logging.debug(f"Collect amount of total sessions from: {storage_path}")
-    return glob.glob(os.path.join(storage_path, "**", env.metadata_file_name), recursive=True)
+    logging.debug("Collect amount of total sessions from the catalog.")
+    return [os.path.join(storage_path, day, person, env.metadata_file_name)
+            for day, person in Catalog().sessions_with_metadata()]
+
+
+def count_days() -> int:
+    """
+    Counts the days recorded.
+
+    Returns:
+        int: The amount of recorded days.
+    """
+    return Catalog().count_days()
+
+
+def count_people_for_a_specific_day(day: str = today) -> int:
+    """
+    Counts the people recorded for a specific day.
+
+    Args:
+        day (str, optional): The day to count people for. Defaults to today.
+
+    Returns:
+        int: The amount of recorded people for the specified day.
+    """
+    return Catalog().count_people(day=day)
+
+
+def count_people_in_total() -> int:
+    """
+    Counts the total amount of recorded people.
+
+    Returns:
+        int: The amount of all recorded people.
+    """
+    return Catalog().count_people()
+
+
+def count_sessions_in_total() -> int:
+    """
+    Counts the total amount of recorded sessions.
+
+    Returns:
+        int: The amount of all recorded sessions.
+    """
+    return Catalog().count_sessions_with_metadata()
 
 
 def create_date_selection_for_saved_sessions() -> dict:
@@ -162,14 +205,7 @@ def create_date_selection_for_saved_sessions() -> dict:
     Returns:
         dict: A dictionary with dates as keys and formatted date strings as values.
     """
-    temp_dates = []
-    dates = list_days()
-
-    for day in dates:
-        if extract_list_of_directories(os.path.join(storage_path, day)):
-            temp_dates.append(day)
-
-    return __create_date_dictionary(dates=temp_dates)
+    return __create_date_dictionary(dates=list_days())
 
 
 def create_date_selection_for_unsaved_sessions() -> dict:
@@ -0,0 +1,248 @@
+"""
+This module provides an append-only container to store the frames of a single trigger window.
+
+A container is a folder with three files:
+    frames.bin: The raw frame data of all frames, written sequentially.
+    index.bin: One fixed size record per frame with sequence number, timestamps, offset and size of the frame data.
+    header.json: The codec, data type and shape of the frames and additional attributes of the recording.
+
+Containers with an encoded codec (h264, h265) hold the bitstream of the device encoder. Their data file is a playable
+elementary stream, and every index record points to the encoded packet of one frame.
+
+Both binary files can be opened with `np.memmap`, which gives random access to any frame without loading the others.
+
+Classes:
+    RecordedFrame: A single frame together with its sequence number and timestamps.
+    ContainerWriter: Appends frames to a container.
+    ContainerReader: Gives random access to the frames of a container.
+
+Functions:
+    is_container: Checks if a folder holds a recording container.
+"""
+
+import json
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from . import os, logging
+
+CONTAINER_DATA_FILE = "frames.bin"
+CONTAINER_INDEX_FILE = "index.bin"
+CONTAINER_HEADER_FILE = "header.json"
+# Written next to the depth frames of a trigger window, see window_manifest
+CONTAINER_MANIFEST_FILE = "manifest.json"
+CONTAINER_FILES = (CONTAINER_DATA_FILE, CONTAINER_INDEX_FILE, CONTAINER_HEADER_FILE, CONTAINER_MANIFEST_FILE)
+CONTAINER_VERSION = 1
+RAW_CODEC = "raw"
+# Folder of every recorded stream and the name of the videos converted from it
+STREAM_OUTPUT_NAMES = {"depth_frames": "depth", "rgb_frames": "rgb"}
+
+INDEX_DTYPE = np.dtype([
+    ("sequence", "<i8"),
+    ("timestamp", "<f8"),
+    ("device_timestamp", "<f8"),
+    ("offset", "<u8"),
+    ("size", "<u8"),
+])
+
+
+class RecordedFrame(NamedTuple):
+    """
+    A single frame together with its sequence number and timestamps.
+
+    Attributes:
+        data (np.ndarray): The frame data.
+        sequence (int): The sequence number assigned by the device.
+        timestamp (float): The capture time mapped to the host clock in seconds since the epoch.
+        device_timestamp (float): The raw capture time on the device clock in seconds.
+    """
+    data: np.ndarray
+    sequence: int
+    timestamp: float
+    device_timestamp: float
+
+
+class ContainerWriter:
+    """
+    Appends frames to a container.
+
+    Frame data is written sequentially to a single file. Index records are collected in chunks and appended to the
+    index file once a chunk is full, so that a window only costs a handful of write calls.
+
+    Attributes:
+        path (str): The folder of the container.
+        codec (str): The codec of the frame data, "raw" for uncompressed frames.
+        chunk_frames (int): The number of index records collected before they are written.
+        frame_count (int): The number of frames appended so far.
+        bytes_written (int): The number of frame data bytes appended so far.
+    """
+
+    def __init__(self, path: str, codec: str = RAW_CODEC, chunk_frames: int = 30):
+        self.path = path
+        self.codec = codec
+        self.chunk_frames = chunk_frames
+        self.frame_count = 0
+        self.bytes_written = 0
+        self._header = None
+        self._chunk = np.zeros(chunk_frames, dtype=INDEX_DTYPE)
+        self._chunk_size = 0
+        os.makedirs(path, exist_ok=True)
+        self._data_file = open(os.path.join(path, CONTAINER_DATA_FILE), "wb", buffering=1024 * 1024)
+        self._index_file = open(os.path.join(path, CONTAINER_INDEX_FILE), "wb")
+
+    def __enter__(self) -> "ContainerWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def append(self, frame: RecordedFrame) -> int:
+        """
+        Appends a frame to the container.
+
+        Args:
+            frame (RecordedFrame): The frame to append.
+
+        Returns:
+            int: The number of bytes written for the frame data.
+        """
+        data = np.ascontiguousarray(frame.data)
+        if self._header is None:
+            self._header = {
+                "version": CONTAINER_VERSION,
+                "codec": self.codec,
+                "dtype": data.dtype.str,
+                "shape": list(data.shape) if self.codec == RAW_CODEC else None,
+                "attributes": {},
+            }
+            self.__write_header()
+
+        self._data_file.write(data.data)
+        self._chunk[self._chunk_size] = (frame.sequence, frame.timestamp, frame.device_timestamp,
+                                         self.bytes_written, data.nbytes)
+        self._chunk_size += 1
+        if self._chunk_size == self.chunk_frames:
+            self.__flush_chunk()
+
+        self.frame_count += 1
+        self.bytes_written += data.nbytes
+        return data.nbytes
+
+    def close(self, attributes: Optional[dict] = None) -> None:
+        """
+        Writes all pending index records and closes the container.
+
+        Args:
+            attributes (Optional[dict]): Additional attributes to store in the header of the container.
+        """
+        if self._data_file.closed:
+            return
+        self.__flush_chunk()
+        self._data_file.close()
+        self._index_file.close()
+        if self._header is not None and attributes:
+            self._header["attributes"].update(attributes)
+            self.__write_header()
+        logging.debug(f"Container closed with {self.frame_count} frames at: {self.path}")
+
+    def __flush_chunk(self) -> None:
+        if self._chunk_size:
+            self._data_file.flush()
+            self._index_file.write(self._chunk[:self._chunk_size].tobytes())
+            self._index_file.flush()
+            self._chunk_size = 0
+
+    def __write_header(self) -> None:
+        with open(os.path.join(self.path, CONTAINER_HEADER_FILE), "w") as file:
+            json.dump(self._header, file)
+
+
+class ContainerReader:
+    """
+    Gives random access to the frames of a container.
+
+    Attributes:
+        path (str): The folder of the container.
+        header (dict): The header of the container.
+        index (np.ndarray): The index records of all complete frames.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, CONTAINER_HEADER_FILE), "r") as file:
+            self.header = json.load(file)
+
+        index_path = os.path.join(path, CONTAINER_INDEX_FILE)
+        records = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+        self.index = np.memmap(index_path, dtype=INDEX_DTYPE, mode="r", shape=(records,)) if records else \
+            np.zeros(0, dtype=INDEX_DTYPE)
+
+        data_path = os.path.join(path, CONTAINER_DATA_FILE)
+        data_size = os.path.getsize(data_path)
+        if records and self.index[-1]["offset"] + self.index[-1]["size"] > data_size:
+            # The last frames were not completely written, e.g. because of a crash
+            self.index = self.index[self.index["offset"] + self.index["size"] <= data_size]
+        self._data = np.memmap(data_path, dtype=np.uint8, mode="r") if data_size else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, position: int) -> np.ndarray:
+        record = self.index[position]
+        offset, size = int(record["offset"]), int(record["size"])
+        frame = self._data[offset:offset + size].view(np.dtype(self.header["dtype"]))
+        return frame if self.encoded else frame.reshape(self.header["shape"])
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """
+        Returns the host timestamps of all frames in seconds since the epoch.
+        """
+        return np.asarray(self.index["timestamp"])
+
+    @property
+    def codec(self) -> str:
+        """
+        Returns the codec of the frame data.
+        """
+        return self.header.get("codec", RAW_CODEC)
+
+    @property
+    def encoded(self) -> bool:
+        """
+        Returns True if the container holds an encoded bitstream instead of raw frames.
+        """
+        return self.codec != RAW_CODEC
+
+    @property
+    def data_path(self) -> str:
+        """
+        Returns the path of the frame data file.
+        """
+        return os.path.join(self.path, CONTAINER_DATA_FILE)
+
+    @property
+    def attributes(self) -> dict:
+        """
+        Returns the additional attributes stored in the header.
+        """
+        return self.header.get("attributes", {})
+
+
+def is_container(path: str) -> bool:
+    """
+    Checks if a folder holds a recording container.
+
+    Args:
+        path (str): The folder to check.
+
+    Returns:
+        bool: True if the folder holds a container, False otherwise.
+    """
+    return os.path.isfile(os.path.join(path, CONTAINER_HEADER_FILE)) and \
+        os.path.isfile(os.path.join(path, CONTAINER_INDEX_FILE))
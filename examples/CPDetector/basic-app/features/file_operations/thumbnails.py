@@ -0,0 +1,298 @@
+"""
+This module provides a disk cache of thumbnails for the session browser.
+
+For every trigger window a poster frame and a contact sheet are rendered in the background, as soon as a session is
+committed to the main storage or a window has been converted. Both images are stored in a hidden folder of the main
+storage, keyed by the path, modification time and size of their source, so a changed source is rendered again. The
+least recently used images are evicted once the cache exceeds its disk budget.
+
+Classes:
+    ThumbnailCache: Renders and caches the poster frames and contact sheets of recorded trigger windows.
+
+Functions:
+    list_preview_sources: Lists the recording of every trigger window of a participant that thumbnails are made of.
+"""
+
+import hashlib
+import queue
+import threading
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from features.file_operations.recording_container import CONTAINER_DATA_FILE, ContainerReader, STREAM_OUTPUT_NAMES, \
+    is_container
+from . import os, logging, storage_path, env
+
+THUMBNAIL_FOLDER = ".thumbnails"
+POSTER_WIDTH = 320
+SHEET_TILE_WIDTH = 160
+SHEET_COLUMNS = 4
+SHEET_ROWS = 2
+JPEG_QUALITY = 80
+# Stream whose recordings are shown in the session browser, the depth stream is used if it is missing
+PREVIEW_STREAMS = ("rgb_frames", "depth_frames")
+
+
+class ThumbnailCache:
+    """
+    Renders and caches the poster frames and contact sheets of recorded trigger windows.
+
+    The images are rendered by a single background thread, so browsing never waits for a recording to be decoded.
+    Looking up an image marks it as used, which decides the order of the eviction.
+
+    Attributes:
+        _instance (ThumbnailCache): Singleton instance of the ThumbnailCache class.
+        path (str): The folder of the cached images.
+        budget (int): The largest size of the cache in bytes.
+        _queue (queue.Queue): The recordings waiting to be rendered.
+        _pending (set): The recordings which are queued or being rendered.
+        _lock (threading.Lock): Guards the pending recordings and the start of the thread.
+        _thread (threading.Thread): Renders the queued recordings.
+    """
+    _instance = None
+    path = None
+    budget = 0
+    _queue = None
+    _pending = None
+    _lock = None
+    _thread = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate thumbnail cache instance.")
+            cls._instance = super(ThumbnailCache, cls).__new__(cls)
+            cls.path = os.path.join(storage_path, THUMBNAIL_FOLDER)
+            cls.budget = int(env.thumbnail_cache_mb * 1024 * 1024)
+            cls._queue = queue.Queue()
+            cls._pending = set()
+            cls._lock = threading.Lock()
+        return cls._instance
+
+    def lookup(self, source: str) -> Optional[Tuple[str, str]]:
+        """
+        Returns the cached images of a recording and queues the recording if they don't exist yet.
+
+        Args:
+            source (str): The path of the video or container.
+
+        Returns:
+            Optional[Tuple[str, str]]: The paths of the poster frame and the contact sheet, None if they are not ready.
+        """
+        images = self.__images(source)
+        if images is None:
+            return None
+        if all(os.path.isfile(image) for image in images):
+            for image in images:
+                os.utime(image)
+            return images
+        self.request(source)
+        return None
+
+    def request(self, source: str) -> None:
+        """
+        Queues a recording to be rendered, unless its images are already cached or queued.
+
+        Args:
+            source (str): The path of the video or container.
+        """
+        images = self.__images(source)
+        if images is None or all(os.path.isfile(image) for image in images):
+            return
+        with self._lock:
+            if source in self._pending:
+                return
+            self._pending.add(source)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.__run, name="thumbnails", daemon=True)
+                self._thread.start()
+        self._queue.put(source)
+
+    def request_participant(self, day: str, person: str) -> None:
+        """
+        Queues all trigger windows of a participant to be rendered.
+
+        Args:
+            day (str): The day of the participant.
+            person (str): The participant.
+        """
+        for _, source in list_preview_sources(day, person):
+            self.request(source)
+
+    def __run(self) -> None:
+        while True:
+            source = self._queue.get()
+            try:
+                self.__render(source)
+                self.__evict()
+            except Exception as e:
+                logging.warning(f"Thumbnails of {source} couldn't be rendered: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(source)
+
+    def __render(self, source: str) -> None:
+        images = self.__images(source)
+        if images is None:  # Removed in the meantime
+            return
+        frames = _sample_frames(source, SHEET_COLUMNS * SHEET_ROWS)
+        if not frames:
+            logging.warning(f"No frames to render thumbnails of: {source}")
+            return
+
+        poster = _resize(frames[len(frames) // 2], POSTER_WIDTH)
+        tiles = [_resize(frame, SHEET_TILE_WIDTH) for frame in frames]
+        tiles += [np.zeros_like(tiles[0])] * (SHEET_COLUMNS * SHEET_ROWS - len(tiles))
+        sheet = np.vstack([np.hstack(tiles[row * SHEET_COLUMNS:(row + 1) * SHEET_COLUMNS])
+                           for row in range(SHEET_ROWS)])
+
+        os.makedirs(self.path, exist_ok=True)
+        for image, path in zip((poster, sheet), images):
+            temporary = f"{path}.tmp.jpg"
+            cv2.imwrite(temporary, image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+            os.replace(temporary, path)
+        logging.debug(f"Rendered thumbnails of: {source}")
+
+    def __evict(self) -> None:
+        # The poster frame and the contact sheet of a recording are evicted together
+        entries = {}
+        for name in os.listdir(self.path):
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except FileNotFoundError:
+                continue
+            key = name.split("_", 1)[0]
+            used, size, names = entries.get(key, (0.0, 0, []))
+            entries[key] = (max(used, stat.st_mtime), size + stat.st_size, names + [name])
+        size = sum(entry[1] for entry in entries.values())
+        for _, entry_size, names in sorted(entries.values()):
+            if size <= self.budget:
+                break
+            for name in names:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    pass
+            size -= entry_size
+            logging.debug(f"Evicted thumbnails: {names}")
+
+    def __images(self, source: str) -> Optional[Tuple[str, str]]:
+        key = _cache_key(source)
+        if key is None:
+            return None
+        return os.path.join(self.path, f"{key}_poster.jpg"), os.path.join(self.path, f"{key}_sheet.jpg")
+
+
+def list_preview_sources(day: str, person: str) -> List[Tuple[str, str]]:
+    """
+    Lists the recording of every trigger window of a participant that thumbnails are made of.
+
+    The converted video of a window is preferred; windows which haven't been converted yet use their container.
+
+    Args:
+        day (str): The day of the participant.
+        person (str): The participant.
+
+    Returns:
+        List[Tuple[str, str]]: The name of every window together with the path of its video or container.
+    """
+    participant = os.path.join(storage_path, day, person)
+    for stream in PREVIEW_STREAMS:
+        stream_path = os.path.join(participant, stream)
+        if not os.path.isdir(stream_path):
+            continue
+        sources = []
+        for window in sorted(os.listdir(stream_path)):
+            video = os.path.join(participant, f"{STREAM_OUTPUT_NAMES[stream]}_{window}.mp4")
+            sources.append((window, video if os.path.isfile(video) else os.path.join(stream_path, window)))
+        return sources
+    return []
+
+
+def _cache_key(source: str) -> Optional[str]:
+    """
+    Helper function which derives the cache key of a recording from its path, modification time and size.
+
+    Args:
+        source (str): The path of the video or container.
+
+    Returns:
+        Optional[str]: The cache key, None if the recording doesn't exist.
+    """
+    try:
+        stat = os.stat(os.path.join(source, CONTAINER_DATA_FILE) if is_container(source) else source)
+    except OSError:
+        return None
+    identity = f"{os.path.relpath(source, storage_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    return hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()
+
+
+def _sample_frames(source: str, count: int) -> List[np.ndarray]:
+    """
+    Helper function which reads frames evenly spread over a recording.
+
+    Args:
+        source (str): The path of the video or container.
+        count (int): The number of frames to read.
+
+    Returns:
+        List[np.ndarray]: The frames as BGR images.
+    """
+    if is_container(source):
+        recording = ContainerReader(source)
+        if not recording.encoded:
+            positions = np.linspace(0, len(recording) - 1, min(count, len(recording))).astype(int)
+            return [_to_bgr(recording[position]) for position in positions]
+        source = recording.data_path
+
+    capture = cv2.VideoCapture(source)
+    frames = []
+    try:
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if total > 0:
+            for position in np.linspace(0, total - 1, min(count, total)).astype(int):
+                capture.set(cv2.CAP_PROP_POS_FRAMES, int(position))
+                success, frame = capture.read()
+                if success:
+                    frames.append(frame)
+        else:
+            # The frame count of a plain bitstream is unknown, so the frames are read from the start
+            success, frame = capture.read()
+            while success and len(frames) < count:
+                frames.append(frame)
+                success, frame = capture.read()
+    finally:
+        capture.release()
+    return frames
+
+
+def _to_bgr(frame: np.ndarray) -> np.ndarray:
+    """
+    Helper function which turns a raw color or depth frame into a displayable BGR image.
+
+    Args:
+        frame (np.ndarray): The raw frame of a container.
+
+    Returns:
+        np.ndarray: The BGR image, depth frames are colored with a color map.
+    """
+    if frame.ndim == 3:
+        return np.ascontiguousarray(frame)
+    scaled = cv2.normalize(frame, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    return cv2.applyColorMap(scaled, cv2.COLORMAP_JET)
+
+
+def _resize(frame: np.ndarray, width: int) -> np.ndarray:
+    """
+    Helper function which scales a frame to a width, keeping its aspect ratio with an even height.
+
+    Args:
+        frame (np.ndarray): The frame to scale.
+        width (int): The width of the result.
+
+    Returns:
+        np.ndarray: The scaled frame.
+    """
+    height = max(2, round(frame.shape[0] * width / frame.shape[1] / 2) * 2)
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
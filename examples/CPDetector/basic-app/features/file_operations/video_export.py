@@ -0,0 +1,180 @@
+"""
+This module provides an export engine which encodes frames into a video file in a single pass.
+
+Raw frames are streamed over a pipe into one ffmpeg process, so every frame is encoded exactly once. The video is
+written under a partial name and only renamed once ffmpeg succeeded, so an existing video is always complete.
+
+Classes:
+    ExportProfile: Describes the encoder settings of an export.
+    ExportResult: Summarizes a finished export.
+    VideoExporter: Streams raw frames into an ffmpeg process.
+
+Functions:
+    finish_partial: Renames the partial video written by ffmpeg to its final name, or removes it if ffmpeg failed.
+
+Attributes:
+    EXPORT_PROFILES (dict): The available export profiles by name.
+    PARTIAL_SUFFIX (str): Appended to the name of a video while it is written.
+"""
+
+import subprocess
+import time
+
+import numpy as np
+from pydantic import BaseModel
+
+from . import os, logging
+
+
+class ExportProfile(BaseModel):
+    """
+    Describes the encoder settings of an export.
+
+    The settings only use the software encoder, so an export looks the same on every machine.
+
+    Attributes:
+        codec (str): The ffmpeg video encoder.
+        preset (str): The speed preset of the encoder.
+        crf (int): The constant rate factor, lower values give a higher quality.
+        pixel_format (str): The pixel format of the resulting video.
+    """
+    codec: str = "libx264"
+    preset: str = "medium"
+    crf: int = 23
+    pixel_format: str = "yuv420p"
+
+
+class ExportResult(BaseModel):
+    """
+    Summarizes a finished export.
+
+    Attributes:
+        output_file (str): The path to the exported video.
+        frames (int): The number of exported frames.
+        seconds (float): The time the export took.
+        success (bool): Whether ffmpeg finished without errors.
+    """
+    output_file: str
+    frames: int
+    seconds: float
+    success: bool
+
+    @property
+    def fps(self) -> float:
+        """
+        Returns the export throughput in frames per second.
+        """
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+
+PARTIAL_SUFFIX = ".part"
+
+EXPORT_PROFILES = {
+    "fast": ExportProfile(preset="veryfast", crf=26),
+    "balanced": ExportProfile(preset="medium", crf=23),
+    "archive": ExportProfile(preset="slow", crf=18),
+}
+
+
+class VideoExporter:
+    """
+    Streams raw frames into an ffmpeg process.
+
+    Attributes:
+        output_file (str): The path to the exported video.
+        width (int): The width of the frames.
+        height (int): The height of the frames.
+        fps (float): The frame rate of the video.
+        profile (ExportProfile): The encoder settings.
+        input_pixel_format (str): The pixel format of the frames written to the exporter.
+    """
+
+    def __init__(self, output_file: str, width: int, height: int, fps: float, profile: ExportProfile,
+                 input_pixel_format: str = "bgr24"):
+        self.output_file = output_file
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.profile = profile
+        self.input_pixel_format = input_pixel_format
+        self._process = None
+        self._frames = 0
+        self._start = None
+
+    def __enter__(self) -> "VideoExporter":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Starts the ffmpeg process.
+        """
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", self.input_pixel_format, "-s", f"{self.width}x{self.height}",
+            "-framerate", f"{self.fps:.3f}", "-i", "-",
+            "-c:v", self.profile.codec, "-preset", self.profile.preset, "-crf", str(self.profile.crf),
+            "-pix_fmt", self.profile.pixel_format, "-movflags", "+faststart",
+            "-f", "mp4", f"{self.output_file}{PARTIAL_SUFFIX}",
+        ]
+        self._start = time.perf_counter()
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        logging.debug(f"Started export to: {self.output_file}")
+
+    def write(self, frame: np.ndarray) -> None:
+        """
+        Writes a single frame to the ffmpeg process.
+
+        Args:
+            frame (np.ndarray): The frame, matching the configured size and input pixel format.
+        """
+        self._process.stdin.write(np.ascontiguousarray(frame).data)
+        self._frames += 1
+
+    def close(self) -> ExportResult:
+        """
+        Finishes the export and waits for ffmpeg to write the video.
+
+        Returns:
+            ExportResult: The summary of the export.
+        """
+        if self._process is None:
+            return ExportResult(output_file=self.output_file, frames=0, seconds=0, success=False)
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        return_code = self._process.wait()
+        self._process = None
+        result = ExportResult(output_file=self.output_file, frames=self._frames,
+                              seconds=time.perf_counter() - self._start,
+                              success=finish_partial(self.output_file, return_code == 0))
+        logging.info(f"Exported {result.frames} frames to {os.path.basename(self.output_file)} "
+                     f"at {result.fps:.1f} FPS.")
+        return result
+
+
+def finish_partial(output_file: str, success: bool) -> bool:
+    """
+    Renames the partial video written by ffmpeg to its final name, or removes it if ffmpeg failed.
+
+    Args:
+        output_file (str): The final path of the video.
+        success (bool): Whether ffmpeg finished without errors.
+
+    Returns:
+        bool: True if the video is complete under its final name, False otherwise.
+    """
+    partial = f"{output_file}{PARTIAL_SUFFIX}"
+    try:
+        if success:
+            os.replace(partial, output_file)
+        elif os.path.isfile(partial):
+            os.remove(partial)
+    except OSError as e:
+        logging.error(f"Partial video {partial} couldn't be finished: {e}")
+        return False
+    return success
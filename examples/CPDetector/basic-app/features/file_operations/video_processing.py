@@ -4,87 +4,119 @@ This module provides functions to process and convert video files.
 It defines functions to convert individual videos and format time differences.
 
 Functions:
+    convert_recording_to_video: Converts the frames of a recording container into a video file.
     convert_individual_videos: Converts individual video files for a specific day and person.
-    convert_videos: Converts a video file based on the specified time window.
+    remux_bitstream: Wraps an encoded elementary stream into an mp4 container without re-encoding it.
+    count_video_frames: Counts the frames of a video file with ffprobe.
     __format_timedelta: Helper function to format a timedelta object into a string.
 """
 
 import logging
 import os
 import subprocess
-from datetime import datetime
+from typing import Optional
 
 import cv2
 import numpy as np
 
+from features.file_operations.recording_container import ContainerReader, is_container
+from features.file_operations.video_export import VideoExporter, EXPORT_PROFILES, PARTIAL_SUFFIX, finish_partial
 from utils.parser import ENVParser
 
 env = ENVParser()
 
 
-def convert_npy_files_to_video(path_of_frames: str, subfolder: str, output_name: str, depth: bool) -> bool:
+def convert_recording_to_video(path_of_frames: str, subfolder: str, output_name: str, depth: bool) -> bool:
+    """
+    Converts the frames of a recording container into a video file.
+
+    Args:
+        path_of_frames (str): The folder holding the containers of all trigger windows.
+        subfolder (str): The container of the trigger window to convert.
+        output_name (str): The name of the resulting video, without extension.
+        depth (bool): Whether the container holds depth frames that need to be colorized.
+
+    Returns:
+        bool: True if the video has been written or there was nothing to convert, False if the conversion failed.
+    """
     subfolder_path = os.path.join(path_of_frames, subfolder)
-    if os.path.isdir(subfolder_path):
-        npy_files = [f for f in os.listdir(subfolder_path) if f.endswith('.npy')]
-        npy_files.sort(key=lambda x: datetime.strptime(x.split('.')[0], "%Y%m%d_%H%M%S%f"))
+    if is_container(subfolder_path):
+        recording = ContainerReader(subfolder_path)
+        if len(recording) == 0:
+            return True
+
         # Calculate FPS from timestamps
-        timestamps = [datetime.strptime(f.split('.')[0], "%Y%m%d_%H%M%S%f") for f in npy_files]
-        time_diffs = [(timestamps[i] - timestamps[i - 1]).total_seconds() for i in range(1, len(timestamps))]
-        avg_time_diff = sum(time_diffs) / len(time_diffs)
+        time_diffs = np.diff(recording.timestamps)
+        avg_time_diff = float(time_diffs.mean()) if len(time_diffs) else 0
         fps = 1 / avg_time_diff if avg_time_diff > 0 else 30  # Default to 30 FPS if avg_time_diff is 0
-        # fps = 30
 
         print(f"Number of FPS: {fps}")
 
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # You can use other codecs like 'XVID'
+        if recording.encoded:
+            # The bitstream was encoded on the device and only needs to be wrapped into an mp4 container
+            return remux_bitstream(recording.data_path, recording.codec, fps,
+                                   os.path.join(path_of_frames, "..", f"{output_name}_{subfolder}.mp4"))
 
-        # Write each frame to the video
+        # Stream the frames into a single ffmpeg process, so every frame is encoded exactly once
+        height, width = recording[0].shape[:2]
+        exporter = VideoExporter(os.path.join(path_of_frames, "..", f"{output_name}_{subfolder}.mp4"), width, height,
+                                 fps, EXPORT_PROFILES.get(env.export_profile, EXPORT_PROFILES["balanced"]))
+        exporter.start()
         try:
-            path = os.path.join(path_of_frames, "..", f"{output_name}.mp4")
-            frame = np.load(os.path.join(subfolder_path, npy_files[0]))
-            if depth:
-                height, width = frame.shape
-                video = cv2.VideoWriter(path, fourcc, fps, (width, height), isColor=True)
-
-                for npy_file in npy_files:
-                    frame = np.load(os.path.join(subfolder_path, npy_file))
+            for frame in recording:
+                if depth:
                     frame = cv2.normalize(frame, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
-                    map_frame = cv2.applyColorMap(frame, cv2.COLORMAP_JET)
-                    video.write(map_frame)
-            else:
-                height, width, channel = frame.shape
-                video = cv2.VideoWriter(path, fourcc, fps, (width, height), isColor=True)
-
-                for npy_file in npy_files:
-                    frame = np.load(os.path.join(subfolder_path, npy_file))
-                    video.write(frame)
-
-            video.release()
-            convert_videos(path, os.path.join(path_of_frames, "..", f"{output_name}_{subfolder}.mp4"))
-            os.remove(path)
-            print("Video conversions complete.")
-        except EOFError:
-            pass
+                    frame = cv2.applyColorMap(frame, cv2.COLORMAP_JET)
+                exporter.write(frame)
+        except BrokenPipeError:
+            logging.error(f"ffmpeg stopped unexpectedly while exporting: {subfolder_path}")
+        result = exporter.close()
+        print(f"Video conversion complete with {result.fps:.1f} FPS.")
+        return result.success
 
     return True
 
 
-def convert_videos(input_file: str, output_file: str) -> bool:
+def remux_bitstream(input_file: str, codec: str, fps: float, output_file: str) -> bool:
     """
-    Converts a video file based on the specified time window.
+    Wraps an encoded elementary stream into an mp4 container without re-encoding it.
 
     Args:
-        input_file (str): The path to the input video file.
+        input_file (str): The path to the elementary stream.
+        codec (str): The codec of the elementary stream, h264 or h265.
+        fps (float): The frame rate of the stream.
         output_file (str): The path to the output video file.
 
     Returns:
         bool: True if the conversion was successful, False otherwise.
     """
+    input_format = "hevc" if codec == "h265" else codec
+    command = ["ffmpeg", "-framerate", f"{fps:.3f}", "-f", input_format, "-i", input_file, "-c:v", "copy",
+               "-f", "mp4", f"{output_file}{PARTIAL_SUFFIX}", "-y"]
+    result = subprocess.run(command)
+    logging.debug(f"Completed remuxing for: {input_file}")
+    return finish_partial(output_file, result.returncode == 0)
 
-    command = ["ffmpeg", "-i", input_file, "-c:v", "libx264", output_file, "-y"]
-    subprocess.run(command)
-    logging.debug(f"Completed conversion for: {input_file}")
-    return True
+
+def count_video_frames(video_file: str) -> Optional[int]:
+    """
+    Counts the frames of a video file with ffprobe. Only the packets are counted, the frames aren't decoded.
+
+    Args:
+        video_file (str): The path to the video file.
+
+    Returns:
+        Optional[int]: The number of frames of the first video stream, None if the video couldn't be read.
+    """
+    command = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-count_packets",
+               "-show_entries", "stream=nb_read_packets", "-of", "csv=p=0", video_file]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except OSError as e:
+        logging.warning(f"Frames of {video_file} couldn't be counted: {e}")
+        return None
+    output = result.stdout.strip()
+    return int(output) if result.returncode == 0 and output.isdigit() else None
 
 
 def convert_individual_videos(day, person):
@@ -100,16 +132,15 @@ def convert_individual_videos(day, person):
     """
     input_path = str(os.path.join(env.main_path, env.temp_path, day, person))
 
-    # Create videos before conversion
-    for subfolder in os.listdir(os.path.join(input_path, "depth_frames")):
-        yield convert_npy_files_to_video(os.path.join(input_path, "depth_frames"), subfolder, "depth", True)
-    for subfolder in os.listdir(os.path.join(input_path, "rgb_frames")):
-        yield convert_npy_files_to_video(os.path.join(input_path, "rgb_frames"), subfolder, "rgb", False)
+    # Create videos before conversion, sessions of the depth-only capture profile have no rgb frames
+    for stream, name, is_depth in (("depth_frames", "depth", True), ("rgb_frames", "rgb", False)):
+        stream_path = os.path.join(input_path, stream)
+        if not os.path.isdir(stream_path):
+            continue
+        for subfolder in os.listdir(stream_path):
+            yield convert_recording_to_video(stream_path, subfolder, name, is_depth)
 
 
 if "__main__" == __name__:
-    convert_npy_files_to_video(
-        "/Users/johnuroko/Documents/Repos/Private/OakDVideoRecorder/Videorecording/20250128/depth_frames", "depth",
-        True)
-    convert_npy_files_to_video(
-        "/Users/johnuroko/Documents/Repos/Private/OakDVideoRecorder/Videorecording/20250128/rgb_frames", "rgb", False)
+    for _ in convert_individual_videos("20250128", "test"):
+        pass
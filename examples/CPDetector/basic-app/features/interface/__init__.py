@@ -3,6 +3,9 @@ This package handles the interface operations for the application.
 
 Modules:
     card_values: Manages the card values operations including displaying and updating card values.
+    conversion_progress: Displays the progress of the background conversion jobs.
+    health_panel: Displays the frame rates, writer backlog and load of the device and host.
+    live_preview: Streams the live preview of the camera to the browser.
     modal_remover: Manages the modal remover operations including displaying and removing modals.
     session_manager: Manages the session view operations including displaying recorded sessions, updating selectors, and displaying buttons and recordings.
     sidebar_buttons: Manages the sidebar button operations including save, delete, and cancel buttons.
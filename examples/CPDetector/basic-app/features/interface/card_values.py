@@ -13,6 +13,7 @@ import logging
 
 from shiny import render, reactive
 
+from features.file_operations.catalog import Catalog
 from features.modules.ui_state import UIState
 
 
@@ -29,6 +30,7 @@ class CardValues:
         self.recorded_days()
         self.current_time()
         self.current_day()
+        self.catalog_changes()
 
     def recorded_user(self):
         """
@@ -107,3 +109,19 @@ class CardValues:
         def current_day() -> str:
             logging.debug("Render text: Collect text field for: current day.")
             return datetime.datetime.now().strftime("%d-%m-%Y")
+
+    def catalog_changes(self):
+        """
+        Updates the card values whenever the recording catalog has changed, e.g. by the catalog watcher.
+        """
+        catalog = Catalog()
+
+        @reactive.poll(lambda: catalog.version, 1)
+        def catalog_version() -> int:
+            return catalog.version
+
+        @reactive.Effect
+        @reactive.event(catalog_version, ignore_init=True)
+        def _():
+            logging.debug("Catalog has changed, updating the card values.")
+            self.ui_state.update_ui()
@@ -0,0 +1,65 @@
+"""
+This module handles the display of background conversion jobs for the application.
+
+Classes:
+    ConversionProgress: Displays the progress of every conversion job.
+"""
+
+import logging
+
+from shiny import render, reactive, ui
+
+from features.modules.conversion_service import ConversionService
+
+STATUS_CLASSES = {
+    "pending": "bg-secondary",
+    "running": "bg-warning",
+    "done": "bg-success",
+    "failed": "bg-danger",
+}
+
+
+class ConversionProgress:
+    """
+    Displays the progress of every conversion job.
+    """
+    service = ConversionService()
+
+    def __init__(self):
+        self.conversion_jobs()
+
+    def conversion_jobs(self):
+        """
+        Displays a progress bar for every conversion job.
+
+        Returns:
+            ui: The UI elements showing the conversion jobs.
+        """
+
+        @render.ui
+        def conversion_jobs():
+            reactive.invalidate_later(1)
+            jobs = self.service.jobs
+            if not jobs:
+                return None
+            logging.debug("Render UI: Display conversion jobs.")
+            rows = [ui.markdown("##### Conversions")]
+            for job in jobs:
+                percent = int(job.progress * 100)
+                rows.append(
+                    ui.layout_columns(
+                        ui.p(job.key),
+                        ui.div(
+                            ui.div(
+                                f"{percent}%",
+                                class_=f"progress-bar {STATUS_CLASSES.get(job.status, 'bg-info')}",
+                                role="progressbar",
+                                style=f"width: {percent}%",
+                            ),
+                            class_="progress",
+                        ),
+                        ui.p(f"{job.status} ({len(job.completed)}/{job.total})", class_="right-aligned"),
+                        col_widths={"xs": (3, 6, 3)},
+                    )
+                )
+            return rows
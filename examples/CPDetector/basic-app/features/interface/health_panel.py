@@ -0,0 +1,88 @@
+"""
+This module handles the display of the recording pipeline health for the application.
+
+Classes:
+    HealthPanel: Displays the frame rates, writer backlog and load of the device and host.
+
+Functions:
+    _format: Helper function which formats an optional value with its unit.
+"""
+
+import logging
+from typing import Optional
+
+from shiny import render, reactive, ui
+
+from features.modules.pipeline_health import PipelineHealth
+
+STREAM_NAMES = {"video": "Color", "disparity": "Depth"}
+
+
+class HealthPanel:
+    """
+    Displays the frame rates, writer backlog and load of the device and host.
+
+    The panel only depends on the version of the shared health snapshot, so it is rendered once per sample no matter
+    how often the pipeline reports.
+    """
+    health = PipelineHealth()
+
+    def __init__(self):
+        self.pipeline_health()
+
+    def pipeline_health(self):
+        """
+        Displays the latest snapshot of the pipeline health and its warnings.
+
+        Returns:
+            ui: The UI elements showing the pipeline health.
+        """
+        health = self.health
+
+        @reactive.poll(lambda: health.version, health.interval)
+        def health_version() -> int:
+            return health.version
+
+        @render.ui
+        def pipeline_health():
+            health_version()
+            snapshot = health.snapshot
+            if not snapshot.timestamp:
+                return None
+            logging.debug("Render UI: Display pipeline health.")
+            fps = ", ".join(f"{STREAM_NAMES.get(stream, stream)} {value:.1f}"
+                            for stream, value in sorted(snapshot.capture_fps.items())) or "-"
+            if snapshot.target_fps:
+                fps += f" (of {snapshot.target_fps})"
+            rows = [
+                ("Capture fps", fps),
+                ("Writer backlog", f"{snapshot.writer_backlog}/{snapshot.writer_capacity} frame pairs, "
+                                   f"{snapshot.writer_dropped} dropped" if snapshot.writer_capacity else "-"),
+                ("Disk writes", f"{snapshot.disk_write_mb_per_second:.1f} MB/s"),
+                ("Host CPU", _format(snapshot.host_cpu_percent, "%")),
+                ("Device temperature", _format(snapshot.device_temperature, "°C")),
+                ("Device CPU", f"CSS {_format(snapshot.device_css_cpu_percent, '%')}, "
+                               f"MSS {_format(snapshot.device_mss_cpu_percent, '%')}"),
+                ("Device DDR", f"{_format(snapshot.device_ddr_used_mb, '')} of "
+                               f"{_format(snapshot.device_ddr_total_mb, ' MB')}"),
+            ]
+            elements = [ui.markdown("##### Pipeline health")]
+            elements += [ui.layout_columns(ui.p(name), ui.p(value, class_="right-aligned"), col_widths={"xs": (4, 8)})
+                         for name, value in rows]
+            for warning in snapshot.warnings:
+                elements.append(ui.div(warning, class_="alert alert-warning py-1 my-1"))
+            return elements
+
+
+def _format(value: Optional[float], unit: str) -> str:
+    """
+    Helper function which formats an optional value with its unit.
+
+    Args:
+        value (Optional[float]): The value, None if it is unknown.
+        unit (str): The unit appended to the value.
+
+    Returns:
+        str: The value with one decimal and its unit, "-" if the value is unknown.
+    """
+    return "-" if value is None else f"{value:.1f}{unit}"
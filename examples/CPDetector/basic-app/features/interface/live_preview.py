@@ -0,0 +1,114 @@
+"""
+This module serves the live preview of the camera to the browser.
+
+The preview is streamed as MJPEG (multipart/x-mixed-replace), which every browser shows in a plain image tag. Each
+viewer chooses its frame rate up to the configured maximum; frames are skipped for slower viewers instead of being
+queued. The image tags are only rendered in view mode, so no stream stays open while recording.
+
+Classes:
+    LivePreview: Displays the live preview while the camera is in view mode.
+
+Functions:
+    preview_endpoint: Streams the preview of a camera stream to a single viewer.
+    preview_image: Creates the image tag showing the preview of a camera stream.
+"""
+
+import asyncio
+import logging
+import math
+
+from shiny import render, ui
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+
+from features.modules.preview_hub import PreviewHub
+
+PREVIEW_STREAMS = ("video", "disparity")
+BOUNDARY = "frame"
+
+
+class LivePreview:
+    """
+    Displays the live preview while the camera is in view mode.
+
+    Args:
+        input: The input object for the server.
+    """
+    input = None
+
+    def __init__(self, input):
+        self.input = input
+        self.live_preview()
+
+    def live_preview(self):
+        """
+        Displays the preview of both streams in view mode and removes it in record mode, which closes the streams.
+
+        Returns:
+            ui: The image tags of the preview, None in record mode.
+        """
+
+        @render.ui
+        def live_preview():
+            if self.input.switch_mode.get():
+                logging.debug("Render UI: Remove live preview.")
+                return None
+            logging.debug("Render UI: Display live preview.")
+            return ui.layout_columns(*(preview_image(stream) for stream in PREVIEW_STREAMS))
+
+
+async def preview_endpoint(request: Request):
+    """
+    Streams the preview of a camera stream to a single viewer.
+
+    Args:
+        request (Request): The request with the stream name in the path and an optional fps query parameter.
+
+    Returns:
+        Response: The MJPEG stream, or an error if the stream is unknown or too many viewers are connected.
+    """
+    hub = PreviewHub()
+    stream = request.path_params["stream"]
+    if stream not in PREVIEW_STREAMS:
+        return PlainTextResponse(f"Unknown preview stream: {stream}", status_code=404)
+    try:
+        fps = float(request.query_params.get("fps", hub.max_fps))
+    except ValueError:
+        return PlainTextResponse("The fps parameter has to be a number.", status_code=400)
+    # nan passes every comparison and would disable the rate limit
+    if not math.isfinite(fps) or fps <= 0:
+        return PlainTextResponse("The fps parameter has to be a positive number.", status_code=400)
+    fps = min(fps, hub.max_fps)
+    if not hub.join(stream):
+        return PlainTextResponse("Too many viewers are connected.", status_code=503)
+    logging.info(f"Viewer connected to the {stream} preview with {fps} fps ({hub.viewers(stream)} viewers).")
+
+    async def frames():
+        last_sequence = None
+        try:
+            while True:
+                latest = hub.latest(stream)
+                if latest is not None and latest[0] != last_sequence:
+                    last_sequence, data = latest
+                    yield (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(data)}\r\n\r\n"
+                           .encode() + data + b"\r\n")
+                await asyncio.sleep(1 / fps)
+        finally:
+            hub.leave(stream)
+            logging.info(f"Viewer disconnected from the {stream} preview.")
+
+    return StreamingResponse(frames(), media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+
+
+def preview_image(stream: str, fps: float = 10) -> ui.Tag:
+    """
+    Creates the image tag showing the preview of a camera stream.
+
+    Args:
+        stream (str): The name of the stream, video or disparity.
+        fps (float): The frame rate requested for this viewer.
+
+    Returns:
+        ui.Tag: The image tag.
+    """
+    return ui.tags.img(src=f"/preview/{stream}?fps={fps}", alt=f"Live {stream} preview", style="width: 100%;")
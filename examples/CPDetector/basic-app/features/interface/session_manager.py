@@ -3,15 +3,27 @@ This module handles the session view operations for the application.
 
 Classes:
     SessionManager: Manages the session view operations including displaying recorded sessions, updating selectors, and displaying buttons and recordings.
+
+Functions:
+    _asset_url: Helper function which returns the URL of a file in the main storage.
+    _manifest_summary: Helper function which summarizes the manifest of a trigger window for its card.
 """
 
 import logging
+import os
+from typing import Optional
 
 from shiny import render, reactive, ui
 
 from features.file_operations.read import list_people_for_a_specific_day, list_sessions_for_a_specific_person, \
     create_date_selection_for_saved_sessions
+from features.file_operations.thumbnails import ThumbnailCache, list_preview_sources
 from features.modules.ui_state import UIState
+from features.modules.window_manifest import WindowManifest, read_window_manifest
+from utils.parser import ENVParser
+
+# Seconds until the thumbnails which are still being rendered are looked up again
+THUMBNAIL_REFRESH_SECONDS = 2
 
 
 class SessionManager:
@@ -31,6 +43,7 @@ class SessionManager:
         self.update_date_selector()
         self.update_people_selector()
         self.display_buttons()
+        self.display_thumbnails()
         self.show_video_radio_buttons()
         self.display_recording()
 
@@ -177,6 +190,47 @@ class SessionManager:
 
             return buttons
 
+    def display_thumbnails(self):
+        """
+        Displays the contact sheets of the trigger windows of the selected dataset.
+
+        Contact sheets which are still being rendered are shown as soon as they are ready. Windows whose manifest lists
+        problems, e.g. dropped frames, are flagged, so they can be found without playing their videos.
+        """
+
+        @render.ui
+        def display_thumbnails():
+            datasets = self.input.people_selector.get()
+            if not self.session_view_state.get() or not datasets or len(datasets) != 1:
+                return None
+            cache = ThumbnailCache()
+            cards = []
+            pending = False
+            flagged = 0
+            for window, source in list_preview_sources(self.input.date_selector.get(), datasets[0]):
+                images = cache.lookup(source)
+                title = window if source.endswith(".mp4") else f"{window} (not converted)"
+                manifest = read_window_manifest(self.input.date_selector.get(), datasets[0], window)
+                if manifest is not None and manifest.problems:
+                    flagged += 1
+                    title = f"⚠ {title}"
+                if images is None:
+                    pending = True
+                    content = ui.markdown("*Preview is being rendered...*")
+                else:
+                    content = ui.tags.img(src=_asset_url(images[1]), alt=f"Contact sheet of {window}",
+                                          style="width: 100%;")
+                cards.append(ui.card(ui.card_header(title), content, _manifest_summary(manifest)))
+            if pending:
+                reactive.invalidate_later(THUMBNAIL_REFRESH_SECONDS)
+            logging.debug(f"Render UI: Display {len(cards)} contact sheets, {flagged} flagged.")
+            if not cards:
+                return None
+            if flagged:
+                warning = f"**⚠ {flagged} of {len(cards)} trigger windows have recording problems.**"
+                return ui.TagList(ui.markdown(warning), ui.layout_column_wrap(*cards, width=1 / 2))
+            return ui.layout_column_wrap(*cards, width=1 / 2)
+
     def show_video_radio_buttons(self):
         """
         Displays the radio buttons for selecting recordings.
@@ -218,8 +272,11 @@ class SessionManager:
         def display_recording():
             if self.session_view_state.get() and self.recording_view_state.get() and self.input.select_recordings.get():
                 logging.debug("Render UI: Display video field.")
+                images = ThumbnailCache().lookup(os.path.join(ENVParser().main_path,
+                                                              self.input.select_recordings.get()))
                 return [ui.tags.video(
                     ui.tags.source(src=self.input.select_recordings.get(), type="video/mp4"),
+                    poster=None if images is None else _asset_url(images[0]),
                     controls=True,
                     width="800px",
                     autoplay=False,
@@ -229,3 +286,38 @@ class SessionManager:
             else:
                 logging.debug("Render UI: Remove video field.")
                 return None
+
+
+def _asset_url(path: str) -> str:
+    """
+    Helper function which returns the URL of a file in the main storage, which is served as static assets.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        str: The URL of the file, relative to the application.
+    """
+    return os.path.relpath(path, ENVParser().main_path)
+
+
+def _manifest_summary(manifest: Optional[WindowManifest]) -> Optional[ui.HTML]:
+    """
+    Helper function which summarizes the manifest of a trigger window for its card.
+
+    Args:
+        manifest (Optional[WindowManifest]): The manifest of the window, None if it has none.
+
+    Returns:
+        Optional[ui.HTML]: The frame counts, latency and problems of the window, None if the window has no manifest.
+    """
+    if manifest is None:
+        return None
+    frames = ", ".join(f"{summary.frames} {stream.split('_')[0]}" for stream, summary in manifest.streams.items())
+    text = f"{frames} frames in {manifest.duration_seconds:.1f}s"
+    if "p95" in manifest.latency_ms:
+        text += f", latency p95 {manifest.latency_ms['p95']:.0f}ms"
+    text += f", writer buffer peak {manifest.writer_high_water}/{manifest.writer_capacity}"
+    if manifest.problems:
+        text += "  \n**" + "; ".join(manifest.problems) + "**"
+    return ui.markdown(text)
@@ -8,4 +8,17 @@ Classes:
     Timestamps: Represents the timestamps for recording sessions, including activation time, camera start time, and time windows.
     UIState: Manages the UI state including users, sessions, days recorded, and unsaved days.
     CameraLed: Manages the LED status updates for the camera.
+    CatalogWatcher: Watches the main storage and refreshes the catalog for every changed participant.
+    ClockSync: Estimates the offset and drift of the device clock and maps device timestamps to the host clock.
+    CaptureProfile: Describes how the cameras record and estimates the resulting data rates.
+    CameraSupervisor: Runs the camera in a background thread whenever it becomes ready.
+    ConversionService: Runs conversion jobs in a process pool, ordered by priority.
+    DeviceManager: Keeps a single device booted and switches its outputs between recording and viewing.
+    DevicePresenceMonitor: Scans for available devices at a fixed rate and caches the result.
+    PairStatistics: Collects match and drop statistics of the synchronized frame pairs of a trigger window.
+    PreviewHub: Keeps the latest encoded frame of every preview stream and counts the connected viewers.
+    StorageGovernor: Admits recordings based on the free disk space and evicts converted raw frames by a policy.
+    FrameWriter: Buffers recorded frames and writes them to disk in a background thread.
+    WindowManifest: Summarizes the recording of a trigger window.
+    PipelineHealth: Samples the state of the recording pipeline in a background thread.
 """
@@ -1,7 +1,8 @@
 """
 This module provides functionality to manage and operate the camera for recording sessions.
 
-It defines the Camera class which handles the initialization, running, and state management of the camera.
+It defines the Camera class which handles the initialization, running, and state management of the camera. The device
+itself is kept booted by the device manager, so switching between recording and viewing doesn't boot it again.
 
 Classes:
     Camera: Manages the camera operations including recording and state management.
@@ -11,14 +12,25 @@ Methods:
 """
 import logging
 import os
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import deque
+from datetime import datetime
 
-import cv2
 import depthai as dai
 import numpy as np
 
+from features.file_operations.recording_container import RecordedFrame, RAW_CODEC
+from features.modules.capture_profile import MAX_WINDOW_SECONDS, active_capture_profile
+from features.modules.device_manager import DeviceManager, ENCODER_PROFILES, IDLE_MODE, RECORD_MODE, VIEW_MODE
+from features.modules.device_presence import DevicePresenceMonitor
+from features.modules.frame_writer import FrameWriter
 from features.modules.light_barrier import LightBarrier
+from features.modules.pair_statistics import PairStatistics
+from features.modules.pipeline_health import BACKLOG_WARNING_RATIO, PipelineHealth
+from features.modules.preview_hub import PreviewHub
+from features.modules.storage_governor import StorageGovernor
+from features.modules.window_manifest import WindowManifest
 from utils.parser import ENVParser
 
 
@@ -29,9 +41,11 @@ class Camera(object):
     Attributes:
         _instance (Camera): Singleton instance of the Camera class.
         running (bool): Indicates if the camera is currently running.
-        fps (int): Frames per second for the camera.
+        fps (int): Frames per second for the camera, set by the active capture profile.
         _ready (bool): Indicates if the camera is ready.
         _mode (bool): Indicates the mode of the camera (recording or viewing).
+        _writer (FrameWriter): Writes the recorded frames to disk in the background.
+        state_changed (threading.Condition): Notified whenever the readiness or the mode of the camera changes.
     """
 
     _instance = None
@@ -39,7 +53,8 @@ class Camera(object):
     fps = None
     _ready = False
     _mode = False
-    _storing_data = False
+    _writer = None
+    state_changed = threading.Condition()
 
     def __init__(self):
         self.rgb_frames_path = None
@@ -49,7 +64,7 @@ class Camera(object):
         if cls._instance is None:
             logging.debug("Initiate camera instance.")
             cls._instance = super(Camera, cls).__new__(cls)
-            cls.fps = 30
+            cls.fps = active_capture_profile().fps
         return cls._instance
 
     def run(self, block=False) -> int:
@@ -66,166 +81,204 @@ class Camera(object):
         env = ENVParser()
         state = LightBarrier()
 
-        # Create Pipeline
-        pipeline = dai.Pipeline()
-
-        # Define sources and outputs
-        color = pipeline.create(dai.node.ColorCamera)
-        color.setResolution(dai.ColorCameraProperties.SensorResolution.THE_1080_P)
-        color.initialControl.setAutoExposureLimit(2000)
-        color.setFps(self.fps)
-        color.setCamera("color")
-
-        monoLeft = pipeline.create(dai.node.MonoCamera)
-        monoLeft.setResolution(dai.MonoCameraProperties.SensorResolution.THE_800_P)
-        monoLeft.setFps(self.fps)
-
-        monoRight = pipeline.create(dai.node.MonoCamera)
-        monoRight.setResolution(dai.MonoCameraProperties.SensorResolution.THE_800_P)
-        monoRight.setFps(self.fps)
-
-        stereo = pipeline.create(dai.node.StereoDepth)
-        stereo.setDefaultProfilePreset(dai.node.StereoDepth.PresetMode.HIGH_DENSITY)
-        stereo.initialConfig.setMedianFilter(dai.MedianFilter.MEDIAN_OFF)
-        dai.RawStereoDepthConfig.PostProcessing.SpeckleFilter()
-        # stereo.initialConfig.setDisparityShift(10)
-        stereo.setLeftRightCheck(False)  # This is required to align Depth with Color. Otherwise set to False
-        stereo.setExtendedDisparity(
-            False)  # This needs to be set to False. Otherwise the number of frames differ for depth and color
-        stereo.setSubpixel(False)
-        # stereo.setSubpixelFractionalBits(5)
-        # stereo.setDepthAlign(dai.CameraBoardSocket.CAM_A) #TODO: Check if required
-
-        monoLeft.out.link(stereo.left)
-        monoRight.out.link(stereo.right)
-
-        if self.mode:  # Recording mode
-            # Color output node
-            frame_color = pipeline.create(dai.node.XLinkOut)
-            frame_color.setStreamName("video")
-            color.video.link(frame_color.input)
-
-            # Depth output node
-            frame_depth = pipeline.create(dai.node.XLinkOut)
-            frame_depth.setStreamName("disparity")
-            stereo.depth.link(frame_depth.input)
-
-            logging.info("Record video without stream.")
-
-        else:  # Viewing mode
-            color.setIspScale(1, 2)
-
-            xoutGrp = pipeline.create(dai.node.XLinkOut)
-            xoutGrp.setStreamName("xout")
-
-            # Sync outputs with each other
-            sync = pipeline.create(dai.node.Sync)
-            sync.setSyncThreshold(timedelta(milliseconds=50))
-            stereo.disparity.link(sync.inputs["disparity"])
-            color.video.link(sync.inputs["video"])
-            sync.out.link(xoutGrp.input)
-
-            logging.info("View video without recording.")
-
-        with dai.Device(pipeline) as device:
-            device.setIrLaserDotProjectorIntensity(1)  # Enhancement of depth perception
-            device.setIrFloodLightIntensity(0)  # Enhancement of low light performance
-            logging.info("Set camera parameters for recording with OAK camera.")
-            device.readCalibration().setFov(dai.CameraBoardSocket.CAM_B, 127)
-            device.readCalibration().setFov(dai.CameraBoardSocket.CAM_C, 127)
-            self.running = True
-
+        # The device stays booted between runs, only the first run boots it
+        profile = active_capture_profile()
+        self.fps = profile.fps
+        # Resolved once, the profile isn't looked up again for every frame
+        encoded = profile.encoding in ENCODER_PROFILES
+        manager = DeviceManager()
+        manager.open(profile, block)
+        health = PipelineHealth()
+        self.running = True
+
+        try:
             if self.mode:  # Recording mode
-                current_state = 0
-                disparity_queue = device.getOutputQueue(name="disparity", maxSize=1, blocking=block)
-                video_queue = device.getOutputQueue(name="video", maxSize=1, blocking=block)
-                depth_frames, rgb_frames, depth_timestamps, rgb_timestamps = [], [], [], []
+                manager.switch(RECORD_MODE)
+                window_start, window_end = None, None
+                pending_edges = deque()
+                frames_in_window = 0
+                pair_queue = manager.record_queue
+                statistics = PairStatistics()
+                manifest = None
+                dropped_at_open = 0
+                waiting_for_keyframe = False
+                clock = manager.clock
+                # Always filled with the latest frames, so a window can start before the light barrier was activated
+                pre_trigger_seconds = env.pre_trigger_seconds
+                pre_trigger = deque(maxlen=max(1, int(self.fps * pre_trigger_seconds)))
+                window_attributes = {"capture_profile": profile.name, **profile.depth_attributes}
+                self._writer = FrameWriter(capacity=max(1, int(self.fps * profile.buffer_seconds)),
+                                           rgb_codec=profile.encoding.lower() if encoded else RAW_CODEC)
+                self._writer.start()
+                health.writer = self._writer
 
                 # Open a file to save encoded video
                 day = datetime.now().strftime(env.date_format)
                 os.makedirs(os.path.join(env.temp_path, day), exist_ok=True)
                 self.depth_frames_path = os.path.join(env.temp_path, day, "depth_frames")
                 os.makedirs(self.depth_frames_path, exist_ok=True)
-                self.rgb_frames_path = os.path.join(env.temp_path, day, "rgb_frames")
-                os.makedirs(self.rgb_frames_path, exist_ok=True)
+                self.rgb_frames_path = os.path.join(env.temp_path, day, "rgb_frames") if profile.color else None
+                if self.rgb_frames_path is not None:
+                    os.makedirs(self.rgb_frames_path, exist_ok=True)
 
+                state.clear_edges()
                 print("Recording started...")
                 logging.info(f"Camera started recording at: {datetime.now()}")
-                while self.ready:
-                    try:
-                        if current_state != state.activated:
-                            logging.info(
-                                f"Light barrier triggered to {'start' if state.activated else 'end'} at: {datetime.now()}")
-                            current_state = state.activated
-
-                        if current_state == 1 and len(depth_frames) < self.fps * 10:
-                            depth_frame = disparity_queue.get()
-                            rgb_frame = video_queue.get()
-                            depth_frames.append(depth_frame.getFrame())
-                            rgb_frames.append(rgb_frame.getCvFrame())
-                            depth_timestamps.append(datetime.now() - (dai.Clock.now() - depth_frame.getTimestamp()))
-                            rgb_timestamps.append(datetime.now() - (dai.Clock.now() - rgb_frame.getTimestamp()))
-
-                        elif len(depth_frames) > self.fps:
-                            print("Saving frames...")
-                            self._storing_data = True
-                            self.__save_frames(depth_frames, rgb_frames, depth_timestamps, rgb_timestamps)
-                            self._storing_data = False
-                            print("Frames saved.")
-
-                            depth_frames, rgb_frames, depth_timestamps, rgb_timestamps = [], [], [], []
-
-                    except:
-                        logging.warning("There was an issue storing a time point.")
-                        break
+                try:
+                    while self.ready and self.mode:
+                        for edge in state.poll_edges():
+                            logging.info(f"Light barrier triggered to {'start' if edge.activated else 'end'} at: "
+                                         f"{datetime.fromtimestamp(edge.timestamp)}")
+                            pending_edges.append(edge)
+                        while pending_edges and (window_start is None or window_end is None):
+                            edge = pending_edges.popleft()
+                            if edge.activated and window_start is None:
+                                if not StorageGovernor().admit(windows=1)[0]:
+                                    logging.error("Trigger window skipped: not enough free space to store it.")
+                                    continue
+                                window_start = edge.timestamp
+                                statistics = PairStatistics()
+                                manifest = WindowManifest(capture_profile=profile.name, pairing=statistics)
+                                self.__open_window(edge.timestamp - pre_trigger_seconds, manifest)
+                                frames_in_window = 0
+                                dropped_at_open = self._writer.dropped_frames
+                                waiting_for_keyframe = encoded and profile.color
+                            elif not edge.activated and window_start is not None:
+                                window_end = edge.timestamp
+
+                        # Frames are read all the time, the queues only buffer host hiccups
+                        group = pair_queue.get()
+                        received = time.time()
+                        manager.log_first_frame()
+                        depth_frame = group["disparity"]
+                        rgb_frame = group["video"] if profile.color else None
+                        health.add_frame("disparity")
+                        clock.observe(_device_seconds(depth_frame), received)
+                        if rgb_frame is not None:
+                            clock.observe(_device_seconds(rgb_frame), received)
+                            health.add_frame("video")
+                        reference = depth_frame if rgb_frame is None else rgb_frame
+                        timestamp = clock.to_host(_device_seconds(reference))
+                        # Both clocks are the steady clock of the host, the device timestamps are synchronized to it
+                        latency = (dai.Clock.now() - reference.getTimestamp()).total_seconds()
+                        pairs = [(depth_frame, rgb_frame, timestamp, latency)]
+                        if window_start is not None and pre_trigger:
+                            # Flush the frames captured before the trigger into the new window
+                            pairs = list(pre_trigger) + pairs
+                            pre_trigger.clear()
+
+                        for pair in pairs:
+                            depth_frame, rgb_frame, timestamp, latency = pair
+                            if window_start is None:
+                                pre_trigger.append(pair)
+                                continue
+                            if timestamp < window_start - pre_trigger_seconds:  # Older than the pre-trigger time
+                                continue
+                            if window_end is not None and timestamp > window_end:
+                                self.__close_window(statistics, frames_in_window, dropped_at_open,
+                                                    {**clock.attributes, **window_attributes})
+                                window_start, window_end = None, None
+                                pre_trigger.append(pair)
+                                continue
+                            keyframe = rgb_frame is None or not encoded or \
+                                rgb_frame.getFrameType() == dai.EncodedFrame.FrameType.I
+                            if frames_in_window >= self.fps * MAX_WINDOW_SECONDS and keyframe:
+                                # A long trigger continues in a new window, which starts at a keyframe to be decodable
+                                self.__close_window(statistics, frames_in_window, dropped_at_open,
+                                                    {**clock.attributes, **window_attributes})
+                                if not StorageGovernor().admit(windows=1)[0]:
+                                    logging.error("Trigger window ended early: not enough free space to continue it.")
+                                    window_start, window_end = None, None
+                                    pre_trigger.append(pair)
+                                    continue
+                                statistics = PairStatistics()
+                                manifest = WindowManifest(capture_profile=profile.name, pairing=statistics)
+                                self.__open_window(timestamp, manifest)
+                                frames_in_window = 0
+                                dropped_at_open = self._writer.dropped_frames
+                            if rgb_frame is None:  # Depth-only capture profile
+                                statistics.add(0.0, depth_frame.getSequenceNum(), None)
+                            else:
+                                statistics.add(abs(_device_seconds(depth_frame) - _device_seconds(rgb_frame)),
+                                               depth_frame.getSequenceNum(), rgb_frame.getSequenceNum())
+                            if waiting_for_keyframe:
+                                # An encoded window has to start with a keyframe to be decodable
+                                if not keyframe:
+                                    continue
+                                waiting_for_keyframe = False
+
+                            rgb_recorded = None
+                            if rgb_frame is not None:
+                                rgb_data = rgb_frame.getData() if encoded else rgb_frame.getCvFrame()
+                                rgb_recorded = _recorded_frame(rgb_frame, rgb_data, timestamp)
+                            self._writer.push(
+                                _recorded_frame(depth_frame, depth_frame.getFrame(),
+                                                clock.to_host(_device_seconds(depth_frame))),
+                                rgb_recorded,
+                                keyframe,
+                            )
+                            manifest.add_latency(latency)
+                            frames_in_window += 1
+
+                    if window_start is not None:
+                        self.__close_window(statistics, frames_in_window, dropped_at_open,
+                                            {**clock.attributes, **window_attributes})
+                except RuntimeError:  # The device has been lost
+                    raise
+                except Exception as e:
+                    logging.warning(f"There was an issue storing a time point: {e}")
+                finally:
+                    self._writer.stop()
+                    health.writer = None
+                    if self._writer.dropped_frames:
+                        logging.warning(f"{self._writer.dropped_frames} frame pairs were dropped during recording.")
 
             else:  # Viewing mode
-                disparityMultiplier = 255.0 / stereo.initialConfig.getMaxDisparity()
-                queue = device.getOutputQueue(name="xout", maxSize=30, blocking=block)
-                while True:
-                    msgGrp = queue.get()
+                manager.switch(VIEW_MODE)
+                hub = PreviewHub()
+                while self.ready and not self.mode:
+                    msgGrp = manager.view_queue.get()
+                    manager.log_first_frame()
+                    # The frames are already JPEG encoded and are handed on to the viewers as they are
                     for name, msg in msgGrp:
-                        frame = msg.getCvFrame()
-                        if name == "disparity":
-                            frame = (frame * disparityMultiplier).astype(np.uint8)
-                            frame = cv2.applyColorMap(frame, cv2.COLORMAP_JET)
-                        cv2.imshow(name, frame)
-                    if cv2.waitKey(1) == ord("q") or not self.ready:
-                        cv2.destroyAllWindows()
-                        break
-
+                        health.add_frame(name)
+                        hub.publish(name, msg.getData().tobytes())
+        except RuntimeError:
+            # The device has been disconnected, it's booted again on the next run
+            manager.close()
+            raise
+        finally:
             self.running = False
-
-            return 1
-
-    def __save_frames(self, depth_frames, rgb_frames, depth_timestamps, rgb_timestamps):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        logging.info(f"Saving frames at: {timestamp}")
-
-        depth_path = os.path.join(self.depth_frames_path, timestamp)
-        os.makedirs(depth_path, exist_ok=True)
-        rgb_path = os.path.join(self.rgb_frames_path, timestamp)
-        os.makedirs(rgb_path, exist_ok=True)
-        depth_args = [(frame, depth_path, ts.strftime("%Y%m%d_%H%M%S%f")) for frame, ts in
-                      zip(depth_frames, depth_timestamps)]
-        rgb_args = [(frame, rgb_path, ts.strftime("%Y%m%d_%H%M%S%f")) for frame, ts in zip(rgb_frames, rgb_timestamps)]
-
-        start = datetime.now()
-        with ThreadPoolExecutor() as executor:
-            executor.map(_save_single_frame, depth_args + rgb_args)
-        print(datetime.now() - start)
-
-        logging.info(f"Frames saved at: {timestamp}")
+            if not self.ready and manager.is_open:
+                manager.switch(IDLE_MODE)
+
+        return 1
+
+    def __open_window(self, start: float, manifest: WindowManifest) -> None:
+        timestamp = datetime.fromtimestamp(start).strftime("%Y%m%d_%H%M%S")
+        self._writer.open_window(
+            os.path.join(self.depth_frames_path, timestamp),
+            None if self.rgb_frames_path is None else os.path.join(self.rgb_frames_path, timestamp),
+            manifest,
+        )
+
+    def __close_window(self, statistics: PairStatistics, frames_in_window: int, dropped_at_open: int,
+                       attributes: dict) -> None:
+        statistics.dropped_pairs = self._writer.dropped_frames - dropped_at_open
+        # Windows of at most one second are too short to be of use
+        self._writer.close_window(discard=frames_in_window <= self.fps,
+                                  attributes={**attributes, **statistics.attributes})
+        logging.info(f"Frame pairs of the window: {statistics.attributes}")
 
     @property
     def camera_connection(self) -> bool:
         """
-        Checks if the camera is connected.
+        Checks if the camera is connected, based on the cached result of the device presence monitor.
 
         Returns:
             bool: True if the camera is connected, False otherwise.
         """
-        return False if dai.DeviceBootloader.getAllAvailableDevices() == [] else True
+        return DevicePresenceMonitor().connected
 
     @property
     def ready(self) -> bool:
@@ -233,7 +286,22 @@ class Camera(object):
 
     @property
     def storing_data(self) -> bool:
-        return self._storing_data
+        """
+        Checks if the frame writer falls behind, i.e. its buffer is filled so far that frames are about to be dropped.
+        A short backlog while frames are streamed to disk is normal and doesn't count.
+
+        Returns:
+            bool: True if the backlog of the frame writer is above the warning level, False otherwise.
+        """
+        writer = self._writer
+        return writer is not None and writer.backlog > writer.capacity * BACKLOG_WARNING_RATIO
+
+    @property
+    def dropped_frames(self) -> int:
+        """
+        Returns the number of frame pairs dropped by the frame writer in the current or last recording.
+        """
+        return 0 if self._writer is None else self._writer.dropped_frames
 
     @ready.setter
     def ready(self, value: bool):
@@ -243,7 +311,9 @@ class Camera(object):
         Args:
             value (bool): The readiness state to set.
         """
-        self._ready = value
+        with self.state_changed:
+            self._ready = value
+            self.state_changed.notify_all()
 
     @property
     def mode(self):
@@ -257,17 +327,41 @@ class Camera(object):
         Args:
             value (bool): The mode to set (True for recording, False for viewing).
         """
-        self._mode = value
+        with self.state_changed:
+            self._mode = value
+            self.state_changed.notify_all()
+
+
+def _device_seconds(message) -> float:
+    """
+    Helper function which returns the raw device timestamp of a message.
+
+    Args:
+        message (dai.ImgFrame | dai.EncodedFrame): The message received from the device.
 
+    Returns:
+        float: The capture time on the device clock in seconds.
+    """
+    return message.getTimestampDevice().total_seconds()
+
+
+def _recorded_frame(message, data: np.ndarray, timestamp: float) -> RecordedFrame:
+    """
+    Helper function which wraps the frame data of a device message together with its sequence number and timestamps.
+
+    Args:
+        message (dai.ImgFrame | dai.EncodedFrame): The message received from the device.
+        data (np.ndarray): The frame data extracted from the message.
+        timestamp (float): The capture time mapped to the host clock in seconds since the epoch.
 
-def _save_single_frame(args):
-    frame, path, frame_type = args
-    np.save(os.path.join(path, f"{frame_type}.npy"), frame)
-    logging.debug(f"Frame {frame_type}.npy saved at: {datetime.now()}")
+    Returns:
+        RecordedFrame: The frame ready to be written to a container.
+    """
+    return RecordedFrame(data, message.getSequenceNum(), timestamp, _device_seconds(message))
 
 
 if __name__ == "__main__":
-    from features.file_operations.video_processing import convert_npy_files_to_video
+    from features.file_operations.video_processing import convert_recording_to_video
     from features.file_operations.delete import delete_temporary_recordings
 
     delete_temporary_recordings()
@@ -280,5 +374,7 @@ if __name__ == "__main__":
     if cam.mode:
         env = ENVParser()
         day = datetime.now().strftime(env.date_format)
-        convert_npy_files_to_video(os.path.join(env.temp_path, day, "depth_frames"), "depth.mp4", True)
-        convert_npy_files_to_video(os.path.join(env.temp_path, day, "rgb_frames"), "rgb.mp4", False)
+        for window in os.listdir(os.path.join(env.temp_path, day, "depth_frames")):
+            convert_recording_to_video(os.path.join(env.temp_path, day, "depth_frames"), window, "depth", True)
+            if os.path.isdir(os.path.join(env.temp_path, day, "rgb_frames", window)):
+                convert_recording_to_video(os.path.join(env.temp_path, day, "rgb_frames"), window, "rgb", False)
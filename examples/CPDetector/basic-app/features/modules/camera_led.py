@@ -7,15 +7,16 @@ Classes:
     CameraLed: Manages the LED status updates for the camera.
 
 Methods:
-    state: Updates the LED status based on the camera's running state and connection status.
+    state: Updates the LED status based on the camera's running state and connection status, and shows dropped frames.
 """
 
 import logging
 
 import faicons as fa
-from shiny import render, reactive
+from shiny import render, reactive, ui
 
 from features.modules.camera import Camera
+from features.modules.device_presence import DevicePresenceMonitor
 
 
 class CameraLed:
@@ -38,10 +39,26 @@ class CameraLed:
         """
         Updates the LED status based on the camera's running state and connection status.
 
+        Also renders the number of frames the frame writer had to drop during recording, and notifies every session
+        when the camera is connected or disconnected. The connection state is read from the device presence monitor.
+
         Returns:
             render.ui: The UI element representing the LED status.
         """
         camera = Camera()
+        monitor = DevicePresenceMonitor()
+
+        @reactive.poll(lambda: monitor.version, 0.5)
+        def device_connected() -> bool:
+            return monitor.connected
+
+        @reactive.Effect
+        @reactive.event(device_connected, ignore_init=True)
+        def _():
+            if device_connected():
+                ui.notification_show("Camera has been connected.", duration=5, type="message")
+            else:
+                ui.notification_show("Camera has been disconnected!", duration=None, type="warning")
 
         @render.ui
         def camera_led_update():
@@ -52,3 +69,8 @@ class CameraLed:
                 return fa.icon_svg(name="circle", fill="green")
             else:
                 return fa.icon_svg(name="circle", fill="red")
+
+        @render.text
+        def dropped_frames_counter():
+            reactive.invalidate_later(1)
+            return f"Dropped frames: {camera.dropped_frames}"
@@ -0,0 +1,113 @@
+"""
+This module provides functionality to run the camera whenever it is requested.
+
+It defines the CameraSupervisor class which sleeps until the readiness or mode of the camera changes and then runs the
+camera in a background thread.
+
+Classes:
+    CameraSupervisor: Runs the camera in a background thread whenever it becomes ready.
+"""
+
+import logging
+import threading
+import time
+
+from features.modules.camera import Camera
+from features.modules.device_manager import DeviceManager
+
+RETRY_INTERVAL = 5
+
+
+class CameraSupervisor:
+    """
+    Runs the camera in a background thread whenever it becomes ready.
+
+    The thread waits on the state condition of the camera instead of polling it, so it does not use any CPU while the
+    camera is idle. If the camera fails or stops without being requested to, it is only started again after the retry
+    interval or the next state change.
+
+    Attributes:
+        _instance (CameraSupervisor): Singleton instance of the CameraSupervisor class.
+        _thread (threading.Thread): The supervisor thread.
+        _stopping (bool): Indicates if the supervisor has been asked to stop.
+        _wakeups (int): Number of times the supervisor has been woken up.
+        _runs (int): Number of times the camera has been started.
+        _idle_cpu_seconds (float): CPU time used by the supervisor thread outside of camera runs.
+    """
+    _instance = None
+    _thread = None
+    _stopping = False
+    _wakeups = 0
+    _runs = 0
+    _idle_cpu_seconds = 0.0
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate camera supervisor instance.")
+            cls._instance = super(CameraSupervisor, cls).__new__(cls)
+        return cls._instance
+
+    def start(self) -> None:
+        """
+        Starts the supervisor thread. Calling it again while the thread is alive has no effect.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self.__supervise, name="camera-supervisor", daemon=True)
+        self._thread.start()
+        logging.info("Camera supervisor started.")
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Stops the camera and the supervisor thread, and closes the device.
+
+        Args:
+            timeout (float): The maximum time to wait for the thread to finish. Waits indefinitely by default.
+        """
+        camera = Camera()
+        with camera.state_changed:
+            self._stopping = True
+            camera.ready = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        DeviceManager().close()
+        logging.info(f"Camera supervisor stopped: {self.stats}")
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns the number of wakeups, camera runs and the CPU time the supervisor used while the camera was idle.
+        """
+        return {"wakeups": self._wakeups, "runs": self._runs, "idle_cpu_seconds": round(self._idle_cpu_seconds, 6)}
+
+    def __supervise(self) -> None:
+        camera = Camera()
+        while True:
+            cpu_start = time.thread_time()
+            with camera.state_changed:
+                # Sleep until the camera is requested
+                camera.state_changed.wait_for(lambda: self._stopping or camera.ready)
+                if self._stopping:
+                    break
+                self._wakeups += 1
+            self._idle_cpu_seconds += time.thread_time() - cpu_start
+
+            mode = camera.mode
+            try:
+                self._runs += 1
+                camera.run()
+            except Exception as e:
+                logging.error(f"Camera stopped unexpectedly: {e}")
+                camera.running = False
+                DeviceManager().close()
+            else:
+                with camera.state_changed:
+                    requested = self._stopping or not camera.ready or camera.mode != mode
+                if requested:  # Stopped or switched on request, the next run starts right away
+                    continue
+                logging.warning("Camera stopped without being requested to.")
+            with camera.state_changed:
+                # Wait for the retry interval or a state change before the camera is started again
+                camera.state_changed.wait(timeout=RETRY_INTERVAL)
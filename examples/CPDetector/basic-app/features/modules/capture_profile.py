@@ -0,0 +1,318 @@
+"""
+This module provides named capture profiles, which set up the cameras for a kind of recording.
+
+A profile describes the sensor resolutions, the frame rate, the stereo preset, the region and decimation of the depth
+frames, the queue and writer settings and whether color frames are recorded at all. Besides the built-in profiles,
+further profiles can be defined in a YAML file. The profile in use is selected by name in the `.env` file.
+
+Classes:
+    CaptureProfile: Describes how the cameras record and estimates the resulting data rates.
+
+Functions:
+    load_capture_profiles: Returns the built-in profiles together with the profiles of the YAML file.
+    active_capture_profile: Returns the profile selected in the `.env` file, with the depth region of the `.env` file.
+
+Attributes:
+    CAPTURE_PROFILES (dict): The built-in capture profiles by name.
+"""
+
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import yaml
+from pydantic import BaseModel, field_validator
+
+from features.file_operations.recording_container import INDEX_DTYPE
+from utils.parser import ENVParser
+
+# Sensor sizes of the supported resolutions, named like the depthai sensor resolutions
+COLOR_RESOLUTIONS = {
+    "THE_1080_P": (1920, 1080),
+    "THE_4_K": (3840, 2160),
+    "THE_12_MP": (4056, 3040),
+}
+MONO_RESOLUTIONS = {
+    "THE_400_P": (640, 400),
+    "THE_480_P": (640, 480),
+    "THE_720_P": (1280, 720),
+    "THE_800_P": (1280, 800),
+}
+STEREO_PRESETS = ("HIGH_ACCURACY", "HIGH_DENSITY")
+DECIMATION_FACTORS = (1, 2, 3, 4)
+ENCODINGS = ("RAW", "H264", "H265")
+# Estimated size of a color frame encoded on the device, in bits per pixel
+ENCODED_BITS_PER_PIXEL = 0.15
+# Longest trigger window, a longer trigger continues in a new window
+MAX_WINDOW_SECONDS = 10
+
+DEFAULT_PROFILE = "1080p30"
+
+
+class CaptureProfile(BaseModel):
+    """
+    Describes how the cameras record and estimates the resulting data rates.
+
+    Attributes:
+        name (str): The name the profile is selected by.
+        description (str): A short description shown in the UI.
+        fps (int): Frames per second of all cameras.
+        color (bool): Whether color frames are recorded. Depth-only profiles still show color in the view mode.
+        color_resolution (str): The sensor resolution of the color camera.
+        isp_scale (Optional[Tuple[int, int]]): Numerator and denominator the color frames are scaled by on the device.
+        mono_resolution (str): The sensor resolution of the mono cameras.
+        stereo_preset (str): The preset of the stereo depth node, HIGH_ACCURACY or HIGH_DENSITY.
+        depth_roi (Optional[Tuple[int, int, int, int]]): The region of the walking corridor in pixels of the mono
+            sensor as x, y, width and height. Only this region of the depth frames is sent and stored.
+        depth_decimation (int): The factor the depth frames are decimated by on the device, 1 to 4.
+        rgb_encoding (Optional[str]): Encoding of the recorded color frames, RAW, H264 or H265. Defaults to the `.env`.
+        queue_size (int): Frame pairs buffered per output queue on the host.
+        writer_buffer_seconds (Optional[float]): Seconds of frames buffered by the frame writer. Defaults to the `.env`.
+    """
+    name: str
+    description: str = ""
+    fps: int = 30
+    color: bool = True
+    color_resolution: str = "THE_1080_P"
+    isp_scale: Optional[Tuple[int, int]] = None
+    mono_resolution: str = "THE_800_P"
+    stereo_preset: str = "HIGH_DENSITY"
+    depth_roi: Optional[Tuple[int, int, int, int]] = None
+    depth_decimation: int = 1
+    rgb_encoding: Optional[str] = None
+    queue_size: int = 8
+    writer_buffer_seconds: Optional[float] = None
+
+    @field_validator("color_resolution")
+    @classmethod
+    def __check_color_resolution(cls, value: str) -> str:
+        if value not in COLOR_RESOLUTIONS:
+            raise ValueError(f"Unknown color resolution {value}, use one of: {', '.join(COLOR_RESOLUTIONS)}")
+        return value
+
+    @field_validator("mono_resolution")
+    @classmethod
+    def __check_mono_resolution(cls, value: str) -> str:
+        if value not in MONO_RESOLUTIONS:
+            raise ValueError(f"Unknown mono resolution {value}, use one of: {', '.join(MONO_RESOLUTIONS)}")
+        return value
+
+    @field_validator("stereo_preset")
+    @classmethod
+    def __check_stereo_preset(cls, value: str) -> str:
+        if value not in STEREO_PRESETS:
+            raise ValueError(f"Unknown stereo preset {value}, use one of: {', '.join(STEREO_PRESETS)}")
+        return value
+
+    @field_validator("depth_roi")
+    @classmethod
+    def __check_depth_roi(cls, value: Optional[Tuple[int, int, int, int]]) -> Optional[Tuple[int, int, int, int]]:
+        if value is not None and (value[0] < 0 or value[1] < 0 or value[2] < 2 or value[3] < 2):
+            raise ValueError(f"The depth ROI {value} needs a non-negative position and a size of at least 2x2.")
+        return value
+
+    @field_validator("depth_decimation")
+    @classmethod
+    def __check_depth_decimation(cls, value: int) -> int:
+        if value not in DECIMATION_FACTORS:
+            raise ValueError(f"Unknown decimation factor {value}, use one of: {DECIMATION_FACTORS}")
+        return value
+
+    @field_validator("rgb_encoding")
+    @classmethod
+    def __check_rgb_encoding(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and value.upper() not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {value}, use one of: {', '.join(ENCODINGS)}")
+        return None if value is None else value.upper()
+
+    @property
+    def encoding(self) -> str:
+        """
+        Returns the encoding of the recorded color frames, falling back to the encoding of the `.env` file.
+        """
+        return self.rgb_encoding or ENVParser().rgb_encoding
+
+    @property
+    def buffer_seconds(self) -> float:
+        """
+        Returns the seconds of frames buffered by the frame writer, falling back to the value of the `.env` file.
+        """
+        return ENVParser().writer_buffer_seconds if self.writer_buffer_seconds is None else self.writer_buffer_seconds
+
+    @property
+    def color_size(self) -> Tuple[int, int]:
+        """
+        Returns the width and height of the color frames after the ISP scaling.
+        """
+        width, height = COLOR_RESOLUTIONS[self.color_resolution]
+        if self.isp_scale is None:
+            return width, height
+        numerator, denominator = self.isp_scale
+        return -(-width * numerator // denominator), -(-height * numerator // denominator)
+
+    @property
+    def decimated_depth_size(self) -> Tuple[int, int]:
+        """
+        Returns the width and height of the depth frames after the decimation, before the ROI is cropped.
+        """
+        width, height = MONO_RESOLUTIONS[self.mono_resolution]
+        return width // self.depth_decimation, height // self.depth_decimation
+
+    @property
+    def depth_crop(self) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Returns the region cropped from the decimated depth frames as x, y, width and height.
+
+        The region is clamped to the frame and its size is made even, since the exported videos need even dimensions.
+
+        Returns:
+            Optional[Tuple[int, int, int, int]]: The region, None if the whole frame is kept.
+        """
+        width, height = self.decimated_depth_size
+        if self.depth_roi is None:
+            if width % 2 == 0 and height % 2 == 0:
+                return None
+            return 0, 0, width // 2 * 2, height // 2 * 2
+        x, y, roi_width, roi_height = (value // self.depth_decimation for value in self.depth_roi)
+        x, y = min(x, width - 2), min(y, height - 2)
+        return x, y, max(2, min(roi_width, width - x) // 2 * 2), max(2, min(roi_height, height - y) // 2 * 2)
+
+    @property
+    def depth_size(self) -> Tuple[int, int]:
+        """
+        Returns the width and height of the recorded depth frames.
+        """
+        crop = self.depth_crop
+        return self.decimated_depth_size if crop is None else (crop[2], crop[3])
+
+    @property
+    def depth_attributes(self) -> dict:
+        """
+        Returns the region and decimation of the depth frames, to be stored together with the recorded frames.
+
+        The region is given in pixels of the mono sensor, so depth frames can be mapped back to the full frame.
+        """
+        crop = self.depth_crop or (0, 0, *self.decimated_depth_size)
+        return {
+            "depth_roi": [value * self.depth_decimation for value in crop],
+            "depth_decimation": self.depth_decimation,
+        }
+
+    @property
+    def link_bytes_per_second(self) -> int:
+        """
+        Estimates the data rate sent from the device to the host while recording.
+        """
+        color_width, color_height = self.color_size
+        color_bytes = 0
+        if self.color:
+            # Raw color frames are sent as NV12 and converted to BGR on the host
+            color_bytes = self.__encoded_frame_bytes() or color_width * color_height * 3 // 2
+        return self.fps * (color_bytes + self.__depth_frame_bytes())
+
+    @property
+    def disk_bytes_per_second(self) -> int:
+        """
+        Estimates the data rate written to the temporary storage while recording.
+        """
+        color_width, color_height = self.color_size
+        color_bytes = 0
+        if self.color:
+            color_bytes = self.__encoded_frame_bytes() or color_width * color_height * 3
+        # Every frame also adds a record to the index of its container
+        return self.fps * (color_bytes + self.__depth_frame_bytes() + INDEX_DTYPE.itemsize * (2 if self.color else 1))
+
+    @property
+    def bytes_per_window(self) -> int:
+        """
+        Estimates the disk space of the longest trigger window.
+        """
+        return self.disk_bytes_per_second * MAX_WINDOW_SECONDS
+
+    @property
+    def summary(self) -> str:
+        """
+        Returns a short description of the profile and its estimated data rates.
+        """
+        color = f"{self.color_size[0]}x{self.color_size[1]} {self.encoding.lower()} color" if self.color else \
+            "no color"
+        return (f"{self.name}: {self.fps} fps, {color}, {self.depth_size[0]}x{self.depth_size[1]} depth - "
+                f"USB {self.link_bytes_per_second / 10 ** 6:.0f}MB/s, "
+                f"disk {self.disk_bytes_per_second / 10 ** 6:.0f}MB/s, "
+                f"{self.bytes_per_window / 10 ** 9:.2f}GB per window")
+
+    def __encoded_frame_bytes(self) -> int:
+        if self.encoding == "RAW":
+            return 0
+        color_width, color_height = self.color_size
+        return int(color_width * color_height * ENCODED_BITS_PER_PIXEL / 8)
+
+    def __depth_frame_bytes(self) -> int:
+        return self.depth_size[0] * self.depth_size[1] * 2
+
+
+CAPTURE_PROFILES = {
+    "1080p30": CaptureProfile(
+        name="1080p30", description="Full HD color at 30 fps for archival recordings.",
+    ),
+    "720p60": CaptureProfile(
+        name="720p60", description="720p color at 60 fps for fast gait, scaled on the device and encoded with H.264.",
+        fps=60, isp_scale=(2, 3), rgb_encoding="H264", queue_size=16, writer_buffer_seconds=1,
+    ),
+    "depth-only": CaptureProfile(
+        name="depth-only", description="Depth at 30 fps without color frames.", color=False,
+    ),
+}
+
+
+@lru_cache(maxsize=1)
+def load_capture_profiles() -> Dict[str, CaptureProfile]:
+    """
+    Returns the built-in profiles together with the profiles of the YAML file.
+
+    The YAML file maps profile names to their settings. A profile of the file replaces a built-in profile of the same
+    name. An invalid file is logged and ignored.
+
+    Returns:
+        Dict[str, CaptureProfile]: The capture profiles by name.
+    """
+    profiles = dict(CAPTURE_PROFILES)
+    path = ENVParser().capture_profiles_file
+    if not path:
+        return profiles
+    if not os.path.isfile(path):
+        logging.warning(f"Capture profiles file doesn't exist: {path}")
+        return profiles
+    try:
+        with open(path, "r") as file:
+            for name, settings in (yaml.safe_load(file) or {}).items():
+                profiles[name] = CaptureProfile(name=name, **(settings or {}))
+        logging.info(f"Loaded capture profiles from: {path}")
+    except Exception as e:
+        logging.error(f"Capture profiles couldn't be loaded from {path}: {e}")
+    return profiles
+
+
+def active_capture_profile() -> CaptureProfile:
+    """
+    Returns the profile selected in the `.env` file, or the default profile if the selected one doesn't exist.
+
+    The depth region and decimation of the `.env` file replace the ones of the profile, since the walking corridor
+    depends on the site rather than on the kind of recording.
+
+    Returns:
+        CaptureProfile: The profile in use.
+    """
+    env = ENVParser()
+    profiles = load_capture_profiles()
+    name = env.capture_profile or DEFAULT_PROFILE
+    if name not in profiles:
+        logging.warning(f"Unknown capture profile {name}, {DEFAULT_PROFILE} is used instead.")
+        name = DEFAULT_PROFILE
+    profile = profiles[name]
+    if env.depth_roi is not None or env.depth_decimation is not None:
+        update = {"depth_roi": env.depth_roi or profile.depth_roi,
+                  "depth_decimation": env.depth_decimation or profile.depth_decimation}
+        profile = CaptureProfile(**{**profile.model_dump(), **update})
+    return profile
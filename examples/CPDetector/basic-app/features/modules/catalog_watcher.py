@@ -0,0 +1,305 @@
+"""
+This module provides functionality to keep the recording catalog in sync with the main storage.
+
+It defines the CatalogWatcher class which watches the main storage for changes made outside of the application, like
+manual moves, external copies or a crashed save, and refreshes only the participants whose folders have changed.
+
+Classes:
+    CatalogWatcher: Watches the main storage and refreshes the catalog for every changed participant.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import platform
+import select
+import struct
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from features.file_operations import storage_path
+from features.file_operations.catalog import Catalog
+from features.file_operations.recording_container import STREAM_OUTPUT_NAMES
+from utils.parser import ENVParser
+
+INOTIFY_BACKEND = "inotify"
+POLLING_BACKEND = "polling"
+
+# Seconds without further changes before the changed participants are refreshed
+DEBOUNCE_INTERVAL = 0.5
+# Depth of the deepest watched folder: day, participant, stream, window
+WATCH_DEPTH = 4
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF \
+             | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")
+
+ParticipantKey = Tuple[str, str]
+
+
+class CatalogWatcher:
+    """
+    Watches the main storage and refreshes the catalog for every changed participant.
+
+    On Linux the folders of the main storage are watched with inotify, so changes are processed as they happen. On
+    other systems, or if inotify is not available, the storage is polled and only participants whose folders have
+    changed since the last poll are refreshed. A poll only reads the modification times of the day, participant and
+    stream folders, so its cost grows with the number of participants rather than the number of recorded files. In
+    both cases the catalog is never rebuilt with a full scan, unless the kernel reports that events have been lost.
+
+    Attributes:
+        _instance (CatalogWatcher): Singleton instance of the CatalogWatcher class.
+        backend (str): The backend of the watcher, inotify or polling.
+        interval (float): The time between two polls in seconds.
+        _dirty (Set[ParticipantKey]): The participants which have changed and not been refreshed yet.
+        _watches (Dict[int, str]): The folder of every inotify watch descriptor.
+        _signatures (Dict[ParticipantKey, tuple]): The modification times of every participant at the last poll.
+        _days (Dict[str, tuple]): The modification time and the participants of every day folder at the last poll.
+        _wakeup (threading.Event): Interrupts the wait between two polls.
+    """
+    _instance = None
+    backend = POLLING_BACKEND
+    interval = 5.0
+    _dirty = None
+    _watches = None
+    _signatures = None
+    _days = None
+    _wakeup = None
+    _stopping = False
+    _thread = None
+    _libc = None
+    _fd = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate catalog watcher instance.")
+            cls._instance = super(CatalogWatcher, cls).__new__(cls)
+            env = ENVParser()
+            cls.interval = env.catalog_poll_interval
+            cls._dirty = set()
+            cls._watches = {}
+            cls._signatures = {}
+            cls._days = {}
+            cls._wakeup = threading.Event()
+            cls.backend = env.catalog_watch_backend or \
+                (INOTIFY_BACKEND if platform.system() == "Linux" else POLLING_BACKEND)
+        return cls._instance
+
+    def start(self) -> None:
+        """
+        Starts the watcher thread. Calling it again while the thread is alive has no effect.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self.backend == INOTIFY_BACKEND and not self.__open_inotify():
+            self.backend = POLLING_BACKEND
+        self._stopping = False
+        self._wakeup.clear()
+        target = self.__watch_inotify if self.backend == INOTIFY_BACKEND else self.__watch_polling
+        self._thread = threading.Thread(target=target, name="catalog-watcher", daemon=True)
+        self._thread.start()
+        logging.info(f"Catalog watcher started with the {self.backend} backend.")
+
+    def stop(self) -> None:
+        """
+        Stops the watcher thread.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._watches.clear()
+
+    def __reconcile(self) -> None:
+        # Participants which have been added or removed while the application was not running
+        on_disk = set(_participant_folders())
+        self._dirty.update(on_disk.symmetric_difference(Catalog().entries()))
+        self.__flush()
+
+    def __flush(self) -> None:
+        catalog = Catalog()
+        while self._dirty:
+            day, person = self._dirty.pop()
+            catalog.refresh_participant(day, person)
+
+    def __open_inotify(self) -> bool:
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = self._libc.inotify_init1(IN_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            logging.warning(f"Inotify is not available, falling back to polling: {e}")
+            return False
+        if fd < 0:
+            logging.warning(f"Inotify couldn't be initialized, falling back to polling: "
+                            f"{os.strerror(ctypes.get_errno())}")
+            return False
+        self._fd = fd
+        os.makedirs(storage_path, exist_ok=True)
+        self.__add_watches(storage_path)
+        return True
+
+    def __add_watches(self, path: str) -> None:
+        depth = _depth(path)
+        if depth > WATCH_DEPTH or _ignored(path):
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            logging.warning(f"Folder {path} couldn't be watched: {os.strerror(ctypes.get_errno())}")
+            return
+        self._watches[wd] = path
+        if depth < WATCH_DEPTH:
+            for child in _sub_folders(path):
+                self.__add_watches(os.path.join(path, child))
+
+    def __watch_inotify(self) -> None:
+        self.__reconcile()
+        while not self._stopping:
+            # Wait for the next event, or refresh the pending participants once the storage is quiet
+            readable, _, _ = select.select([self._fd], [], [], DEBOUNCE_INTERVAL if self._dirty else 1.0)
+            if not readable:
+                self.__flush()
+                continue
+            buffer = os.read(self._fd, 64 * 1024)
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+                name = os.fsdecode(buffer[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0"))
+                offset += EVENT_HEADER.size + length
+                self.__handle_event(wd, mask, name)
+
+    def __handle_event(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            logging.warning("Inotify events have been lost, rebuilding the catalog.")
+            Catalog().rebuild()
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+        folder = self._watches.get(wd)
+        if folder is None:
+            return
+        path = os.path.join(folder, name) if name else folder
+        if _ignored(path) or (_depth(path) == 1 and not mask & IN_ISDIR):
+            return
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+            self.__add_watches(path)
+        self._dirty.update(_affected_participants(path))
+
+    def __watch_polling(self) -> None:
+        self.__reconcile()
+        self._signatures = self.__poll()
+        while not self._wakeup.wait(self.interval):
+            signatures = self.__poll()
+            for key in set(signatures).union(self._signatures):
+                if signatures.get(key) != self._signatures.get(key):
+                    self._dirty.add(key)
+            self._signatures = signatures
+            self.__flush()
+
+    def __poll(self) -> Dict[ParticipantKey, tuple]:
+        # The participants of a day are only listed again once the modification time of the day folder has changed
+        days = {}
+        signatures = {}
+        for day in _sub_folders(storage_path):
+            day_path = os.path.join(storage_path, day)
+            modified = _modification_time(day_path)
+            if modified is None:
+                continue
+            previous = self._days.get(day)
+            people = previous[1] if previous is not None and previous[0] == modified else _sub_folders(day_path)
+            days[day] = (modified, people)
+            for person in people:
+                signatures[(day, person)] = _signature(os.path.join(day_path, person))
+        self._days = days
+        return signatures
+
+
+def _depth(path: str) -> int:
+    """
+    Helper function which returns the depth of a path below the main storage.
+    """
+    relative = os.path.relpath(path, storage_path)
+    return 0 if relative == os.curdir else len(relative.split(os.sep))
+
+
+def _ignored(path: str) -> bool:
+    """
+    Helper function which checks if a path belongs to hidden files, the log folder or files of the storage root.
+    """
+    relative = os.path.relpath(path, storage_path)
+    if relative == os.curdir:
+        return False
+    parts = relative.split(os.sep)
+    return any(part.startswith(".") for part in parts) or ENVParser().log_filename in parts[:2]
+
+
+def _affected_participants(path: str) -> Iterable[ParticipantKey]:
+    """
+    Helper function which returns the participants affected by a change of a path in the main storage.
+    """
+    parts = os.path.relpath(path, storage_path).split(os.sep)
+    if len(parts) >= 2:
+        return [(parts[0], parts[1])]
+    if parts[0] == os.curdir:
+        return []
+    if os.path.isdir(path):
+        return [(parts[0], person) for person in _sub_folders(path)]
+    # A removed day affects every participant of that day in the catalog
+    return [(day, person) for day, person in Catalog().entries() if day == parts[0]]
+
+
+def _sub_folders(path: str) -> list:
+    """
+    Helper function which lists the visible sub folders of a path.
+    """
+    try:
+        with os.scandir(path) as entries:
+            return [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)
+                    and not entry.name.startswith(".") and entry.name != ENVParser().log_filename]
+    except OSError:
+        return []
+
+
+def _participant_folders() -> Iterable[ParticipantKey]:
+    """
+    Helper function which lists the day and participant of every participant folder in the main storage.
+    """
+    for day in _sub_folders(storage_path):
+        for person in _sub_folders(os.path.join(storage_path, day)):
+            yield day, person
+
+
+def _modification_time(path: str) -> Optional[int]:
+    """
+    Helper function which returns the modification time of a path in nanoseconds, None if it doesn't exist.
+    """
+    try:
+        return os.stat(path, follow_symlinks=False).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _signature(path: str) -> Tuple[Optional[int], ...]:
+    """
+    Helper function which summarizes the state of a participant folder by the modification times of the folder and its
+    stream folders. They change whenever a trigger window, video or metadata file is added, removed or renamed.
+    """
+    paths = [path] + [os.path.join(path, stream) for stream in STREAM_OUTPUT_NAMES]
+    return tuple(_modification_time(entry) for entry in paths)
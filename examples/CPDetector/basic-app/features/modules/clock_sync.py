@@ -0,0 +1,103 @@
+"""
+This module provides functionality to map device timestamps to the host clock.
+
+It defines the ClockSync class which estimates the offset and drift between the clock of the camera and the host clock
+from the timestamps of the received messages.
+
+Classes:
+    ClockSync: Estimates the offset and drift of the device clock and maps device timestamps to the host clock.
+"""
+
+import logging
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+
+class ClockSync:
+    """
+    Estimates the offset and drift of the device clock and maps device timestamps to the host clock.
+
+    Every received message gives a sample of the offset between the host clock and the device clock, increased by the
+    transfer latency of the message. The smallest offset of a block of samples has the least latency, so only the
+    minimum of every block is kept. The offset and drift are fitted with a linear regression over the last blocks,
+    which makes mapping a timestamp a single multiply-add.
+
+    Attributes:
+        block_size (int): The number of samples of which the minimum offset is kept.
+        offset (float): The estimated offset of the host clock at the reference time in seconds.
+        drift (float): The estimated drift of the device clock in seconds per second.
+        samples (int): The number of samples observed so far.
+        _blocks (deque): The device time and minimum offset of the last blocks.
+        _reference (float): The device time the offset refers to.
+    """
+
+    def __init__(self, block_size: int = 30, blocks: int = 60):
+        self.block_size = block_size
+        self.offset = None
+        self.drift = 0.0
+        self.samples = 0
+        self._blocks = deque(maxlen=blocks)
+        self._reference = 0.0
+        self._block_offset = None
+        self._block_device = None
+        self._block_count = 0
+
+    def observe(self, device_seconds: float, host_seconds: float) -> None:
+        """
+        Adds a sample of the offset between both clocks.
+
+        Args:
+            device_seconds (float): The device timestamp of a message.
+            host_seconds (float): The time the message has been received on the host clock in seconds since the epoch.
+        """
+        offset = host_seconds - device_seconds
+        self.samples += 1
+        if self._block_offset is None or offset < self._block_offset:
+            self._block_offset = offset
+            self._block_device = device_seconds
+        if not self._blocks and (self.offset is None or offset < self.offset):
+            # Best estimate until the first block is complete
+            self.offset = offset
+            self._reference = device_seconds
+        self._block_count += 1
+        if self._block_count >= self.block_size:
+            self._blocks.append((self._block_device, self._block_offset))
+            self._block_offset, self._block_device, self._block_count = None, None, 0
+            self.__fit()
+
+    def to_host(self, device_seconds: float) -> Optional[float]:
+        """
+        Maps a device timestamp to the host clock.
+
+        Args:
+            device_seconds (float): The device timestamp.
+
+        Returns:
+            Optional[float]: The time on the host clock in seconds since the epoch, None if no sample was observed.
+        """
+        if self.offset is None:
+            return None
+        return device_seconds + self.offset + self.drift * (device_seconds - self._reference)
+
+    @property
+    def attributes(self) -> dict:
+        """
+        Returns the current estimate, to be stored together with the recorded frames.
+        """
+        return {
+            "clock_offset": self.offset,
+            "clock_reference": self._reference,
+            "clock_drift_ppm": self.drift * 1e6,
+            "clock_samples": self.samples,
+        }
+
+    def __fit(self) -> None:
+        device, offset = np.array(self._blocks, dtype=np.float64).T
+        self._reference = float(device.mean())
+        self.offset = float(offset.mean())
+        spread = np.square(device - self._reference).sum()
+        if len(self._blocks) > 1 and spread > 0:
+            self.drift = float(((device - self._reference) * (offset - self.offset)).sum() / spread)
+        logging.debug(f"Clock sync: offset {self.offset:.6f}s, drift {self.drift * 1e6:.2f}ppm")
@@ -0,0 +1,304 @@
+"""
+This module provides functionality to convert recorded sessions in the background.
+
+It defines the ConversionService class which runs conversion jobs in a process pool and the ConversionJob model which
+describes a single job.
+
+Classes:
+    ConversionJob: Describes the conversion of a single recorded session.
+    ConversionService: Runs conversion jobs in a process pool, ordered by priority.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from features.file_operations import storage_path
+from features.file_operations.catalog import Catalog
+from features.file_operations.thumbnails import ThumbnailCache
+from features.file_operations.conversion_worker import convert_window, initialize_worker, list_conversion_tasks
+from features.modules.device_manager import DeviceManager, RECORD_MODE
+
+JOBS_FILE_NAME = "conversion_jobs.json"
+# Times a task is started again after its worker died, e.g. by the OOM killer, before it is counted as failed
+MAX_TASK_RESTARTS = 2
+
+
+class ConversionJob(BaseModel):
+    """
+    Describes the conversion of a single recorded session.
+
+    Attributes:
+        day (str): The day of the session.
+        person (str): The person of the session.
+        priority (int): Jobs with a higher priority are started first.
+        created (float): The time the job was submitted.
+        status (str): One of pending, running, done or failed.
+        total (int): The number of trigger windows to convert.
+        completed (List[str]): The trigger windows which have already been converted.
+        failed (List[str]): The trigger windows which could not be converted.
+    """
+    day: str
+    person: str
+    priority: int = 0
+    created: float = 0
+    status: str = "pending"
+    total: int = 0
+    completed: List[str] = []
+    failed: List[str] = []
+
+    @property
+    def key(self) -> str:
+        """
+        Returns the unique key of the job.
+        """
+        return f"{self.day}/{self.person}"
+
+    @property
+    def progress(self) -> float:
+        """
+        Returns the share of converted trigger windows between 0 and 1.
+        """
+        return (len(self.completed) + len(self.failed)) / self.total if self.total else 0.0
+
+
+class ConversionService:
+    """
+    Runs conversion jobs in a process pool, ordered by priority.
+
+    Jobs are persisted after every change, so that pending and interrupted jobs are resumed after a restart. While the
+    camera is recording, only one conversion task runs at a time and the workers are lowered in CPU and IO priority.
+    If a worker dies, the process pool is replaced and the tasks it was running are started again.
+
+    Attributes:
+        _instance (ConversionService): Singleton instance of the ConversionService class.
+        workers (int): The maximum number of conversion tasks running in parallel.
+        _jobs (dict): All known jobs by key.
+        _queue (list): The trigger windows of running jobs which still have to be submitted.
+        _in_flight (set): The tasks currently running in the process pool.
+        _restarts (dict): The number of times a task has been started again after its worker died.
+        _lock (threading.Condition): Guards the job state and wakes up the scheduler.
+        _recording (multiprocessing.Event): Set while the camera is recording, shared with the workers.
+    """
+    _instance = None
+    workers = 1
+    _jobs = None
+    _queue = None
+    _in_flight = None
+    _restarts = None
+    _lock = None
+    _recording = None
+    _executor = None
+    _thread = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate conversion service instance.")
+            cls._instance = super(ConversionService, cls).__new__(cls)
+            cls.workers = max(1, (os.cpu_count() or 2) - 1)
+            cls._jobs = {}
+            cls._queue = []
+            cls._in_flight = set()
+            cls._restarts = {}
+            cls._lock = threading.Condition()
+            cls._instance.__load()
+        return cls._instance
+
+    def start(self) -> None:
+        """
+        Starts the process pool and the scheduler thread. Calling it again has no effect.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._recording = multiprocessing.get_context("spawn").Event()
+            self.__create_executor()
+            self._thread = threading.Thread(target=self.__schedule, name="conversion-service", daemon=True)
+            self._thread.start()
+        logging.info(f"Conversion service started with {self.workers} workers.")
+
+    def submit(self, day: str, person: str, priority: int = 0) -> ConversionJob:
+        """
+        Adds a conversion job for a recorded session. A session which is already queued keeps its job.
+
+        Args:
+            day (str): The day of the session.
+            person (str): The person of the session.
+            priority (int): Jobs with a higher priority are started first.
+
+        Returns:
+            ConversionJob: The job of the session.
+        """
+        with self._lock:
+            job = self._jobs.get(f"{day}/{person}")
+            if job is None or job.status in ("done", "failed"):
+                job = ConversionJob(day=day, person=person, priority=priority, created=time.time())
+                self._jobs[job.key] = job
+                self.__persist()
+                logging.info(f"Conversion of {job.key} has been queued.")
+            self._lock.notify_all()
+            return job.model_copy(deep=True)
+
+    def is_converting(self, day: str, person: str, stream: str, window: str) -> bool:
+        """
+        Checks if a trigger window is queued or being converted, so its raw frames are still needed.
+
+        Args:
+            day (str): The day of the session.
+            person (str): The person of the session.
+            stream (str): The stream folder of the window, e.g. depth_frames.
+            window (str): The name of the trigger window.
+
+        Returns:
+            bool: True if the window has a queued or running task, or belongs to a job which hasn't started yet.
+        """
+        task = (day, person, stream, window)
+        with self._lock:
+            if task in self._in_flight or task in self._queue:
+                return True
+            job = self._jobs.get(f"{day}/{person}")
+            # The tasks of a pending job are only listed once it starts
+            return job is not None and job.status == "pending" and f"{stream}/{window}" not in job.completed
+
+    @property
+    def jobs(self) -> List[ConversionJob]:
+        """
+        Returns a copy of all jobs, the most recent first.
+        """
+        with self._lock:
+            jobs = [job.model_copy(deep=True) for job in self._jobs.values()]
+        return sorted(jobs, key=lambda job: job.created, reverse=True)
+
+    def __create_executor(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                             initializer=initialize_worker, initargs=(self._recording,),
+                                             max_tasks_per_child=1)
+
+    def __schedule(self) -> None:
+        manager = DeviceManager()
+
+        while True:
+            with self._lock:
+                try:
+                    # Viewing doesn't compete with conversion for the disk, only recording does
+                    self.__update_recording_state(manager.mode == RECORD_MODE)
+                    limit = 1 if self._recording.is_set() else self.workers
+                    while len(self._in_flight) < limit:
+                        task = self.__next_task()
+                        if task is None:
+                            break
+                        try:
+                            future = self._executor.submit(convert_window, *task)
+                        except BrokenProcessPool:
+                            logging.warning("Conversion process pool is broken, it's replaced.")
+                            self._queue.insert(0, task)
+                            self._executor.shutdown(wait=False)
+                            self.__create_executor()
+                            continue
+                        self._in_flight.add(task)
+                        future.add_done_callback(lambda f, t=task: self.__finish_task(t, f))
+                except Exception as e:
+                    # The scheduler has to keep running, otherwise queued jobs are never started
+                    logging.error(f"Scheduling conversion tasks failed: {e}")
+                self._lock.wait(timeout=0.5)
+
+    def __update_recording_state(self, recording: bool) -> None:
+        if recording and not self._recording.is_set():
+            # The workers lower their own priority once the event is set
+            self._recording.set()
+            logging.info("Camera is recording: conversion continues with low priority.")
+        elif not recording and self._recording.is_set():
+            self._recording.clear()
+            logging.info("Camera stopped recording: conversion continues with all workers.")
+
+    def __next_task(self) -> Optional[tuple]:
+        if not self._queue:
+            pending = [job for job in self._jobs.values() if job.status == "pending"]
+            if not pending:
+                return None
+            job = min(pending, key=lambda j: (-j.priority, j.created))
+            done = set(job.completed)
+            tasks = list_conversion_tasks(job.day, job.person)
+            job.total = len(tasks)
+            job.failed = []
+            job.status = "running"
+            self._queue = [(job.day, job.person, stream, window) for stream, window in tasks
+                           if f"{stream}/{window}" not in done]
+            if not self._queue:
+                job.status = "done"
+            self.__persist()
+            return self.__next_task()
+        return self._queue.pop(0)
+
+    def __finish_task(self, task: tuple, future) -> None:
+        day, person, stream, window = task
+        try:
+            _, _, _, success = future.result()
+        except BrokenProcessPool:
+            with self._lock:
+                self._in_flight.discard(task)
+                restarts = self._restarts.get(task, 0)
+                if restarts < MAX_TASK_RESTARTS:
+                    # The worker died, the task is started again by a new process pool
+                    logging.warning(f"Worker of conversion task {stream}/{window} of {person} died, it's restarted.")
+                    self._restarts[task] = restarts + 1
+                    self._queue.insert(0, task)
+                    self._lock.notify_all()
+                    return
+            logging.error(f"Conversion task {stream}/{window} of {person} failed: its worker died "
+                          f"{MAX_TASK_RESTARTS + 1} times.")
+            success = False
+        except Exception as e:
+            logging.error(f"Conversion task {stream}/{window} of {person} failed: {e}")
+            success = False
+
+        if success:
+            Catalog().mark_converted(day, person, stream, window)
+            ThumbnailCache().request_participant(day, person)
+        with self._lock:
+            self._in_flight.discard(task)
+            self._restarts.pop(task, None)
+            job = self._jobs.get(f"{day}/{person}")
+            if job is not None:
+                (job.completed if success else job.failed).append(f"{stream}/{window}")
+                if len(job.completed) + len(job.failed) >= job.total:
+                    job.status = "failed" if job.failed else "done"
+                    logging.info(f"Conversion of {job.key} has been completed with status: {job.status}")
+                self.__persist()
+            self._lock.notify_all()
+
+    def __load(self) -> None:
+        path = os.path.join(storage_path, JOBS_FILE_NAME)
+        if not os.path.isfile(path):
+            return
+        try:
+            with open(path, "r") as file:
+                for data in json.load(file):
+                    job = ConversionJob(**data)
+                    if job.status == "done":
+                        continue
+                    if job.status == "running":  # Interrupted by a restart, continue with the remaining windows
+                        job.status = "pending"
+                    self._jobs[job.key] = job
+            logging.info(f"Loaded {len(self._jobs)} conversion jobs.")
+        except (OSError, ValueError) as e:
+            logging.warning(f"Conversion jobs couldn't be loaded: {e}")
+
+    def __persist(self) -> None:
+        path = os.path.join(storage_path, JOBS_FILE_NAME)
+        try:
+            os.makedirs(storage_path, exist_ok=True)
+            with open(f"{path}.tmp", "w") as file:
+                json.dump([job.model_dump() for job in self._jobs.values()], file)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logging.warning(f"Conversion jobs couldn't be persisted: {e}")
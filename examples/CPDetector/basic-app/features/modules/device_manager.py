@@ -0,0 +1,320 @@
+"""
+This module provides functionality to keep the camera booted across recording and viewing.
+
+It defines the DeviceManager class which boots the device once with a pipeline that contains the outputs of both
+modes, set up by the active capture profile. Switching between recording and viewing only enables the outputs of the
+requested mode at runtime, so the firmware doesn't have to be booted again.
+
+Classes:
+    DeviceManager: Keeps a single device booted and switches its outputs between recording and viewing.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+import depthai as dai
+
+from features.modules.capture_profile import CaptureProfile
+from features.modules.clock_sync import ClockSync
+from features.modules.device_presence import DevicePresenceMonitor
+
+IDLE_MODE = 0
+RECORD_MODE = 1
+VIEW_MODE = 2
+
+ENCODER_PROFILES = {
+    "H264": dai.VideoEncoderProperties.Profile.H264_MAIN,
+    "H265": dai.VideoEncoderProperties.Profile.H265_MAIN,
+}
+
+# Largest time difference between the color and depth frame of a recorded pair
+PAIR_THRESHOLD_MS = 10
+# Size of the color frames shown while viewing, a multiple of 16 for the encoder
+VIEW_SIZE = (1024, 576)
+# JPEG quality of the preview frames
+PREVIEW_QUALITY = 80
+# Reports per second of the temperature, CPU and memory usage of the device
+SYSTEM_INFORMATION_RATE = 1
+
+# Runs on the device and forwards the frame pairs of the enabled mode only
+GATE_SCRIPT = f"""
+mode = {IDLE_MODE}
+while True:
+    control = node.io['control'].tryGet()
+    if control is not None:
+        mode = control.getData()[0]
+    if mode == {RECORD_MODE}:
+        node.io['record_out'].send(node.io['record'].get())
+    elif mode == {VIEW_MODE}:
+        node.io['view_out'].send(node.io['view'].get())
+    else:
+        # Sleep until another mode is requested
+        mode = node.io['control'].get().getData()[0]
+"""
+
+
+class DeviceManager:
+    """
+    Keeps a single device booted and switches its outputs between recording and viewing.
+
+    The pipeline contains the synchronized recording pairs and the MJPEG encoded viewing pairs. A script node on the
+    device forwards only the pairs of the current mode, which is changed through an input queue.
+
+    Attributes:
+        _instance (DeviceManager): Singleton instance of the DeviceManager class.
+        device (dai.Device): The booted device, None if no device is open.
+        record_queue (dai.DataOutputQueue): The synchronized pairs for recording.
+        view_queue (dai.DataOutputQueue): The synchronized MJPEG encoded pairs for viewing.
+        system_queue (dai.DataOutputQueue): The temperature, CPU and memory usage reports of the device.
+        clock (ClockSync): Maps the timestamps of the open device to the host clock.
+        profile (CaptureProfile): The capture profile the open device has been booted with.
+        mode (int): The enabled outputs, IDLE_MODE, RECORD_MODE or VIEW_MODE.
+        _control_queue (dai.DataInputQueue): Sends the mode to the script node.
+        _switched_at (float): The time of the last mode switch.
+        _first_frame_logged (bool): Indicates if the time to the first frame has been logged since the last switch.
+    """
+    _instance = None
+    device = None
+    record_queue = None
+    view_queue = None
+    system_queue = None
+    clock = None
+    profile = None
+    mode = IDLE_MODE
+    _control_queue = None
+    _switched_at = 0.0
+    _first_frame_logged = True
+    _lock = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate device manager instance.")
+            cls._instance = super(DeviceManager, cls).__new__(cls)
+            cls._lock = threading.Lock()
+        return cls._instance
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Checks if a device is booted and not closed.
+        """
+        return self.device is not None and not self.device.isClosed()
+
+    def open(self, profile: CaptureProfile, block: bool = False) -> None:
+        """
+        Boots the device with the pipeline of both modes. Does nothing if the device is already open with the profile.
+
+        Args:
+            profile (CaptureProfile): The capture profile which sets up the cameras.
+            block (bool): Whether the output queues block the device if they are full. Defaults to False.
+        """
+        with self._lock:
+            if self.is_open and self.profile == profile:
+                return
+            if self.is_open:
+                logging.info(f"Capture profile changed to {profile.name}, the device is booted again.")
+                self.device.close()
+            start = time.perf_counter()
+            pipeline = self.__create_pipeline(profile)
+            self.device = dai.Device(pipeline)
+            self.device.setIrLaserDotProjectorIntensity(1)  # Enhancement of depth perception
+            self.device.setIrFloodLightIntensity(0)  # Enhancement of low light performance
+            self.device.readCalibration().setFov(dai.CameraBoardSocket.CAM_B, 127)
+            self.device.readCalibration().setFov(dai.CameraBoardSocket.CAM_C, 127)
+            self._control_queue = self.device.getInputQueue("control")
+            # Messages buffered per output queue on the host, so short hiccups of the host don't drop frames
+            self.record_queue = self.device.getOutputQueue(name="pairs", maxSize=profile.queue_size, blocking=block)
+            self.view_queue = self.device.getOutputQueue(name="xout", maxSize=profile.queue_size, blocking=block)
+            self.system_queue = self.device.getOutputQueue(name="sysinfo", maxSize=1, blocking=False)
+            self.clock = ClockSync(block_size=profile.fps)
+            self.profile = profile
+            self.mode = IDLE_MODE
+            DevicePresenceMonitor().device = self.device
+            logging.info(f"Device booted with the {profile.name} capture profile in "
+                         f"{time.perf_counter() - start:.2f}s.")
+
+    def switch(self, mode: int) -> None:
+        """
+        Enables the outputs of a mode and disables all others.
+
+        Args:
+            mode (int): The mode to enable, IDLE_MODE, RECORD_MODE or VIEW_MODE.
+        """
+        if not self.is_open or mode == self.mode:
+            return
+        buffer = dai.Buffer()
+        buffer.setData([mode])
+        self._control_queue.send(buffer)
+        # Frames of the previous mode are not of interest anymore
+        self.record_queue.tryGetAll()
+        self.view_queue.tryGetAll()
+        self.mode = mode
+        self._switched_at = time.perf_counter()
+        self._first_frame_logged = mode == IDLE_MODE
+        logging.info(f"Device switched to mode: {mode}")
+
+    def log_first_frame(self) -> None:
+        """
+        Logs the time from the last mode switch to the first received frame. Only the first call after a switch logs.
+        """
+        if self._first_frame_logged:
+            return
+        self._first_frame_logged = True
+        logging.info(f"First frame received {(time.perf_counter() - self._switched_at) * 1000:.0f}ms after the "
+                     f"mode switch.")
+
+    def system_information(self) -> Optional[dai.SystemInformation]:
+        """
+        Returns the latest temperature, CPU and memory usage report of the device without waiting.
+
+        Returns:
+            Optional[dai.SystemInformation]: The report, None if the device is not open or hasn't reported yet.
+        """
+        if not self.is_open:
+            return None
+        try:
+            return self.system_queue.tryGet()
+        except RuntimeError:  # Closed in the meantime
+            return None
+
+    def close(self) -> None:
+        """
+        Closes the device, e.g. after it has been disconnected.
+        """
+        with self._lock:
+            if self.device is not None:
+                try:
+                    self.device.close()
+                except RuntimeError as e:
+                    logging.warning(f"Device couldn't be closed cleanly: {e}")
+            self.device = None
+            self.mode = IDLE_MODE
+            DevicePresenceMonitor().device = None
+            logging.info("Device closed.")
+
+    def __create_pipeline(self, profile: CaptureProfile) -> dai.Pipeline:
+        fps = profile.fps
+        pipeline = dai.Pipeline()
+
+        # Define sources and outputs
+        color = pipeline.create(dai.node.ColorCamera)
+        color.setResolution(getattr(dai.ColorCameraProperties.SensorResolution, profile.color_resolution))
+        if profile.isp_scale is not None:
+            # Scaled on the device, so less data has to be sent and stored
+            color.setIspScale(*profile.isp_scale)
+        color.initialControl.setAutoExposureLimit(2000)
+        color.setFps(fps)
+        color.setCamera("color")
+
+        monoLeft = pipeline.create(dai.node.MonoCamera)
+        monoLeft.setResolution(getattr(dai.MonoCameraProperties.SensorResolution, profile.mono_resolution))
+        monoLeft.setFps(fps)
+
+        monoRight = pipeline.create(dai.node.MonoCamera)
+        monoRight.setResolution(getattr(dai.MonoCameraProperties.SensorResolution, profile.mono_resolution))
+        monoRight.setFps(fps)
+
+        stereo = pipeline.create(dai.node.StereoDepth)
+        stereo.setDefaultProfilePreset(getattr(dai.node.StereoDepth.PresetMode, profile.stereo_preset))
+        stereo.initialConfig.setMedianFilter(dai.MedianFilter.MEDIAN_OFF)
+        stereo.setLeftRightCheck(False)  # This is required to align Depth with Color. Otherwise set to False
+        stereo.setExtendedDisparity(
+            False)  # This needs to be set to False. Otherwise the number of frames differ for depth and color
+        stereo.setSubpixel(False)
+        if profile.depth_decimation > 1:
+            # Decimated on the device, so fewer depth pixels are sent and stored
+            config = stereo.initialConfig.get()
+            config.postProcessing.decimationFilter.decimationFactor = profile.depth_decimation
+            stereo.initialConfig.set(config)
+
+        monoLeft.out.link(stereo.left)
+        monoRight.out.link(stereo.right)
+
+        # Gate between the outputs of both modes
+        control = pipeline.create(dai.node.XLinkIn)
+        control.setStreamName("control")
+        gate = pipeline.create(dai.node.Script)
+        gate.setScript(GATE_SCRIPT)
+        control.out.link(gate.inputs["control"])
+        for name in ("record", "view"):
+            # The pairs of the disabled mode are overwritten instead of stalling the pipeline
+            gate.inputs[name].setBlocking(False)
+            gate.inputs[name].setQueueSize(1)
+
+        # Recording: color and depth frames paired on the device
+        record_sync = pipeline.create(dai.node.Sync)
+        record_sync.setSyncThreshold(timedelta(milliseconds=PAIR_THRESHOLD_MS))
+        if not profile.color:
+            logging.info("Color frames are not recorded with this capture profile.")
+        elif profile.encoding in ENCODER_PROFILES:
+            # Encode on the device, so only the bitstream is sent over XLink and no host conversion is required
+            encoder = pipeline.create(dai.node.VideoEncoder)
+            encoder.setDefaultProfilePreset(fps, ENCODER_PROFILES[profile.encoding])
+            encoder.setKeyframeFrequency(max(1, fps // 2))
+            color.video.link(encoder.input)
+            encoder.out.link(record_sync.inputs["video"])
+            logging.info(f"Encode color frames on the device with {profile.encoding}.")
+        else:
+            color.video.link(record_sync.inputs["video"])
+        crop = profile.depth_crop
+        if crop is None:
+            stereo.depth.link(record_sync.inputs["disparity"])
+        else:
+            # Only the walking corridor of the depth frames is sent
+            x, y, width, height = crop
+            frame_width, frame_height = profile.decimated_depth_size
+            corridor = pipeline.create(dai.node.ImageManip)
+            corridor.initialConfig.setCropRect(x / frame_width, y / frame_height, (x + width) / frame_width,
+                                               (y + height) / frame_height)
+            corridor.setMaxOutputFrameSize(width * height * 2)
+            stereo.depth.link(corridor.inputImage)
+            corridor.out.link(record_sync.inputs["disparity"])
+            logging.info(f"Crop the depth frames to {width}x{height} at ({x}, {y}) on the device.")
+        record_sync.out.link(gate.inputs["record"])
+
+        record_out = pipeline.create(dai.node.XLinkOut)
+        record_out.setStreamName("pairs")
+        gate.outputs["record_out"].link(record_out.input)
+
+        # Viewing: color frames and colored disparity encoded as MJPEG on the device, so the host only forwards them
+        resize = pipeline.create(dai.node.ImageManip)
+        resize.initialConfig.setResize(*VIEW_SIZE)
+        resize.initialConfig.setFrameType(dai.ImgFrame.Type.NV12)
+        resize.setMaxOutputFrameSize(VIEW_SIZE[0] * VIEW_SIZE[1] * 3 // 2)
+        color.video.link(resize.inputImage)
+        color_encoder = pipeline.create(dai.node.VideoEncoder)
+        color_encoder.setDefaultProfilePreset(fps, dai.VideoEncoderProperties.Profile.MJPEG)
+        color_encoder.setQuality(PREVIEW_QUALITY)
+        resize.out.link(color_encoder.input)
+
+        colormap = pipeline.create(dai.node.ImageManip)
+        colormap.initialConfig.setColormap(dai.Colormap.JET, stereo.initialConfig.getMaxDisparity())
+        colormap.initialConfig.setFrameType(dai.ImgFrame.Type.NV12)
+        colormap.setMaxOutputFrameSize(monoLeft.getResolutionWidth() * monoLeft.getResolutionHeight() * 3 // 2)
+        stereo.disparity.link(colormap.inputImage)
+        depth_encoder = pipeline.create(dai.node.VideoEncoder)
+        depth_encoder.setDefaultProfilePreset(fps, dai.VideoEncoderProperties.Profile.MJPEG)
+        depth_encoder.setQuality(PREVIEW_QUALITY)
+        colormap.out.link(depth_encoder.input)
+
+        view_sync = pipeline.create(dai.node.Sync)
+        view_sync.setSyncThreshold(timedelta(milliseconds=50))
+        depth_encoder.out.link(view_sync.inputs["disparity"])
+        color_encoder.out.link(view_sync.inputs["video"])
+        view_sync.out.link(gate.inputs["view"])
+
+        view_out = pipeline.create(dai.node.XLinkOut)
+        view_out.setStreamName("xout")
+        gate.outputs["view_out"].link(view_out.input)
+
+        # Health: temperature, CPU and memory usage, reported independently of the mode
+        system_logger = pipeline.create(dai.node.SystemLogger)
+        system_logger.setRate(SYSTEM_INFORMATION_RATE)
+        system_out = pipeline.create(dai.node.XLinkOut)
+        system_out.setStreamName("sysinfo")
+        system_logger.out.link(system_out.input)
+
+        return pipeline
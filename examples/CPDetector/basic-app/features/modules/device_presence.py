@@ -0,0 +1,111 @@
+"""
+This module provides functionality to watch whether a camera is connected.
+
+It defines the DevicePresenceMonitor class which scans for devices in a single background thread and caches the result
+for all readers.
+
+Classes:
+    DevicePresenceMonitor: Scans for available devices at a fixed rate and caches the result.
+"""
+
+import logging
+import threading
+
+import depthai as dai
+
+from utils.parser import ENVParser
+
+
+class DevicePresenceMonitor:
+    """
+    Scans for available devices at a fixed rate and caches the result.
+
+    A scan is a full XLink discovery, so it runs only in this thread. While the camera is booted by the application it
+    can't be discovered, instead its connection is checked, which notices an unplugged camera even while it's idle.
+
+    Attributes:
+        _instance (DevicePresenceMonitor): Singleton instance of the DevicePresenceMonitor class.
+        interval (float): The time between two scans in seconds.
+        _connected (bool): The result of the last scan or connection check.
+        _version (int): Incremented on every connect and disconnect.
+        _device (dai.Device): The device booted by the application, None if no device is booted.
+        _wakeup (threading.Event): Interrupts the wait between two scans.
+    """
+    _instance = None
+    interval = 2.0
+    _connected = False
+    _version = 0
+    _device = None
+    _wakeup = None
+    _thread = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate device presence monitor instance.")
+            cls._instance = super(DevicePresenceMonitor, cls).__new__(cls)
+            cls.interval = ENVParser().device_scan_interval
+            cls._wakeup = threading.Event()
+        return cls._instance
+
+    def start(self) -> None:
+        """
+        Starts the scanning thread. Calling it again while the thread is alive has no effect.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.__scan, name="device-presence", daemon=True)
+        self._thread.start()
+        logging.info(f"Device presence monitor started with a scan interval of {self.interval}s.")
+
+    def refresh(self) -> None:
+        """
+        Requests a scan without waiting for the end of the current interval.
+        """
+        self._wakeup.set()
+
+    @property
+    def connected(self) -> bool:
+        """
+        Returns True if a camera has been found by the last scan or the booted camera is still connected.
+        """
+        return self._connected
+
+    @property
+    def version(self) -> int:
+        """
+        Returns a counter which changes on every connect and disconnect.
+        """
+        return self._version
+
+    @property
+    def device(self) -> dai.Device:
+        return self._device
+
+    @device.setter
+    def device(self, value: dai.Device):
+        """
+        Sets and Gets the device booted by the application.
+
+        Args:
+            value (dai.Device): The booted device, None once it has been closed.
+        """
+        self._device = value
+        self.refresh()
+
+    def __scan(self) -> None:
+        while True:
+            device = self._device
+            try:
+                # The booted device can't be discovered, its connection is closed once it has been unplugged
+                connected = (device is not None and not device.isClosed()) or \
+                    len(dai.DeviceBootloader.getAllAvailableDevices()) > 0
+            except Exception as e:
+                # The thread has to keep running, otherwise every session shows the last state forever
+                logging.warning(f"Scanning for devices failed: {e}")
+                connected = False
+            if connected != self._connected:
+                self._connected = connected
+                self._version += 1
+                logging.info(f"Camera has been {'connected' if connected else 'disconnected'}.")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
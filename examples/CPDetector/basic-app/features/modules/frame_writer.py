@@ -0,0 +1,243 @@
+"""
+This module provides functionality to write recorded frames to disk while the camera keeps capturing.
+
+It defines the FrameWriter class which buffers frames in a bounded queue and drains them to disk in a background thread.
+
+Classes:
+    FrameWriter: Buffers recorded frames and writes them to disk in a background thread.
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from features.file_operations.recording_container import ContainerWriter, RecordedFrame, RAW_CODEC
+from features.modules.window_manifest import WindowManifest
+from utils.custom_logger import RateLimitedLog
+
+# Seconds between two logs of a saved frame
+FRAME_LOG_INTERVAL = 1
+
+
+class FrameWriter:
+    """
+    Buffers recorded frames and writes them to disk in a background thread.
+
+    Frames are pushed by the capture loop without ever waiting for the disk. If the buffer is full, the incoming
+    frame pair is dropped and counted instead. An encoded stream can't be decoded past a missing packet, so after a
+    drop of encoded frames all pairs are dropped until the next keyframe.
+
+    Attributes:
+        capacity (int): Maximum number of frame pairs held in memory.
+        rgb_codec (str): The codec of the rgb frames, "raw" for uncompressed frames.
+        _buffer (deque): Pending window markers and frame pairs.
+        _condition (threading.Condition): Guards the buffer and wakes up the writer thread.
+        _buffered_frames (int): Number of frame pairs currently held in the buffer.
+        _pending_frames (int): Number of frame pairs that have not been written yet.
+        _dropped_frames (int): Number of frame pairs dropped because the buffer was full.
+        _high_water (int): Largest number of frame pairs held in the buffer since the last window was closed.
+        _awaiting_keyframe (bool): Indicates if encoded frames have been dropped and the next keyframe is awaited.
+        _keyframe_gaps (int): Number of times the encoded stream was resumed at a keyframe since the last window was
+            closed.
+        _bytes_written (int): Number of frame data bytes written since the writer was created.
+        _running (bool): Indicates if the writer thread is accepting work.
+        _thread (threading.Thread): The background writer thread.
+        _frame_log (RateLimitedLog): Logs the saved frames at a bounded rate.
+    """
+
+    def __init__(self, capacity: int, rgb_codec: str = RAW_CODEC):
+        self.capacity = capacity
+        self.rgb_codec = rgb_codec
+        self._buffer = deque()
+        self._condition = threading.Condition()
+        self._buffered_frames = 0
+        self._pending_frames = 0
+        self._dropped_frames = 0
+        self._high_water = 0
+        self._awaiting_keyframe = False
+        self._keyframe_gaps = 0
+        self._bytes_written = 0
+        self._running = False
+        self._thread = None
+        self._frame_log = RateLimitedLog(FRAME_LOG_INTERVAL)
+
+    def start(self) -> None:
+        """
+        Starts the background writer thread.
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self.__drain, name="frame-writer", daemon=True)
+        self._thread.start()
+        logging.debug(f"Frame writer started with a capacity of {self.capacity} frame pairs.")
+
+    def stop(self) -> None:
+        """
+        Stops the writer thread after all buffered frames have been written.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logging.debug("Frame writer stopped.")
+
+    def open_window(self, depth_path: str, rgb_path: Optional[str], manifest: Optional[WindowManifest] = None) -> None:
+        """
+        Starts a new trigger window. All following frames are written into the given folders.
+
+        Args:
+            depth_path (str): The folder to store the depth frames of the window in.
+            rgb_path (str): The folder to store the rgb frames of the window in, None if no rgb frames are recorded.
+            manifest (Optional[WindowManifest]): The manifest every written frame is added to. It's stored next to the
+                depth frames when the window is closed.
+        """
+        self.__enqueue(("open", depth_path, rgb_path, manifest))
+
+    def close_window(self, discard: bool = False, attributes: Optional[dict] = None) -> None:
+        """
+        Ends the current trigger window.
+
+        Args:
+            discard (bool): Whether the frames already written for the window should be removed again.
+            attributes (Optional[dict]): Additional attributes stored in the header of both containers.
+        """
+        with self._condition:
+            high_water, self._high_water = self._high_water, self._buffered_frames
+            keyframe_gaps, self._keyframe_gaps = self._keyframe_gaps, 0
+        self.__enqueue(("close", discard, attributes, high_water, keyframe_gaps))
+
+    def push(self, depth_frame: RecordedFrame, rgb_frame: Optional[RecordedFrame], keyframe: bool = True) -> bool:
+        """
+        Adds a frame pair to the buffer without blocking.
+
+        Args:
+            depth_frame (RecordedFrame): The depth frame.
+            rgb_frame (Optional[RecordedFrame]): The rgb frame, None if no rgb frames are recorded.
+            keyframe (bool): Whether the rgb frame can be decoded on its own. Always True for raw frames.
+
+        Returns:
+            bool: True if the frame pair was buffered, False if it was dropped.
+        """
+        with self._condition:
+            if self._awaiting_keyframe and not keyframe:
+                self._dropped_frames += 1
+                return False
+            if self._buffered_frames >= self.capacity:
+                self._dropped_frames += 1
+                if self.rgb_codec != RAW_CODEC and rgb_frame is not None and not self._awaiting_keyframe:
+                    self._awaiting_keyframe = True
+                    self._keyframe_gaps += 1
+                    logging.warning("Encoded frames dropped, the following frames are dropped until the next keyframe.")
+                return False
+            self._awaiting_keyframe = False
+            self._buffer.append(("frame", depth_frame, rgb_frame))
+            self._buffered_frames += 1
+            self._high_water = max(self._high_water, self._buffered_frames)
+            self._pending_frames += 1
+            self._condition.notify()
+        return True
+
+    @property
+    def dropped_frames(self) -> int:
+        """
+        Returns the number of frame pairs dropped because the buffer was full.
+        """
+        return self._dropped_frames
+
+    @property
+    def bytes_written(self) -> int:
+        """
+        Returns the number of frame data bytes written since the writer was created.
+        """
+        return self._bytes_written
+
+    @property
+    def backlog(self) -> int:
+        """
+        Returns the number of frame pairs that still need to be written.
+        """
+        return self._pending_frames
+
+    def __enqueue(self, item: tuple) -> None:
+        with self._condition:
+            self._buffer.append(item)
+            self._condition.notify()
+
+    def __drain(self) -> None:
+        depth_container, rgb_container, manifest = None, None, None
+        while True:
+            with self._condition:
+                while not self._buffer and self._running:
+                    self._condition.wait()
+                if not self._buffer:
+                    break
+                item = self._buffer.popleft()
+                if item[0] == "frame":
+                    self._buffered_frames -= 1
+
+            try:
+                if item[0] == "open":
+                    _, depth_path, rgb_path, manifest = item
+                    depth_container = ContainerWriter(depth_path)
+                    rgb_container = None if rgb_path is None else ContainerWriter(rgb_path, codec=self.rgb_codec)
+                    logging.info(f"Saving frames to: {os.path.basename(depth_path)}")
+                elif item[0] == "close":
+                    _, discard, attributes, high_water, keyframe_gaps = item
+                    self.__close_containers(depth_container, rgb_container, discard=discard, attributes=attributes)
+                    if manifest is not None and depth_container is not None and not discard:
+                        manifest.keyframe_gaps = keyframe_gaps
+                        self.__store_manifest(manifest, depth_container, high_water)
+                    depth_container, rgb_container, manifest = None, None, None
+                elif depth_container is not None:
+                    _, depth_frame, rgb_frame = item
+                    start = time.perf_counter()
+                    depth_bytes = depth_container.append(depth_frame)
+                    rgb_bytes = rgb_container.append(rgb_frame) if rgb_container is not None else 0
+                    self._bytes_written += depth_bytes + rgb_bytes
+                    if manifest is not None:
+                        manifest.add_write_time(time.perf_counter() - start)
+                        manifest.add_frame(os.path.basename(os.path.dirname(depth_container.path)), depth_frame,
+                                           depth_bytes)
+                        if rgb_container is not None:
+                            manifest.add_frame(os.path.basename(os.path.dirname(rgb_container.path)), rgb_frame,
+                                               rgb_bytes)
+                    self._frame_log.log("Frame %d saved to: %s", depth_frame.sequence, depth_container.path)
+            except OSError as e:
+                logging.error(f"Writing frames failed: {e}")
+            finally:
+                if item[0] == "frame":
+                    with self._condition:
+                        self._pending_frames -= 1
+
+        self.__close_containers(depth_container, rgb_container, discard=False)
+
+    def __store_manifest(self, manifest: WindowManifest, depth_container: ContainerWriter, high_water: int) -> None:
+        manifest.window = os.path.basename(depth_container.path)
+        manifest.writer_high_water = high_water
+        manifest.writer_capacity = self.capacity
+        manifest.store(depth_container.path)
+        if manifest.problems:
+            logging.warning(f"Trigger window {manifest.window} has problems: {', '.join(manifest.problems)}")
+
+    @staticmethod
+    def __close_containers(depth_container: ContainerWriter, rgb_container: Optional[ContainerWriter], discard: bool,
+                           attributes: Optional[dict] = None) -> None:
+        if depth_container is None:
+            return
+        containers = [depth_container] if rgb_container is None else [depth_container, rgb_container]
+        for container in containers:
+            container.close(attributes)
+        if discard:
+            for container in containers:
+                shutil.rmtree(container.path, ignore_errors=True)
+            logging.info(f"Discarded frames of: {os.path.basename(depth_container.path)}")
+        else:
+            logging.info(f"{depth_container.frame_count} frames saved at: {os.path.basename(depth_container.path)}")
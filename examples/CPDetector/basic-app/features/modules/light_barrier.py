@@ -2,40 +2,77 @@
 This module provides functionality to manage the light barrier sensor.
 
 It defines the LightBarrier class which handles the initialization and state management of the light barrier sensor.
+Every change of the sensor is reported as a timestamped edge event, captured in the GPIO callback itself.
 
 Classes:
+    EdgeEvent: A change of the light barrier state together with the time it happened.
     LightBarrier: Manages the light barrier sensor operations including initialization and state checking.
 """
 
 import logging
 import platform
+import queue
+import time
+from typing import List, NamedTuple, Optional
+
+from utils.parser import ENVParser
 
 if platform.system() == "Linux":
     from gpiozero import Button, Device
     from gpiozero.pins.lgpio import LGPIOFactory
 
+GPIO_BACKEND = "gpio"
+SIMULATED_BACKEND = "simulated"
+
+
+class EdgeEvent(NamedTuple):
+    """
+    A change of the light barrier state together with the time it happened.
+
+    Attributes:
+        activated (bool): True if the light barrier has been activated, False if it has been released.
+        timestamp (float): The time of the change on the host clock in seconds since the epoch.
+    """
+    activated: bool
+    timestamp: float
+
 
 class LightBarrier:
     """
     Manages the light barrier sensor operations including initialization and state checking.
 
+    The GPIO backend registers edge callbacks on the sensor. The simulated backend is used on machines without GPIO,
+    where edges are created with `simulate`. Both push their edges onto the same queue.
+
     Attributes:
         _instance (LightBarrier): Singleton instance of the LightBarrier class.
         button (Button): The GPIO button instance for the light barrier sensor.
         gpio_exist (bool): Indicates if the GPIO button exists on the system.
+        backend (str): The backend of the light barrier, gpio or simulated.
+        _edges (queue.SimpleQueue): The edge events which have not been consumed yet.
+        _simulated_state (bool): The current state of the simulated backend.
     """
     _instance = None
     button = None
     gpio_exist = False
+    backend = SIMULATED_BACKEND
+    _edges = None
+    _simulated_state = False
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(LightBarrier, cls).__new__(cls)
             logging.debug("Initiate Light Barrier instance.")
-            if platform.system() == "Linux":
+            cls._edges = queue.SimpleQueue()
+            cls.backend = ENVParser().light_barrier_backend or \
+                (GPIO_BACKEND if platform.system() == "Linux" else SIMULATED_BACKEND)
+            if cls.backend == GPIO_BACKEND:
                 Device.pin_factory = LGPIOFactory()
                 cls.button = Button(4, pull_up=False)
+                cls.button.when_pressed = lambda: cls._instance.__on_edge(True)
+                cls.button.when_released = lambda: cls._instance.__on_edge(False)
                 cls.gpio_exist = True
+            logging.info(f"Light barrier uses the {cls.backend} backend.")
         return cls._instance
 
     @property
@@ -49,4 +86,47 @@ class LightBarrier:
         if self.gpio_exist:
             return self.button.value
         else:
-            return False
+            return self._simulated_state
+
+    def poll_edges(self, timeout: Optional[float] = None) -> List[EdgeEvent]:
+        """
+        Returns all edge events which have not been consumed yet.
+
+        Args:
+            timeout (Optional[float]): The time to wait for a first edge if none is pending. Doesn't wait by default.
+
+        Returns:
+            List[EdgeEvent]: The pending edge events in the order they happened.
+        """
+        edges = []
+        try:
+            if timeout:
+                edges.append(self._edges.get(timeout=timeout))
+            while True:
+                edges.append(self._edges.get_nowait())
+        except queue.Empty:
+            pass
+        return edges
+
+    def clear_edges(self) -> None:
+        """
+        Discards all pending edge events.
+        """
+        self.poll_edges()
+
+    def simulate(self, activated: bool, timestamp: Optional[float] = None) -> None:
+        """
+        Creates an edge on the simulated backend.
+
+        Args:
+            activated (bool): The new state of the light barrier.
+            timestamp (Optional[float]): The time of the edge. Defaults to now.
+        """
+        if self.backend != SIMULATED_BACKEND:
+            raise RuntimeError("Edges can only be simulated with the simulated light barrier backend.")
+        self._simulated_state = activated
+        self.__on_edge(activated, timestamp)
+
+    def __on_edge(self, activated: bool, timestamp: Optional[float] = None) -> None:
+        # Runs in the GPIO callback thread, so the time is taken before anything else happens
+        self._edges.put(EdgeEvent(activated, time.time() if timestamp is None else timestamp))
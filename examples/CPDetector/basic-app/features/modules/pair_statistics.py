@@ -0,0 +1,63 @@
+"""
+This module provides functionality to measure how well depth and rgb frames are paired during a recording.
+
+Classes:
+    PairStatistics: Collects match and drop statistics of the synchronized frame pairs of a trigger window.
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PairStatistics(BaseModel):
+    """
+    Collects match and drop statistics of the synchronized frame pairs of a trigger window.
+
+    Attributes:
+        pairs (int): The number of frame pairs received for the window.
+        max_pair_interval_ms (float): The largest time difference between the depth and rgb frame of a pair.
+        mean_pair_interval_ms (float): The mean time difference between the depth and rgb frame of a pair.
+        depth_sequence_gaps (int): The number of depth frames missing between two received pairs.
+        rgb_sequence_gaps (Optional[int]): The number of rgb frames missing between two received pairs, None if no rgb
+            frames are recorded.
+        dropped_pairs (int): The number of pairs dropped by the frame writer because its buffer was full.
+    """
+    pairs: int = 0
+    max_pair_interval_ms: float = 0.0
+    mean_pair_interval_ms: float = 0.0
+    depth_sequence_gaps: int = 0
+    rgb_sequence_gaps: Optional[int] = None
+    dropped_pairs: int = 0
+    _last_depth_sequence: Optional[int] = None
+    _last_rgb_sequence: Optional[int] = None
+
+    def add(self, interval_seconds: float, depth_sequence: int, rgb_sequence: Optional[int]) -> None:
+        """
+        Adds a received frame pair.
+
+        Args:
+            interval_seconds (float): The time difference between the depth and rgb frame of the pair.
+            depth_sequence (int): The sequence number of the depth frame.
+            rgb_sequence (Optional[int]): The sequence number of the rgb frame, None if no rgb frames are recorded.
+        """
+        interval_ms = interval_seconds * 1000
+        self.pairs += 1
+        self.max_pair_interval_ms = max(self.max_pair_interval_ms, interval_ms)
+        self.mean_pair_interval_ms += (interval_ms - self.mean_pair_interval_ms) / self.pairs
+        if self._last_depth_sequence is not None:
+            self.depth_sequence_gaps += max(0, depth_sequence - self._last_depth_sequence - 1)
+        if rgb_sequence is not None:
+            if self._last_rgb_sequence is None:
+                self.rgb_sequence_gaps = 0
+            else:
+                self.rgb_sequence_gaps += max(0, rgb_sequence - self._last_rgb_sequence - 1)
+        self._last_depth_sequence = depth_sequence
+        self._last_rgb_sequence = rgb_sequence
+
+    @property
+    def attributes(self) -> dict:
+        """
+        Returns the statistics, to be stored together with the recorded frames.
+        """
+        return self.model_dump()
@@ -0,0 +1,239 @@
+"""
+This module provides functionality to watch the health of the recording pipeline while it runs.
+
+It defines the PipelineHealth class which samples the frame rates of the camera, the backlog of the frame writer, the
+temperature and load of the device and the load of the host in a single background thread at a bounded rate. The
+dashboard only reads the latest snapshot, so the number of open dashboards doesn't change the sampling cost.
+
+Classes:
+    HealthSnapshot: The state of the recording pipeline at a point in time.
+    PipelineHealth: Samples the state of the recording pipeline in a background thread.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from features.modules.device_manager import DeviceManager
+from utils.parser import ENVParser
+
+# Limits above which the health panel warns, before frames are lost
+BACKLOG_WARNING_RATIO = 0.5
+DEVICE_TEMPERATURE_WARNING = 85
+CPU_WARNING_PERCENT = 90
+FPS_WARNING_RATIO = 0.9
+# Seconds between two logs of the warnings, so a lasting problem doesn't flood the log
+WARNING_LOG_INTERVAL = 30
+
+
+class HealthSnapshot(BaseModel):
+    """
+    The state of the recording pipeline at a point in time.
+
+    Attributes:
+        timestamp (float): The time of the snapshot in seconds since the epoch.
+        target_fps (Optional[int]): The frame rate of the booted capture profile, None if no device is open.
+        capture_fps (Dict[str, float]): The received frames per second by stream, e.g. video and disparity.
+        writer_backlog (int): The frame pairs waiting to be written.
+        writer_capacity (int): The frame pairs the writer holds before it drops frames, 0 if not recording.
+        writer_dropped (int): The frame pairs dropped by the writer during the current recording.
+        disk_write_mb_per_second (float): The frame data written per second by the writer in MB.
+        host_cpu_percent (Optional[float]): The CPU usage of the host, None where /proc/stat isn't available.
+        device_temperature (Optional[float]): The average chip temperature of the device in degrees Celsius.
+        device_css_cpu_percent (Optional[float]): The CPU usage of the LeonCSS core of the device.
+        device_mss_cpu_percent (Optional[float]): The CPU usage of the LeonMSS core of the device.
+        device_ddr_used_mb (Optional[float]): The used DDR memory of the device in MB.
+        device_ddr_total_mb (Optional[float]): The total DDR memory of the device in MB.
+    """
+    timestamp: float = 0.0
+    target_fps: Optional[int] = None
+    capture_fps: Dict[str, float] = {}
+    writer_backlog: int = 0
+    writer_capacity: int = 0
+    writer_dropped: int = 0
+    disk_write_mb_per_second: float = 0.0
+    host_cpu_percent: Optional[float] = None
+    device_temperature: Optional[float] = None
+    device_css_cpu_percent: Optional[float] = None
+    device_mss_cpu_percent: Optional[float] = None
+    device_ddr_used_mb: Optional[float] = None
+    device_ddr_total_mb: Optional[float] = None
+
+    @property
+    def warnings(self) -> List[str]:
+        """
+        Returns a description of every value which indicates that frames are about to be lost.
+        """
+        warnings = []
+        if self.target_fps:
+            for stream, fps in self.capture_fps.items():
+                if 0 < fps < self.target_fps * FPS_WARNING_RATIO:
+                    warnings.append(f"{stream} runs at {fps:.1f} of {self.target_fps} fps")
+        if self.writer_capacity and self.writer_backlog > self.writer_capacity * BACKLOG_WARNING_RATIO:
+            warnings.append(f"writer backlog at {self.writer_backlog} of {self.writer_capacity} frame pairs")
+        if self.writer_dropped:
+            warnings.append(f"{self.writer_dropped} frame pairs dropped by the writer")
+        if self.device_temperature is not None and self.device_temperature > DEVICE_TEMPERATURE_WARNING:
+            warnings.append(f"device at {self.device_temperature:.0f}°C")
+        for name, percent in (("host", self.host_cpu_percent), ("device CSS", self.device_css_cpu_percent),
+                              ("device MSS", self.device_mss_cpu_percent)):
+            if percent is not None and percent > CPU_WARNING_PERCENT:
+                warnings.append(f"{name} CPU at {percent:.0f}%")
+        return warnings
+
+
+class PipelineHealth:
+    """
+    Samples the state of the recording pipeline in a background thread.
+
+    The camera counts its received frames and registers its frame writer, everything else is read by the sampling
+    thread. Every sample replaces the snapshot and increases the version, which the dashboard polls.
+
+    Attributes:
+        _instance (PipelineHealth): Singleton instance of the PipelineHealth class.
+        interval (float): The seconds between two samples.
+        writer (FrameWriter): The frame writer of the current recording, None if not recording.
+        snapshot (HealthSnapshot): The latest sample.
+        version (int): Increased with every sample.
+        _frames (Dict[str, int]): The frames received by stream since the camera was created.
+        _warned_at (float): The time the warnings have been logged last.
+        _stopping (bool): Indicates if the sampling thread should end.
+        _thread (threading.Thread): Takes the samples.
+    """
+    _instance = None
+    interval = 1.0
+    writer = None
+    snapshot = HealthSnapshot()
+    version = 0
+    _frames = None
+    _warned_at = 0.0
+    _stopping = False
+    _thread = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate pipeline health instance.")
+            cls._instance = super(PipelineHealth, cls).__new__(cls)
+            cls.interval = ENVParser().health_refresh_seconds
+            cls._frames = {}
+        return cls._instance
+
+    def add_frame(self, stream: str) -> None:
+        """
+        Counts a frame received from the device. Called by the camera for every frame, so it only increments a counter.
+
+        Args:
+            stream (str): The stream of the frame, e.g. video or disparity.
+        """
+        self._frames[stream] = self._frames.get(stream, 0) + 1
+
+    def start(self) -> None:
+        """
+        Starts the sampling thread. Does nothing if it is already alive.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self.__run, name="pipeline-health", daemon=True)
+        self._thread.start()
+        logging.info(f"Pipeline health sampled every {self.interval}s.")
+
+    def stop(self) -> None:
+        """
+        Stops the sampling thread.
+        """
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __run(self) -> None:
+        previous = (time.monotonic(), dict(self._frames), self.__bytes_written(), _read_cpu_times())
+        while not self._stopping:
+            time.sleep(self.interval)
+            try:
+                previous = self.__sample(*previous)
+            except Exception as e:
+                logging.warning(f"Pipeline health couldn't be sampled: {e}")
+
+    def __sample(self, last_time: float, last_frames: Dict[str, int], last_bytes: int,
+                 last_cpu: Optional[Tuple[int, int]]) -> tuple:
+        now = time.monotonic()
+        elapsed = max(now - last_time, 1e-6)
+        frames = dict(self._frames)
+        bytes_written = self.__bytes_written()
+        cpu = _read_cpu_times()
+        writer = self.writer
+        manager = DeviceManager()
+
+        snapshot = HealthSnapshot(
+            timestamp=time.time(),
+            target_fps=manager.profile.fps if manager.is_open else None,
+            capture_fps={stream: round((count - last_frames.get(stream, 0)) / elapsed, 1)
+                         for stream, count in frames.items()},
+            writer_backlog=writer.backlog if writer is not None else 0,
+            writer_capacity=writer.capacity if writer is not None else 0,
+            writer_dropped=writer.dropped_frames if writer is not None else 0,
+            # A new writer starts counting at zero again
+            disk_write_mb_per_second=round(max(0, bytes_written - last_bytes) / elapsed / 10 ** 6, 1),
+            host_cpu_percent=_cpu_percent(last_cpu, cpu),
+        )
+        information = manager.system_information()
+        if information is not None:
+            snapshot.device_temperature = round(information.chipTemperature.average, 1)
+            snapshot.device_css_cpu_percent = round(information.leonCssCpuUsage.average * 100, 1)
+            snapshot.device_mss_cpu_percent = round(information.leonMssCpuUsage.average * 100, 1)
+            snapshot.device_ddr_used_mb = round(information.ddrMemoryUsage.used / 1024 ** 2, 1)
+            snapshot.device_ddr_total_mb = round(information.ddrMemoryUsage.total / 1024 ** 2, 1)
+        elif manager.is_open:
+            # The device reports at its own rate, the last report is kept until the next one arrives
+            for field in ("device_temperature", "device_css_cpu_percent", "device_mss_cpu_percent",
+                          "device_ddr_used_mb", "device_ddr_total_mb"):
+                setattr(snapshot, field, getattr(self.snapshot, field))
+
+        self.snapshot = snapshot
+        self.version += 1
+        if snapshot.warnings and now - self._warned_at >= WARNING_LOG_INTERVAL:
+            self._warned_at = now
+            logging.warning(f"Pipeline health: {'; '.join(snapshot.warnings)}")
+        return now, frames, bytes_written, cpu
+
+    def __bytes_written(self) -> int:
+        writer = self.writer
+        return writer.bytes_written if writer is not None else 0
+
+
+def _read_cpu_times() -> Optional[Tuple[int, int]]:
+    """
+    Helper function which reads the idle and total CPU time of the host from /proc/stat.
+
+    Returns:
+        Optional[Tuple[int, int]]: The idle and total time in clock ticks, None if /proc/stat isn't available.
+    """
+    try:
+        with open("/proc/stat", "r") as file:
+            values = [int(value) for value in file.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    # idle and iowait
+    return values[3] + values[4], sum(values)
+
+
+def _cpu_percent(previous: Optional[Tuple[int, int]], current: Optional[Tuple[int, int]]) -> Optional[float]:
+    """
+    Helper function which calculates the CPU usage between two readings of /proc/stat.
+
+    Args:
+        previous (Optional[Tuple[int, int]]): The earlier idle and total time.
+        current (Optional[Tuple[int, int]]): The later idle and total time.
+
+    Returns:
+        Optional[float]: The CPU usage in percent, None if a reading is missing.
+    """
+    if previous is None or current is None or current[1] <= previous[1]:
+        return None
+    idle, total = current[0] - previous[0], current[1] - previous[1]
+    return round(100 * (1 - idle / total), 1)
@@ -0,0 +1,107 @@
+"""
+This module provides functionality to share the live preview of the camera with several viewers.
+
+It defines the PreviewHub class which keeps the latest JPEG frame of every preview stream. The frames are encoded on the
+device, so they are only handed on to the viewers and never decoded on the host.
+
+Classes:
+    PreviewHub: Keeps the latest encoded frame of every preview stream and counts the connected viewers per stream.
+"""
+
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from utils.parser import ENVParser
+
+
+class PreviewHub:
+    """
+    Keeps the latest encoded frame of every preview stream and counts the connected viewers per stream.
+
+    Attributes:
+        _instance (PreviewHub): Singleton instance of the PreviewHub class.
+        max_fps (float): The highest frame rate a single viewer receives.
+        max_viewers (int): The number of viewers which can watch a stream at the same time.
+        _frames (Dict[str, Tuple[int, bytes]]): The sequence number and JPEG data of the latest frame of every stream.
+        _viewers (Dict[str, int]): The number of connected viewers of every stream.
+        _lock (threading.Lock): Guards the frames and the viewer count.
+    """
+    _instance = None
+    max_fps = 15.0
+    max_viewers = 4
+    _frames = None
+    _viewers = None
+    _lock = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate preview hub instance.")
+            cls._instance = super(PreviewHub, cls).__new__(cls)
+            env = ENVParser()
+            cls.max_fps = env.preview_max_fps
+            cls.max_viewers = env.preview_max_viewers
+            cls._frames = {}
+            cls._viewers = {}
+            cls._lock = threading.Lock()
+        return cls._instance
+
+    def publish(self, stream: str, data: bytes) -> None:
+        """
+        Replaces the latest frame of a stream.
+
+        Args:
+            stream (str): The name of the stream.
+            data (bytes): The JPEG data of the frame.
+        """
+        with self._lock:
+            sequence = self._frames[stream][0] + 1 if stream in self._frames else 0
+            self._frames[stream] = (sequence, data)
+
+    def latest(self, stream: str) -> Optional[Tuple[int, bytes]]:
+        """
+        Returns the latest frame of a stream.
+
+        Args:
+            stream (str): The name of the stream.
+
+        Returns:
+            Optional[Tuple[int, bytes]]: The sequence number and JPEG data of the frame, None if there is none yet.
+        """
+        with self._lock:
+            return self._frames.get(stream)
+
+    def join(self, stream: str) -> bool:
+        """
+        Registers a new viewer of a stream.
+
+        Args:
+            stream (str): The name of the stream.
+
+        Returns:
+            bool: True if the viewer may watch, False if the maximum number of viewers of the stream has been reached.
+        """
+        with self._lock:
+            if self._viewers.get(stream, 0) >= self.max_viewers:
+                return False
+            self._viewers[stream] = self._viewers.get(stream, 0) + 1
+            return True
+
+    def leave(self, stream: str) -> None:
+        """
+        Unregisters a viewer of a stream.
+
+        Args:
+            stream (str): The name of the stream.
+        """
+        with self._lock:
+            self._viewers[stream] = max(0, self._viewers.get(stream, 0) - 1)
+
+    def viewers(self, stream: str) -> int:
+        """
+        Returns the number of connected viewers of a stream.
+
+        Args:
+            stream (str): The name of the stream.
+        """
+        return self._viewers.get(stream, 0)
@@ -0,0 +1,201 @@
+"""
+This module provides functionality to keep enough free disk space for recording.
+
+It defines the StorageGovernor class which estimates the disk space a trigger window needs from the active capture
+profile, refuses to arm the camera if the temporary storage can't hold enough windows and evicts the raw frames of
+converted recordings in the background. Raw frames are only evicted once the conversion service has converted their
+window, no further conversion of it is pending and the video holds every frame of the window.
+
+Classes:
+    StorageGovernor: Admits recordings based on the free disk space and evicts converted raw frames by a policy.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from typing import Iterator, Tuple
+
+from features.file_operations import storage_path
+from features.file_operations.catalog import Catalog
+from features.file_operations.recording_container import CONTAINER_DATA_FILE, CONTAINER_INDEX_FILE, INDEX_DTYPE, \
+    STREAM_OUTPUT_NAMES, is_container
+from features.file_operations.video_processing import count_video_frames
+from features.modules.capture_profile import active_capture_profile
+from features.modules.conversion_service import ConversionService
+from utils.parser import ENVParser
+
+NO_EVICTION = "none"
+CONVERTED_EVICTION = "converted"
+LOW_SPACE_EVICTION = "low_space"
+
+# Seconds between two eviction passes
+EVICTION_INTERVAL = 60
+
+
+class StorageGovernor:
+    """
+    Admits recordings based on the free disk space and evicts converted raw frames by a policy.
+
+    The raw frames of a trigger window are only needed until the window has been converted to a video. Depending on
+    the eviction policy they are removed right after the conversion (converted), only while the main storage is short
+    of space, oldest days first (low_space), or never (none). The header and index of an evicted container are kept,
+    so the catalog still knows its frames. Eviction only frees space for recording if the temporary and the main
+    storage share a filesystem, otherwise a refused admission can't be resolved by it.
+
+    Attributes:
+        _instance (StorageGovernor): Singleton instance of the StorageGovernor class.
+        policy (str): The eviction policy, none, converted or low_space.
+        reserve_windows (int): The number of trigger windows the temporary storage has to hold to arm the camera.
+        min_free_bytes (int): The free space the main storage should keep with the low_space policy.
+        _required_free (int): The free space a refused admission needs, evicted for on the next pass.
+        _wakeup (threading.Event): Interrupts the wait between two eviction passes.
+        _thread (threading.Thread): Runs the eviction passes.
+    """
+    _instance = None
+    policy = NO_EVICTION
+    reserve_windows = 10
+    min_free_bytes = 0
+    _required_free = 0
+    _wakeup = None
+    _stopping = False
+    _thread = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            logging.debug("Initiate storage governor instance.")
+            cls._instance = super(StorageGovernor, cls).__new__(cls)
+            env = ENVParser()
+            cls.policy = env.storage_eviction_policy
+            cls.reserve_windows = env.storage_reserve_windows
+            cls.min_free_bytes = int(env.storage_min_free_gb * 10 ** 9)
+            cls._wakeup = threading.Event()
+        return cls._instance
+
+    def admit(self, windows: int = None) -> Tuple[bool, int, int]:
+        """
+        Checks if the temporary storage has enough free space to record with the active capture profile.
+
+        Args:
+            windows (int): The number of trigger windows which have to fit. Defaults to the configured reserve.
+
+        Returns:
+            Tuple[bool, int, int]: Whether recording is admitted, the required and the free space in bytes.
+        """
+        required = active_capture_profile().bytes_per_window * (self.reserve_windows if windows is None else windows)
+        free = shutil.disk_usage(_existing_parent(ENVParser().temp_path)).free
+        if free < required:
+            logging.warning(f"Not enough free space to record: {free / 10 ** 9:.2f}GB free, "
+                            f"{required / 10 ** 9:.2f}GB required.")
+            if self.policy != NO_EVICTION and _shared_filesystem():
+                # Converted raw frames are evicted to make room
+                self._required_free = max(self._required_free, required)
+                self._wakeup.set()
+        return free >= required, required, free
+
+    def start(self) -> None:
+        """
+        Starts the eviction thread. Does nothing if the policy is none or the thread is alive.
+        """
+        if self.policy == NO_EVICTION or (self._thread is not None and self._thread.is_alive()):
+            return
+        if not _shared_filesystem():
+            logging.warning("The temporary and the main storage are on different filesystems, evicting converted raw "
+                            "frames won't free space for recording.")
+        self._stopping = False
+        self._thread = threading.Thread(target=self.__run, name="storage-governor", daemon=True)
+        self._thread.start()
+        logging.info(f"Storage governor started with the {self.policy} eviction policy.")
+
+    def stop(self) -> None:
+        """
+        Stops the eviction thread.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __run(self) -> None:
+        while not self._stopping:
+            try:
+                self.__evict()
+            except Exception as e:
+                logging.error(f"Eviction of converted raw frames failed: {e}")
+            self._wakeup.wait(EVICTION_INTERVAL)
+            self._wakeup.clear()
+
+    def __evict(self) -> None:
+        evicted, released = 0, 0
+        for path in _evictable_containers():
+            if self._stopping:
+                break
+            if self.policy == LOW_SPACE_EVICTION and \
+                    shutil.disk_usage(storage_path).free >= max(self.min_free_bytes, self._required_free):
+                break
+            data_path = os.path.join(path, CONTAINER_DATA_FILE)
+            size = os.path.getsize(data_path)
+            # Truncated instead of removed, so the container stays readable with its index and header
+            os.truncate(data_path, 0)
+            evicted += 1
+            released += size
+        self._required_free = 0
+        if evicted:
+            logging.info(f"Evicted the raw frames of {evicted} converted windows, {released / 10 ** 9:.2f}GB released.")
+
+
+def _evictable_containers() -> Iterator[str]:
+    """
+    Helper function which lists the containers of converted windows which still hold raw frames, oldest days first.
+
+    A window is only listed if the conversion service has marked it as converted, it has no queued or running
+    conversion task and its video holds as many frames as the container.
+
+    Returns:
+        Iterator[str]: The paths of the containers.
+    """
+    conversion = ConversionService()
+    for day, person, stream, window in Catalog().converted_windows():
+        path = os.path.join(storage_path, day, person, stream, window)
+        data_path = os.path.join(path, CONTAINER_DATA_FILE)
+        if not is_container(path) or not os.path.isfile(data_path) or os.path.getsize(data_path) == 0:
+            continue
+        # A worker may still read the frames, truncating them would crash it
+        if conversion.is_converting(day, person, stream, window):
+            continue
+        video = os.path.join(storage_path, day, person, f"{STREAM_OUTPUT_NAMES[stream]}_{window}.mp4")
+        frames = os.path.getsize(os.path.join(path, CONTAINER_INDEX_FILE)) // INDEX_DTYPE.itemsize
+        video_frames = count_video_frames(video) if os.path.isfile(video) else None
+        if video_frames != frames:
+            logging.debug(f"Raw frames of {stream}/{window} of {person} are kept: the video holds {video_frames} "
+                          f"of {frames} frames.")
+            continue
+        yield path
+
+
+def _shared_filesystem() -> bool:
+    """
+    Helper function which checks if the temporary and the main storage are on the same filesystem.
+
+    Returns:
+        bool: True if space released on the main storage is free for recording as well.
+    """
+    temporary = os.stat(_existing_parent(ENVParser().temp_path)).st_dev
+    return temporary == os.stat(_existing_parent(storage_path)).st_dev
+
+
+def _existing_parent(path: str) -> str:
+    """
+    Helper function which returns the path itself or its nearest parent which exists.
+
+    Args:
+        path (str): The path to check.
+
+    Returns:
+        str: The existing path.
+    """
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    return path
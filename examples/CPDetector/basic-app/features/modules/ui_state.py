@@ -18,8 +18,8 @@ import logging
 
 from shiny import reactive
 
-from features.file_operations.read import list_days, list_people_for_a_specific_day, \
-    list_people_in_total, list_sessions_in_total, create_date_selection_for_unsaved_sessions
+from features.file_operations.read import count_days, count_people_for_a_specific_day, \
+    count_people_in_total, count_sessions_in_total, create_date_selection_for_unsaved_sessions
 
 
 class UIState:
@@ -36,10 +36,10 @@ class UIState:
         __save_view_state (reactive.Value): Reactive value for the save view state.
     """
     _instance = None
-    __users_all = reactive.Value(len(list_people_in_total()))
-    __users_today = reactive.Value(f"Today: {len(list_people_for_a_specific_day())}")
-    __sessions_all = reactive.Value(len(list_sessions_in_total()))
-    __days_all = reactive.Value(f"Days recorded: {len(list_days())}")
+    __users_all = reactive.Value(count_people_in_total())
+    __users_today = reactive.Value(f"Today: {count_people_for_a_specific_day()}")
+    __sessions_all = reactive.Value(count_sessions_in_total())
+    __days_all = reactive.Value(f"Days recorded: {count_days()}")
     __unsaved_days = reactive.Value(create_date_selection_for_unsaved_sessions())
     __save_view_state = reactive.Value(False)
 
@@ -56,10 +56,10 @@ class UIState:
         """
         Updates the UI state values.
         """
-        self.__users_all.set(len(list_people_in_total()))
-        self.__users_today.set(f"Today: {len(list_people_for_a_specific_day())}")
-        self.__sessions_all.set(len(list_sessions_in_total()))
-        self.__days_all.set(f"Days recorded: {len(list_days())}")
+        self.__users_all.set(count_people_in_total())
+        self.__users_today.set(f"Today: {count_people_for_a_specific_day()}")
+        self.__sessions_all.set(count_sessions_in_total())
+        self.__days_all.set(f"Days recorded: {count_days()}")
         self.__unsaved_days.set(create_date_selection_for_unsaved_sessions())
 
     @property
@@ -0,0 +1,190 @@
+"""
+This module provides a manifest which summarizes how well a trigger window has been recorded.
+
+The manifest is written next to the depth frames of every stored trigger window. It lists the frames and bytes written
+per stream, the sequence number gaps, the latency from the capture to the host and the time it took to write the frames,
+so recordings with problems can be found without opening their videos.
+
+Classes:
+    StreamManifest: Summarizes the frames of a single stream of a trigger window.
+    WindowManifest: Summarizes the recording of a trigger window.
+
+Functions:
+    read_window_manifest: Reads the manifest of a stored trigger window.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, PrivateAttr
+
+from features.file_operations import storage_path
+from features.file_operations.recording_container import CONTAINER_MANIFEST_FILE, RecordedFrame
+from features.modules.pair_statistics import PairStatistics
+
+PERCENTILES = (50, 95, 99)
+# Latency from the capture to the host above which a window is flagged
+LATENCY_WARNING_MS = 250
+
+
+class StreamManifest(BaseModel):
+    """
+    Summarizes the frames of a single stream of a trigger window.
+
+    Attributes:
+        frames (int): The number of frames written.
+        bytes_written (int): The number of frame data bytes written.
+        sequence_gaps (int): The number of frames missing between two written frames.
+    """
+    frames: int = 0
+    bytes_written: int = 0
+    sequence_gaps: int = 0
+
+
+class WindowManifest(BaseModel):
+    """
+    Summarizes the recording of a trigger window.
+
+    The camera adds the latency of every frame pair and the pairing statistics, the frame writer adds every frame it
+    has written together with the time it took. The percentiles are summarized once the manifest is stored.
+
+    Attributes:
+        window (str): The name of the trigger window.
+        capture_profile (str): The capture profile the window was recorded with.
+        duration_seconds (float): The time between the first and the last written frame.
+        streams (Dict[str, StreamManifest]): The summary of every recorded stream by its folder.
+        pairing (PairStatistics): The match and drop statistics of the frame pairs.
+        latency_ms (Dict[str, float]): Percentiles and maximum of the time from the capture until the frame pair was
+            received by the host, measured with the device timestamps synchronized to the steady clock of the host.
+        write_ms (Dict[str, float]): Percentiles and maximum of the time it took to write a frame pair.
+        writer_high_water (int): The largest number of frame pairs waiting in the writer buffer.
+        writer_capacity (int): The number of frame pairs the writer buffer holds.
+        keyframe_gaps (int): The number of times encoded frames were dropped until the next keyframe.
+    """
+    window: str = ""
+    capture_profile: str = ""
+    duration_seconds: float = 0.0
+    streams: Dict[str, StreamManifest] = {}
+    pairing: PairStatistics = PairStatistics()
+    latency_ms: Dict[str, float] = {}
+    write_ms: Dict[str, float] = {}
+    writer_high_water: int = 0
+    writer_capacity: int = 0
+    keyframe_gaps: int = 0
+    _latencies: List[float] = PrivateAttr(default_factory=list)
+    _write_times: List[float] = PrivateAttr(default_factory=list)
+    _last_sequences: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _first_timestamp: Optional[float] = None
+
+    def add_latency(self, seconds: float) -> None:
+        """
+        Adds the time from the capture of a frame pair until it was received by the host, measured against the host
+        synchronized device timestamp, e.g. dai.Clock.now() - frame.getTimestamp().
+
+        Args:
+            seconds (float): The latency of the frame pair.
+        """
+        self._latencies.append(seconds * 1000)
+
+    def add_frame(self, stream: str, frame: RecordedFrame, bytes_written: int) -> None:
+        """
+        Adds a frame written to disk.
+
+        Args:
+            stream (str): The folder of the stream, e.g. depth_frames.
+            frame (RecordedFrame): The written frame.
+            bytes_written (int): The number of frame data bytes written.
+        """
+        summary = self.streams.setdefault(stream, StreamManifest())
+        summary.frames += 1
+        summary.bytes_written += bytes_written
+        if stream in self._last_sequences:
+            summary.sequence_gaps += max(0, frame.sequence - self._last_sequences[stream] - 1)
+        self._last_sequences[stream] = frame.sequence
+        if self._first_timestamp is None:
+            self._first_timestamp = frame.timestamp
+        self.duration_seconds = max(self.duration_seconds, frame.timestamp - self._first_timestamp)
+
+    def add_write_time(self, seconds: float) -> None:
+        """
+        Adds the time it took to write a frame pair.
+
+        Args:
+            seconds (float): The write time of the frame pair.
+        """
+        self._write_times.append(seconds * 1000)
+
+    @property
+    def problems(self) -> List[str]:
+        """
+        Returns a description of every problem of the recording, empty if there are none.
+        """
+        problems = []
+        if self.pairing.dropped_pairs:
+            problems.append(f"{self.pairing.dropped_pairs} frame pairs dropped by the writer")
+        if self.keyframe_gaps:
+            problems.append(f"{self.keyframe_gaps} gaps in the encoded video until the next keyframe")
+        gaps = self.pairing.depth_sequence_gaps + (self.pairing.rgb_sequence_gaps or 0)
+        if gaps:
+            problems.append(f"{gaps} frames missing from the device")
+        if len({stream.frames for stream in self.streams.values()}) > 1:
+            problems.append("streams with differing frame counts")
+        if self.latency_ms.get("p95", 0) > LATENCY_WARNING_MS:
+            problems.append(f"high latency ({self.latency_ms['p95']:.0f}ms at p95)")
+        return problems
+
+    def store(self, folder: str) -> None:
+        """
+        Summarizes the collected durations and writes the manifest into a folder.
+
+        Args:
+            folder (str): The folder of the depth frames of the window.
+        """
+        if self._latencies:
+            self.latency_ms = _summarize(self._latencies)
+        if self._write_times:
+            self.write_ms = _summarize(self._write_times)
+        with open(os.path.join(folder, CONTAINER_MANIFEST_FILE), "w") as file:
+            file.write(self.model_dump_json(indent=2))
+
+
+def read_window_manifest(day: str, person: str, window: str) -> Optional[WindowManifest]:
+    """
+    Reads the manifest of a stored trigger window.
+
+    Args:
+        day (str): The day of the participant.
+        person (str): The participant.
+        window (str): The name of the trigger window.
+
+    Returns:
+        Optional[WindowManifest]: The manifest, None if the window has none, e.g. because it was recorded before
+            manifests were written.
+    """
+    path = os.path.join(storage_path, day, person, "depth_frames", window, CONTAINER_MANIFEST_FILE)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r") as file:
+            return WindowManifest(**json.load(file))
+    except (OSError, ValueError) as e:
+        logging.warning(f"Manifest of {window} couldn't be read: {e}")
+        return None
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    """
+    Helper function which returns the percentiles and the maximum of a list of durations.
+
+    Args:
+        values (List[float]): The durations in milliseconds.
+
+    Returns:
+        Dict[str, float]: The durations by percentile, e.g. p95, and the maximum.
+    """
+    summary = {f"p{p}": round(float(value), 2) for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+    summary["max"] = round(float(max(values)), 2)
+    return summary
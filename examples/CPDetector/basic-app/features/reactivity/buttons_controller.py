@@ -12,6 +12,7 @@ from shiny import ui, reactive
 
 from features.file_operations.delete import delete_temporary_recordings
 from features.modules.camera import Camera
+from features.modules.storage_governor import StorageGovernor
 from features.modules.ui_state import UIState
 from utils.parser import ENVParser
 
@@ -46,7 +47,8 @@ class ButtonsController:
         """
         Updates the record button state.
 
-        Checks if there are unsaved sessions or if the camera is connected, and updates the record button state accordingly.
+        Checks if there are unsaved sessions, if the camera is connected and if there is enough free space to record, and
+        updates the record button state accordingly.
         """
 
         @reactive.Effect
@@ -67,6 +69,8 @@ class ButtonsController:
                     duration=None,
                     type="warning",
                 )
+            elif self.record_button_state.get() is False and not self.__space_admitted():  # Check the free space
+                logging.info("Record Button: Not enough free space to start recording.")
             else:  # Activate or Deactivate recording based on the current state
                 if self.record_button_state.get() is True:
                     logging.info("Record Button: Recording has been stopped.")
@@ -81,6 +85,23 @@ class ButtonsController:
                     ui.update_action_button("record_button", label="Deactivate recording")
                     self.ui_state.update_ui()
 
+    def __space_admitted(self) -> bool:
+        """
+        Checks if there is enough free space to record and notifies the user if there isn't.
+
+        Returns:
+            bool: True if recording can be started, False otherwise.
+        """
+        admitted, required, free = StorageGovernor().admit()
+        if not admitted:
+            ui.notification_show(
+                f"Not enough free space to start recording! {free / 10 ** 9:.2f}GB are free, but "
+                f"{required / 10 ** 9:.2f}GB are required.",
+                duration=None,
+                type="error",
+            )
+        return admitted
+
     def initiate_save(self):
         """
         Initiates the save process.
@@ -135,7 +156,7 @@ class ButtonsController:
         def _():
             notification = ui.modal(
                 ui.markdown(
-                    f"**Do you really want to convert the videos of the selected dataset? WARNING: This is a time consuming task and should not run while recording patients.**"),
+                    f"**Do you really want to convert the videos of the selected dataset? The conversion runs in the background and slows down while recording patients.**"),
                 ui.input_action_button("convert_yes", "✔ Yes", class_="btn-success"),
                 ui.input_action_button("convert_no", "✘ No", class_="btn-danger"),
                 easy_close=False,
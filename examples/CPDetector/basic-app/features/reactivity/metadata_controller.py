@@ -11,6 +11,7 @@ import os
 
 from shiny import ui, reactive, render
 
+from features.file_operations.catalog import Catalog
 from features.file_operations.move import list_files_to_move, move_data_from_temp_to_main_storage
 from features.file_operations.read import check_if_folder_already_exists
 from features.modules.participant import Participant, read_participant_metadata
@@ -82,6 +83,7 @@ class MetadataController:
             )
 
             person.store_participant_metadata(path=str(path))
+            Catalog().refresh_participant(self.input.date_selector(), self.input.people_selector()[0])
 
             if self.input.id() == "":
                 logging.info("Metadata couldn't be edited due to a missing ID.")
@@ -95,6 +97,8 @@ class MetadataController:
                     path,
                     os.path.join(env.main_path, env.temp_path, self.input.date_selector(), self.input.id()),
                 )
+                Catalog().refresh_participant(self.input.date_selector(), self.input.people_selector()[0])
+                Catalog().refresh_participant(self.input.date_selector(), self.input.id())
                 self.__reset_user()
 
                 ui.notification_show(
@@ -117,7 +121,6 @@ class MetadataController:
         async def _():
             print("Saving metadata")
             env = ENVParser()
-            i = 0
             day = datetime.datetime.now().strftime(env.date_format)
             person = Participant(id=self.input.id(), comments=self.input.comments())
 
@@ -156,12 +159,21 @@ class MetadataController:
                         detail="This may take a while...",
                     )
 
-                    for _ in move_data_from_temp_to_main_storage(
-                            folder_id=self.input.id(), participant=person, day=day
-                    ):
-                        i += 1
-                        p.set(i, message="Moving files")
-                        await asyncio.sleep(0.1)
+                    try:
+                        for progress in move_data_from_temp_to_main_storage(
+                                folder_id=self.input.id(), participant=person, day=day
+                        ):
+                            p.set(progress.files, message="Moving files",
+                                  detail=f"{progress.bytes_per_second / 1e6:.1f} MB/s")
+                            await asyncio.sleep(0)
+                    except OSError as e:
+                        logging.error(f"Recordings couldn't be saved: {e}")
+                        ui.notification_show(
+                            f"Recordings couldn't be saved: {e}",
+                            duration=None,
+                            type="error",
+                        )
+                        return
 
                 self.__reset_user()
                 logging.info("Recordings have been saved.")
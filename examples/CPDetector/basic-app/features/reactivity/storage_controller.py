@@ -5,14 +5,13 @@ Classes:
     StorageController: Manages the dataset operations including editing metadata, deleting sessions, and converting datasets.
 """
 
-import asyncio
 import logging
 
 from shiny import ui, reactive
 
 from features.file_operations.delete import delete_person_on_day_folder
-from features.file_operations.read import list_people_for_a_specific_day, get_amount_of_sessions_for_a_specific_person
-from features.file_operations.video_processing import convert_individual_videos
+from features.file_operations.read import list_people_for_a_specific_day
+from features.modules.conversion_service import ConversionService
 from features.modules.participant import read_participant_metadata
 from features.modules.ui_state import UIState
 
@@ -95,23 +94,19 @@ class StorageController:
         """
         Converts the dataset for the selected session.
 
-        Converts the videos for the selected person on the selected day and updates the UI.
+        Queues the selected persons of the selected day in the conversion service, which converts them in the
+        background.
         """
 
         @reactive.Effect
         @reactive.event(self.input.convert_yes)
-        async def _():
-            i = 0
+        def _():
+            service = ConversionService()
             for person in self.input.people_selector.get():
-                with ui.Progress(min=0, max=get_amount_of_sessions_for_a_specific_person()) as p:
-                    p.set(i,
-                          message="Converting videos in progress",
-                          detail="This will take a while...",
-                          )
-
-                    for _ in convert_individual_videos(day=self.input.date_selector.get(), person=person):
-                        i += 1
-                        p.set(i, message="Converting videos in progress", detail="This will take a while...", )
-                        await asyncio.sleep(0.1)
-            logging.info("Conversion of all files has been completed.")
-            self.ui_state.update_ui()
+                job = service.submit(day=self.input.date_selector.get(), person=person)
+                logging.info(f"Conversion of {job.key} has been handed over to the conversion service.")
+            ui.notification_show(
+                "Conversion has been started in the background. The progress is shown below the session buttons.",
+                duration=5,
+                type="message",
+            )
@@ -19,6 +19,7 @@ import shutil
 import faicons as fa
 from shiny import ui
 
+from features.modules.capture_profile import active_capture_profile
 from utils.parser import ENVParser
 
 ICONS = {
@@ -114,9 +115,10 @@ def header() -> ui.layout_columns:
         ui.markdown("Recording active"),
         ui.output_ui("camera_led_update"),
         ui.markdown("Camera availability"),
+        ui.output_text("dropped_frames_counter"),
         fill=False,
         fillable=True,
-        col_widths={"xs": (2, 1, 3, 1, 2, 1, 2)},
+        col_widths={"xs": (2, 1, 2, 1, 2, 1, 2, 1)},
         gap="0em",
     )
 
@@ -132,6 +134,9 @@ def main_view() -> tuple:
         ui.output_ui("header"),
         __cards(),
         __session_buttons(),
+        ui.output_ui("conversion_jobs"),
+        ui.output_ui("pipeline_health"),
+        ui.output_ui("live_preview"),
 
         ui.panel_conditional(
             "input.show_sessions % 2 == 1",
@@ -145,6 +150,7 @@ def main_view() -> tuple:
             ),
             ui.panel_conditional(
                 "input.people_selector != ''",
+                ui.output_ui("display_thumbnails"),
                 ui.output_ui("show_video_radio_buttons"),
                 ui.panel_conditional(
                     "input.select_recordings != ''",
@@ -231,4 +237,5 @@ def __session_buttons() -> ui.layout_columns:
                 "show_sessions", "Display sessions", class_="btn-primary"
             ),
         ),
+        ui.markdown(f"**Capture profile** {active_capture_profile().summary}"),
     )
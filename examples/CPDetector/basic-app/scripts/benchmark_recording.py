@@ -0,0 +1,356 @@
+"""
+This script benchmarks the recording pipeline without a physical camera.
+
+A fake device replaces `dai.Device`, so `Camera.run` records synthetic frame pairs (BGR color frames and 16-bit depth
+frames, sized like the selected capture profile, e.g. 1080p and 800p) which are produced at the rate of the profile.
+Color frames are always recorded raw, since the fake device doesn't encode. The light barrier is simulated to open
+trigger windows.
+Once the recording is finished, the recorded windows are converted to videos.
+
+The results are printed and saved as JSON, so they can be compared between versions:
+    - capture-to-disk throughput of the frame writer in frame pairs and megabytes per second
+    - frame pairs dropped by the device queue and the frame writer
+    - peak resident memory of the process
+    - frames per second of the video conversion
+
+Usage:
+    python -m scripts.benchmark_recording --profile 1080p30 --windows 3 --window-seconds 5 --output benchmark.json
+
+Classes:
+    FakeFrame: A synthetic frame as received from the device.
+    FakeOutputQueue: Emits synthetic frame pairs at the rate of the cameras.
+    FakeDevice: Stands in for `dai.Device` and provides the fake queues.
+
+Functions:
+    run_benchmark: Records and converts synthetic trigger windows and collects the results.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from unittest import mock
+
+import numpy as np
+
+# Distinct synthetic frames which are cycled through, so generating frames doesn't limit the benchmark
+SYNTHETIC_FRAMES = 8
+
+
+class FakeFrame:
+    """
+    A synthetic frame as received from the device.
+
+    Attributes:
+        data (np.ndarray): The frame data.
+        sequence (int): The sequence number of the frame.
+        timestamp (timedelta): The capture time on the device clock.
+        host_timestamp (timedelta): The capture time synchronized to the steady clock of the host.
+    """
+
+    def __init__(self, data: np.ndarray, sequence: int, timestamp: timedelta, host_timestamp: timedelta):
+        self.data = data
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.host_timestamp = host_timestamp
+
+    def getFrame(self) -> np.ndarray:
+        return self.data
+
+    def getCvFrame(self) -> np.ndarray:
+        return self.data
+
+    def getData(self) -> np.ndarray:
+        return self.data.reshape(-1)
+
+    def getSequenceNum(self) -> int:
+        return self.sequence
+
+    def getTimestampDevice(self) -> timedelta:
+        return self.timestamp
+
+    def getTimestamp(self) -> timedelta:
+        return self.host_timestamp
+
+
+class FakeOutputQueue:
+    """
+    Emits synthetic frame pairs at the rate of the cameras.
+
+    The cameras keep capturing while the host doesn't read. A non-blocking queue keeps only the latest frame pairs and
+    drops the older ones, like the queues of a real device; a blocking queue stalls the cameras instead.
+
+    Attributes:
+        fps (float): The frame rate of the cameras.
+        max_size (int): The number of frame pairs buffered by the queue.
+        blocking (bool): Whether a full queue stalls the cameras instead of dropping frame pairs.
+        dropped (int): The number of frame pairs dropped because the queue was full.
+        stalled (int): The number of frame pairs the cameras were stalled for because the queue was full.
+        delivered (int): The number of frame pairs read by the host.
+    """
+
+    def __init__(self, fps: float, max_size: int, blocking: bool, rgb_frames: list, depth_frames: list):
+        self.fps = fps
+        self.max_size = max_size
+        self.blocking = blocking
+        self.dropped = 0
+        self.stalled = 0
+        self.delivered = 0
+        self._rgb_frames = rgb_frames
+        self._depth_frames = depth_frames
+        self._start = time.perf_counter()
+        self._next = 0
+
+    def get(self) -> dict:
+        """
+        Waits for the next frame pair.
+
+        Returns:
+            dict: The color frame as video and the depth frame as disparity.
+        """
+        while True:
+            produced = int((time.perf_counter() - self._start) * self.fps) + 1
+            backlog = produced - self._next
+            if backlog > 0:
+                break
+            time.sleep((self._start + self._next / self.fps) - time.perf_counter() + 1e-4)
+
+        if backlog > self.max_size:
+            if self.blocking:
+                self.stalled += backlog - self.max_size
+                self._start += (backlog - self.max_size) / self.fps
+            else:
+                self.dropped += backlog - self.max_size
+                self._next += backlog - self.max_size
+
+        sequence = self._next
+        self._next += 1
+        self.delivered += 1
+        timestamp = timedelta(seconds=sequence / self.fps)
+        # dai.Clock.now() reads the same monotonic clock as time.perf_counter()
+        host_timestamp = timedelta(seconds=self._start + sequence / self.fps)
+        index = sequence % len(self._rgb_frames)
+        return {
+            "video": FakeFrame(self._rgb_frames[index], sequence, timestamp, host_timestamp),
+            "disparity": FakeFrame(self._depth_frames[index], sequence, timestamp, host_timestamp),
+        }
+
+    def tryGetAll(self) -> list:
+        """
+        Discards all buffered frame pairs.
+        """
+        self._next = int((time.perf_counter() - self._start) * self.fps) + 1
+        return []
+
+
+class FakeDevice:
+    """
+    Stands in for `dai.Device` and provides the fake queues.
+
+    Attributes:
+        queues (dict): The output queues by name.
+    """
+    fps = 30.0
+    rgb_shape = (1080, 1920, 3)
+    depth_shape = (800, 1280)
+
+    def __init__(self, pipeline=None):
+        rng = np.random.default_rng(0)
+        self._rgb_frames = [rng.integers(0, 256, self.rgb_shape, dtype=np.uint8) for _ in range(SYNTHETIC_FRAMES)]
+        self._depth_frames = [rng.integers(0, 65536, self.depth_shape, dtype=np.uint16)
+                              for _ in range(SYNTHETIC_FRAMES)]
+        self.queues = {}
+        self._closed = False
+
+    def setIrLaserDotProjectorIntensity(self, intensity: float) -> None:
+        pass
+
+    def setIrFloodLightIntensity(self, intensity: float) -> None:
+        pass
+
+    def readCalibration(self):
+        return mock.MagicMock()
+
+    def getInputQueue(self, name: str):
+        return mock.MagicMock()
+
+    def getOutputQueue(self, name: str, maxSize: int, blocking: bool) -> FakeOutputQueue:
+        self.queues[name] = FakeOutputQueue(self.fps, maxSize, blocking, self._rgb_frames, self._depth_frames)
+        return self.queues[name]
+
+    def isClosed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        self._closed = True
+
+
+def run_benchmark(profile_name: str, fps: Optional[int], windows: int, window_seconds: float, gap_seconds: float,
+                  block: bool, convert: bool) -> dict:
+    """
+    Records and converts synthetic trigger windows and collects the results.
+
+    Has to be run in a working directory of its own, since the recordings are stored relative to it.
+
+    Args:
+        profile_name (str): The capture profile which sets the frame sizes and rates.
+        fps (Optional[int]): Replaces the frame rate of the capture profile.
+        windows (int): The number of trigger windows to record.
+        window_seconds (float): The time the light barrier is activated for every window.
+        gap_seconds (float): The time between two windows.
+        block (bool): Whether the output queues block the fake device if they are full.
+        convert (bool): Whether the recorded windows are converted to videos.
+
+    Returns:
+        dict: The benchmark results.
+    """
+    import depthai as dai
+
+    from features.file_operations.recording_container import ContainerReader, STREAM_OUTPUT_NAMES
+    from features.file_operations.video_processing import convert_recording_to_video
+    from features.modules import camera as camera_module
+    from features.modules.camera import Camera
+    from features.modules.capture_profile import load_capture_profiles
+    from features.modules.device_manager import DeviceManager
+    from features.modules.light_barrier import LightBarrier
+    from utils.parser import ENVParser
+
+    env = ENVParser()
+    profile = load_capture_profiles()[profile_name].model_copy(update={"rgb_encoding": "RAW"})
+    if fps is not None:
+        profile = profile.model_copy(update={"fps": fps})
+    FakeDevice.fps = profile.fps
+    FakeDevice.rgb_shape = (profile.color_size[1], profile.color_size[0], 3)
+    FakeDevice.depth_shape = (profile.depth_size[1], profile.depth_size[0])
+    camera = Camera()
+    camera.ready = True
+    camera.mode = True
+    barrier = LightBarrier()
+
+    with mock.patch.object(dai, "Device", FakeDevice), \
+            mock.patch.object(camera_module, "active_capture_profile", return_value=profile):
+        thread = threading.Thread(target=camera.run, kwargs={"block": block}, name="benchmark-camera")
+        thread.start()
+        time.sleep(max(gap_seconds, env.pre_trigger_seconds))  # Boot and fill the pre-trigger buffer
+        recording_start = time.perf_counter()
+        for _ in range(windows):
+            barrier.simulate(True)
+            time.sleep(window_seconds)
+            barrier.simulate(False)
+            time.sleep(gap_seconds)
+        camera.ready = False
+        thread.join()
+        recording_seconds = time.perf_counter() - recording_start
+        queue = DeviceManager().record_queue
+        DeviceManager().close()
+
+    day = datetime.now().strftime(env.date_format)
+    pairs, written_bytes, containers = 0, 0, []
+    for stream in STREAM_OUTPUT_NAMES:
+        stream_path = os.path.join(env.temp_path, day, stream)
+        for window in sorted(os.listdir(stream_path)) if os.path.isdir(stream_path) else []:
+            recording = ContainerReader(os.path.join(stream_path, window))
+            written_bytes += os.path.getsize(recording.data_path)
+            if stream == "depth_frames":
+                pairs += len(recording)
+            containers.append((stream, window, len(recording)))
+
+    # Every window starts with the frames captured before the trigger, longer triggers are split into several windows
+    window_time = windows * (window_seconds + env.pre_trigger_seconds)
+    dropped = queue.dropped + camera.dropped_frames
+    results = {
+        "recording_seconds": round(recording_seconds, 3),
+        "pairs_written": pairs,
+        "pairs_expected": int(window_time * profile.fps),
+        "pairs_per_second": round(pairs / window_time, 2) if window_time else 0.0,
+        "megabytes_written": round(written_bytes / 1e6, 1),
+        "megabytes_per_second": round(written_bytes / 1e6 / recording_seconds, 1),
+        "device_queue_dropped": queue.dropped,
+        "device_queue_stalled": queue.stalled,
+        "writer_dropped": camera.dropped_frames,
+        "drop_rate": round(dropped / (queue.delivered + queue.dropped), 4) if queue.delivered else 0.0,
+    }
+
+    if convert:
+        frames, seconds, errors = 0, 0.0, []
+        for stream, window, frame_count in containers:
+            start = time.perf_counter()
+            try:
+                success = convert_recording_to_video(os.path.join(env.temp_path, day, stream), window,
+                                                     STREAM_OUTPUT_NAMES[stream], stream == "depth_frames")
+            except Exception as e:
+                success = False
+                errors.append(f"{stream}/{window}: {e}")
+            seconds += time.perf_counter() - start
+            if success:
+                frames += frame_count
+        results["conversion_frames"] = frames
+        results["conversion_fps"] = round(frames / seconds, 2) if seconds and frames else None
+        results["conversion_errors"] = errors
+
+    # The maximum resident set size is reported in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["peak_rss_megabytes"] = round(peak_rss / (1e6 if sys.platform == "darwin" else 1e3), 1)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks the recording pipeline with a synthetic camera.")
+    parser.add_argument("--profile", default="1080p30", help="Capture profile which sets the frame sizes and rates.")
+    parser.add_argument("--fps", type=int, default=None, help="Replaces the frame rate of the capture profile.")
+    parser.add_argument("--windows", type=int, default=3, help="Number of trigger windows to record.")
+    parser.add_argument("--window-seconds", type=float, default=5.0,
+                        help="Time the light barrier is activated for every window, at most 10 seconds are recorded.")
+    parser.add_argument("--gap-seconds", type=float, default=2.0, help="Time between two trigger windows.")
+    parser.add_argument("--block", action="store_true", help="Stall the fake device instead of dropping frames.")
+    parser.add_argument("--skip-conversion", action="store_true", help="Don't convert the recorded windows.")
+    parser.add_argument("--workdir", default=None,
+                        help="Folder for the recordings, which is kept. "
+                             "Defaults to a temporary folder which is removed.")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file the results are saved to.")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="recording-benchmark-"))
+    os.makedirs(workdir, exist_ok=True)
+    # Set before the application reads its configuration, the values of the .env file don't override them
+    os.environ.update({
+        "TEMP_STORAGE": "recordings",
+        "MAIN_STORAGE": os.path.join(workdir, "main"),
+        "LIGHT_BARRIER_BACKEND": "simulated",
+        "RGB_ENCODING": "RAW",
+    })
+    for key, value in {"DATE_FORMAT": "%Y%m%d", "LOG_FILENAME": "log", "VIDEO_DELTA_START": "00:00:00.000",
+                       "VIDEO_DELTA_END": "00:00:00.000"}.items():
+        os.environ.setdefault(key, value)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.chdir(workdir)
+
+    results = run_benchmark(args.profile, args.fps, args.windows, args.window_seconds, args.gap_seconds, args.block,
+                            not args.skip_conversion)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("workdir", "output")},
+        "results": results,
+    }
+    os.chdir(os.path.dirname(output))
+    if args.workdir is None:
+        shutil.rmtree(workdir, ignore_errors=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
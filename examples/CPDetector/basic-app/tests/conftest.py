@@ -0,0 +1,21 @@
+"""
+Configures the environment of the app before its modules are imported by the tests.
+
+The storages point to a temporary folder, so the tests never touch recordings. The environment variables are set
+before the .env file is loaded, which doesn't override them.
+"""
+
+import os
+import sys
+import tempfile
+
+APP_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_PATH)
+
+os.environ.setdefault("MAIN_STORAGE", tempfile.mkdtemp(prefix="basic-app-tests-"))
+os.environ.setdefault("TEMP_STORAGE", "recordings")
+os.environ.setdefault("DATE_FORMAT", "%Y%m%d")
+os.environ.setdefault("LOG_FILENAME", "log")
+os.environ.setdefault("VIDEO_DELTA_START", "00:00:00.000")
+os.environ.setdefault("VIDEO_DELTA_END", "00:00:00.000")
+os.environ.setdefault("METADATA_FILE_NAME", "metadata.json")
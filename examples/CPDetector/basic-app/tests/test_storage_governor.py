@@ -0,0 +1,69 @@
+"""
+Tests that the storage governor only evicts the raw frames of windows whose conversion has finished successfully.
+"""
+
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+from features.file_operations import storage_path
+from features.file_operations.catalog import Catalog
+from features.file_operations.recording_container import ContainerWriter, RecordedFrame, STREAM_OUTPUT_NAMES
+from features.modules import storage_governor
+from features.modules.conversion_service import ConversionService
+
+FRAMES = 5
+STREAM = "depth_frames"
+WINDOW = "20250101_120000"
+
+
+@pytest.fixture
+def window(monkeypatch):
+    """
+    Records a trigger window of a new participant with a complete video and lists it in the catalog.
+    """
+    day, person = "20250101", f"participant-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(storage_path, day, person, STREAM, WINDOW)
+    with ContainerWriter(path) as writer:
+        for sequence in range(FRAMES):
+            writer.append(RecordedFrame(np.zeros((4, 4), dtype=np.uint16), sequence, float(sequence), 0.0))
+    video = os.path.join(storage_path, day, person, f"{STREAM_OUTPUT_NAMES[STREAM]}_{WINDOW}.mp4")
+    open(video, "wb").close()
+    monkeypatch.setattr(storage_governor, "count_video_frames", lambda video_file: FRAMES)
+    Catalog().refresh_participant(day, person)
+    return day, person, path
+
+
+def test_evicts_window_converted_by_the_service(window):
+    day, person, path = window
+    Catalog().mark_converted(day, person, STREAM, WINDOW)
+    assert path in storage_governor._evictable_containers()
+
+
+def test_keeps_window_of_failed_conversion(window):
+    # The video exists, but the conversion service never marked the window as converted
+    _, _, path = window
+    assert path not in storage_governor._evictable_containers()
+
+
+def test_keeps_window_marked_converted_after_a_refresh(window):
+    day, person, path = window
+    Catalog().mark_converted(day, person, STREAM, WINDOW)
+    Catalog().refresh_participant(day, person)
+    assert path in storage_governor._evictable_containers()
+
+
+def test_keeps_window_while_it_is_converted(window):
+    day, person, path = window
+    Catalog().mark_converted(day, person, STREAM, WINDOW)
+    ConversionService().submit(day, person)
+    assert path not in storage_governor._evictable_containers()
+
+
+def test_keeps_window_with_incomplete_video(window, monkeypatch):
+    day, person, path = window
+    Catalog().mark_converted(day, person, STREAM, WINDOW)
+    monkeypatch.setattr(storage_governor, "count_video_frames", lambda video_file: FRAMES - 1)
+    assert path not in storage_governor._evictable_containers()
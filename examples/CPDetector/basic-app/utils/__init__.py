@@ -5,9 +5,11 @@ Classes:
     ENVParser: Parses environment variables and configuration settings for the application.
     _AnsiColorizer: A colorizer that wraps around a stream, allowing text to be written in a particular color.
     ColorHandler: A logging handler that outputs log messages to a stream with colorized text.
+    JsonFormatter: A logging formatter that writes every record as a single line of JSON.
+    RateLimitedLog: Logs a recurring event, e.g. one for every frame, at most once per interval.
 
 Functions:
     singleton: A decorator to implement the singleton pattern for a class.
     __delete_oldest_logs: Deletes the oldest log files in the specified folder, keeping only the most recent ones.
-    initialize_logger: Initializes the logger with colorized console output and file logging.
+    initialize_logger: Initializes the logger with colorized console output and file logging, once per process.
 """
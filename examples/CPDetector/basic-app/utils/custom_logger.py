@@ -1,12 +1,29 @@
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
 import sys
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from os.path import join
 
 from utils.parser import ENVParser
 from utils.singleton import singleton
 
+QUEUE_DISPATCH = "queue"
+JSON_FORMAT = "json"
+
+# Attributes every log record has, all others have been passed as extra and are written as fields of a JSON entry
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_log_path = None
+_listener = None
+_lock = threading.Lock()
+
 
 @singleton
 class _AnsiColorizer(object):
@@ -90,13 +107,120 @@ class ColorHandler(logging.StreamHandler):
             logging.ERROR: "red"
         }
 
-        timestamp = "{:%m/%d/%Y %H:%M:%S}".format(datetime.now())
+        # The time of the record, records may be written by the queue listener a little later
+        timestamp = "{:%m/%d/%Y %H:%M:%S}".format(datetime.fromtimestamp(record.created))
         color = msg_colors.get(record.levelno, "blue")
         self.stream.write(
-            "{} [{}] : {} ({}:{})\n".format(timestamp, record.levelname, record.msg, record.filename, record.lineno),
+            "{} [{}] : {} ({}:{})\n".format(timestamp, record.levelname, record.getMessage(), record.filename,
+                                           record.lineno),
             color)
 
 
+class JsonFormatter(logging.Formatter):
+    """
+    A logging formatter that writes every record as a single line of JSON.
+
+    Values passed with the extra argument of a logging call are written as additional fields, so log files can be
+    filtered by them, e.g. by the number of suppressed events.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format a record as JSON.
+
+        Args:
+            record (logging.LogRecord): The log record to be formatted.
+
+        Returns:
+            str: The record as a single line of JSON.
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TracebackQueueHandler(QueueHandler):
+    """
+    A queue handler that keeps the traceback of a record apart from its message.
+
+    The default handler merges the traceback into the message, so a JSON entry written by the listener would lack its
+    exception field. The traceback is kept as text instead, since the exception itself can't be passed safely to
+    another thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Prepare a record for the queue.
+
+        Args:
+            record (logging.LogRecord): The log record to be queued.
+
+        Returns:
+            logging.LogRecord: A copy of the record with its arguments merged into the message.
+        """
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class RateLimitedLog:
+    """
+    Logs a recurring event, e.g. one for every frame, at most once per interval.
+
+    Suppressed events are only counted and reported with the next logged event. Meant to be used by a single thread.
+
+    Attributes:
+        interval (float): The least number of seconds between two logged events.
+        level (int): The log level of the events.
+        _logged_at (float): The monotonic time of the last logged event.
+        _suppressed (int): The number of events suppressed since the last logged event.
+    """
+
+    def __init__(self, interval: float = 1.0, level: int = logging.DEBUG):
+        self.interval = interval
+        self.level = level
+        self._logged_at = float("-inf")
+        self._suppressed = 0
+
+    def log(self, msg: str, *args) -> None:
+        """
+        Log an event unless another one has been logged within the interval.
+
+        The message is formatted lazily with the arguments, so a suppressed event costs no formatting.
+
+        Args:
+            msg (str): The message, with %-style placeholders for the arguments.
+            *args: The arguments of the message.
+        """
+        if not logging.getLogger().isEnabledFor(self.level):
+            return
+        now = time.monotonic()
+        if now - self._logged_at < self.interval:
+            self._suppressed += 1
+            return
+        if self._suppressed:
+            msg = f"{msg} ({self._suppressed} similar events suppressed)"
+        logging.log(self.level, msg, *args, extra={"suppressed": self._suppressed}, stacklevel=2)
+        self._logged_at = now
+        self._suppressed = 0
+
+
 def __delete_oldest_logs(folder: str, logs_to_keep: int = 10):
     """
     Delete the oldest log files in the specified folder, keeping only the most recent ones.
@@ -117,27 +241,49 @@ def initialize_logger() -> str:
     """
     Initialize the logger with colorized console output and file logging.
 
-    Sets the log level and handlers based on environment variables.
+    Sets the log level, handlers and file format based on environment variables. With the queue dispatch the logging
+    threads only put their records into a queue, and a background listener writes them to the terminal and the log
+    file, so slow output never stalls capturing or writing frames. Only the first call sets up the handlers, every
+    further call, e.g. of another browser session, returns the log file of the first one.
 
     Returns:
         str: The path to the log file.
     """
-    env = ENVParser()
-    logging.getLogger().setLevel(env.log_mode)
-    logging.getLogger().addHandler(ColorHandler())
-
-    folder = env.log_path
-    os.makedirs(folder, exist_ok=True)
-    log_path = join(folder, f"logfile-{datetime.today().strftime('%Y%m%d%H%M')}.log")
-    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s : %(message)s (%(filename)s:%(lineno)d)',
-                                      datefmt='%m/%d/%Y %H:%M:%S')
-    file_handler = logging.FileHandler(log_path)
-    file_handler.setFormatter(log_formatter)
-    logging.getLogger().addHandler(file_handler)
-
-    __delete_oldest_logs(folder=folder, logs_to_keep=20)
-
-    return log_path
+    global _log_path, _listener
+    with _lock:
+        if _log_path is not None:
+            return _log_path
+
+        env = ENVParser()
+        logging.getLogger().setLevel(env.log_mode)
+
+        folder = env.log_path
+        os.makedirs(folder, exist_ok=True)
+        log_path = join(folder, f"logfile-{datetime.today().strftime('%Y%m%d%H%M')}.log")
+        if env.log_format == JSON_FORMAT:
+            log_formatter = JsonFormatter()
+        else:
+            log_formatter = logging.Formatter('%(asctime)s - %(levelname)s : %(message)s (%(filename)s:%(lineno)d)',
+                                              datefmt='%m/%d/%Y %H:%M:%S')
+        file_handler = logging.FileHandler(log_path)
+        file_handler.setFormatter(log_formatter)
+        handlers = [ColorHandler(), file_handler]
+
+        if env.log_dispatch == QUEUE_DISPATCH:
+            # Unbounded, so a logging thread never waits or loses records while the listener is busy
+            records = queue.SimpleQueue()
+            _listener = QueueListener(records, *handlers, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_listener.stop)
+            logging.getLogger().addHandler(TracebackQueueHandler(records))
+        else:
+            for handler in handlers:
+                logging.getLogger().addHandler(handler)
+
+        __delete_oldest_logs(folder=folder, logs_to_keep=20)
+
+        _log_path = log_path
+        return log_path
 
 
 if __name__ == "__main__":
@@ -34,6 +34,28 @@ class ENVParser:
     _video_delta_end = None
     _conversion_file_prefix = None
     _metadata_file_name = None
+    _writer_buffer_seconds = None
+    _rgb_encoding = None
+    _export_profile = None
+    _light_barrier_backend = None
+    _device_scan_interval = None
+    _catalog_file_name = None
+    _catalog_watch_backend = None
+    _catalog_poll_interval = None
+    _pre_trigger_seconds = None
+    _preview_max_fps = None
+    _preview_max_viewers = None
+    _thumbnail_cache_mb = None
+    _storage_reserve_windows = None
+    _storage_eviction_policy = None
+    _storage_min_free_gb = None
+    _capture_profile = None
+    _capture_profiles_file = None
+    _depth_roi = None
+    _depth_decimation = None
+    _health_refresh_seconds = None
+    _log_dispatch = None
+    _log_format = None
 
     def __init__(self) -> None:
         if platform.system() == "Linux":
@@ -50,6 +72,30 @@ class ENVParser:
         self._video_delta_end = datetime.strptime(os.getenv("VIDEO_DELTA_END"), "%H:%M:%S.%f").time()
         self._conversion_file_prefix = os.getenv("CONVERSION_FILE_PREFIX")
         self._metadata_file_name = os.getenv("METADATA_FILE_NAME")
+        self._writer_buffer_seconds = float(os.getenv("WRITER_BUFFER_SECONDS", 2))
+        self._rgb_encoding = os.getenv("RGB_ENCODING", "RAW").upper()
+        self._export_profile = os.getenv("EXPORT_PROFILE", "balanced")
+        self._light_barrier_backend = os.getenv("LIGHT_BARRIER_BACKEND")
+        self._device_scan_interval = float(os.getenv("DEVICE_SCAN_INTERVAL", 2))
+        self._catalog_file_name = os.getenv("CATALOG_FILE_NAME", "catalog.sqlite3")
+        self._catalog_watch_backend = os.getenv("CATALOG_WATCH_BACKEND")
+        self._catalog_poll_interval = float(os.getenv("CATALOG_POLL_INTERVAL", 5))
+        self._pre_trigger_seconds = float(os.getenv("PRE_TRIGGER_SECONDS", 1))
+        self._preview_max_fps = float(os.getenv("PREVIEW_MAX_FPS", 15))
+        self._preview_max_viewers = int(os.getenv("PREVIEW_MAX_VIEWERS", 4))
+        self._thumbnail_cache_mb = float(os.getenv("THUMBNAIL_CACHE_MB", 200))
+        self._storage_reserve_windows = int(os.getenv("STORAGE_RESERVE_WINDOWS", 10))
+        self._storage_eviction_policy = os.getenv("STORAGE_EVICTION_POLICY", "none").lower()
+        self._storage_min_free_gb = float(os.getenv("STORAGE_MIN_FREE_GB", 20))
+        self._capture_profile = os.getenv("CAPTURE_PROFILE", "1080p30")
+        self._capture_profiles_file = os.getenv("CAPTURE_PROFILES_FILE")
+        depth_roi = os.getenv("DEPTH_ROI")
+        self._depth_roi = tuple(int(value) for value in depth_roi.split(",")) if depth_roi else None
+        depth_decimation = os.getenv("DEPTH_DECIMATION")
+        self._depth_decimation = int(depth_decimation) if depth_decimation else None
+        self._health_refresh_seconds = float(os.getenv("HEALTH_REFRESH_SECONDS", 1))
+        self._log_dispatch = os.getenv("LOG_DISPATCH", "queue").lower()
+        self._log_format = os.getenv("LOG_FORMAT", "text").lower()
 
         if platform.system() == "Linux":
             today_string = datetime.now().strftime(self._date_format)
@@ -138,3 +184,158 @@ class ENVParser:
         Gets the metadata file name.
         """
         return self._metadata_file_name
+
+    @property
+    def writer_buffer_seconds(self) -> float:
+        """
+        Gets the number of seconds of frames the frame writer may hold in memory.
+        """
+        return self._writer_buffer_seconds
+
+    @property
+    def rgb_encoding(self) -> str:
+        """
+        Gets the on-device encoding of recorded rgb frames: RAW, H264 or H265.
+        """
+        return self._rgb_encoding
+
+    @property
+    def export_profile(self) -> str:
+        """
+        Gets the name of the profile used to export videos: fast, balanced or archive.
+        """
+        return self._export_profile
+
+    @property
+    def light_barrier_backend(self) -> str:
+        """
+        Gets the light barrier backend: gpio or simulated. Chosen by the platform if not set.
+        """
+        return self._light_barrier_backend
+
+    @property
+    def device_scan_interval(self) -> float:
+        """
+        Gets the time in seconds between two scans for connected cameras.
+        """
+        return self._device_scan_interval
+
+    @property
+    def catalog_file_name(self) -> str:
+        """
+        Gets the file name of the recording catalog in the main storage.
+        """
+        return self._catalog_file_name
+
+    @property
+    def catalog_watch_backend(self) -> str:
+        """
+        Gets the backend which watches the main storage for changes: inotify or polling. Chosen by the platform if not
+        set.
+        """
+        return self._catalog_watch_backend
+
+    @property
+    def catalog_poll_interval(self) -> float:
+        """
+        Gets the time in seconds between two polls of the main storage, if the polling backend is used.
+        """
+        return self._catalog_poll_interval
+
+    @property
+    def pre_trigger_seconds(self) -> float:
+        """
+        Gets the time in seconds recorded before the light barrier is activated.
+        """
+        return self._pre_trigger_seconds
+
+    @property
+    def preview_max_fps(self) -> float:
+        """
+        Gets the highest frame rate of the live preview for a single viewer.
+        """
+        return self._preview_max_fps
+
+    @property
+    def preview_max_viewers(self) -> int:
+        """
+        Gets the number of viewers which can watch each live preview stream at the same time.
+        """
+        return self._preview_max_viewers
+
+    @property
+    def thumbnail_cache_mb(self) -> float:
+        """
+        Gets the largest size of the thumbnail cache of the session browser in megabytes.
+        """
+        return self._thumbnail_cache_mb
+
+    @property
+    def storage_reserve_windows(self) -> int:
+        """
+        Gets the number of trigger windows the temporary storage has to hold to start recording.
+        """
+        return self._storage_reserve_windows
+
+    @property
+    def storage_eviction_policy(self) -> str:
+        """
+        Gets the policy for evicting the raw frames of converted recordings: none, converted or low_space.
+        """
+        return self._storage_eviction_policy
+
+    @property
+    def storage_min_free_gb(self) -> float:
+        """
+        Gets the free space in gigabytes the main storage should keep with the low_space eviction policy.
+        """
+        return self._storage_min_free_gb
+
+    @property
+    def capture_profile(self) -> str:
+        """
+        Gets the name of the capture profile used for recording.
+        """
+        return self._capture_profile
+
+    @property
+    def capture_profiles_file(self) -> str:
+        """
+        Gets the path to the YAML file with additional capture profiles.
+        """
+        return self._capture_profiles_file
+
+    @property
+    def depth_roi(self) -> tuple:
+        """
+        Gets the region of the walking corridor in pixels of the mono sensor as x, y, width and height.
+        """
+        return self._depth_roi
+
+    @property
+    def depth_decimation(self) -> int:
+        """
+        Gets the factor the depth frames are decimated by on the device.
+        """
+        return self._depth_decimation
+
+    @property
+    def health_refresh_seconds(self) -> float:
+        """
+        Gets the seconds between two samples of the pipeline health.
+        """
+        return self._health_refresh_seconds
+
+    @property
+    def log_dispatch(self) -> str:
+        """
+        Gets how log records reach the terminal and the log file, through a background queue or directly.
+        """
+        return self._log_dispatch
+
+    @property
+    def log_format(self) -> str:
+        """
+        Gets the format of the log file, text or json.
+        """
+        return self._log_format